@@ -0,0 +1,122 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.urls import Resolver404, resolve
+from rest_framework import status
+
+logger = logging.getLogger(__name__)
+
+executor = None
+if settings.BATCH_WORKERS > 1:
+    executor = ThreadPoolExecutor(
+        max_workers=settings.BATCH_WORKERS,
+        thread_name_prefix='batch'
+    )
+
+
+def make_request(request, method, path, body):
+    """WSGI-запрос для вложенного вызова: заголовки исходного запроса,
+    свои метод, путь и тело. Пользователь уже аутентифицирован
+    и передаётся как есть, без повторной проверки токена.
+    """
+    url = urlsplit(path)
+    content = b'' if body is None else json.dumps(body).encode()
+    environ = dict(request.META)
+    environ.update({
+        'REQUEST_METHOD': method,
+        'SCRIPT_NAME': '',
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(content)),
+        'wsgi.input': BytesIO(content),
+    })
+    subrequest = WSGIRequest(environ)
+    if request.user.is_authenticated:
+        subrequest._force_auth_user = request.user
+        subrequest._force_auth_token = request.auth
+    return subrequest
+
+
+def get_body(response):
+    data = getattr(response, 'data', None)
+    if data is not None:
+        return data
+    if hasattr(response, 'render'):
+        # Response без данных (204 после DELETE) ещё не отрисован
+        response.render()
+    if not response.content:
+        return data
+    if response.get('Content-Type', '').startswith('application/json'):
+        return json.loads(response.content)
+    return response.content.decode(response.charset)
+
+
+def call(request, item):
+    path = urlsplit(item['path']).path
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return {
+            'status': status.HTTP_404_NOT_FOUND,
+            'body': {'detail': 'Страница не найдена.'},
+        }
+    subrequest = make_request(
+        request, item['method'], item['path'], item.get('body')
+    )
+    try:
+        response = match.func(subrequest, *match.args, **match.kwargs)
+        return {'status': response.status_code, 'body': get_body(response)}
+    except Exception:
+        logger.exception('Ошибка вложенного запроса %s', item['path'])
+        return {
+            'status': status.HTTP_500_INTERNAL_SERVER_ERROR,
+            'body': {'detail': 'Внутренняя ошибка сервера.'},
+        }
+
+
+def call_in_thread(request, item):
+    # у потока свои соединения с БД, их нужно закрыть
+    try:
+        return call(request, item)
+    finally:
+        connections.close_all()
+
+
+def groups(items):
+    """Подряд идущие GET - одна группа, каждый изменяющий запрос -
+    отдельная. Группы выполняются по порядку, чтобы GET после записи
+    видел её результат.
+    """
+    group = []
+    for item in items:
+        if item['method'] != 'GET':
+            if group:
+                yield group
+                group = []
+            yield [item]
+            continue
+        group.append(item)
+    if group:
+        yield group
+
+
+def run(request, items):
+    """Ответы на вложенные запросы в порядке запросов. GET внутри
+    группы выполняются параллельно при BATCH_WORKERS > 1.
+    """
+    responses = []
+    for group in groups(items):
+        if executor is None or len(group) == 1:
+            responses.extend(call(request, item) for item in group)
+            continue
+        responses.extend(executor.map(
+            lambda item: call_in_thread(request, item), group
+        ))
+    return responses
@@ -0,0 +1,117 @@
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+# SQLSTATE query_canceled: сработал statement_timeout
+QUERY_CANCELED = '57014'
+
+
+class ServiceUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Сервис перегружен, повторите запрос позже.'
+    default_code = 'service_unavailable'
+
+    def __init__(self, detail=None):
+        super().__init__(detail)
+        # обработчик исключений DRF превращает wait в Retry-After
+        self.wait = settings.LOAD_SHED_RETRY_AFTER
+
+
+def get_budget(view):
+    """Лимит времени запроса к БД в мс для действия или None."""
+    return settings.QUERY_BUDGETS.get(f'{view.basename}.{view.action}')
+
+
+def is_query_canceled(error):
+    return getattr(error.__cause__, 'pgcode', None) == QUERY_CANCELED
+
+
+class StatementTimeout:
+    """execute_wrapper: перед первым запросом к БД ставит
+    statement_timeout по бюджету действия. Если до БД дело не дошло
+    (ответ из кеша) или бюджета нет, лишних запросов нет.
+    """
+
+    def __init__(self, view):
+        self.view = view
+        self.checked = False
+        self.applied = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if not self.checked:
+            self.checked = True
+            timeout = get_budget(self.view)
+            if timeout is not None:
+                self.applied = True
+                context['cursor'].execute(
+                    'SET statement_timeout = %s', [timeout]
+                )
+        return execute(sql, params, many, context)
+
+    def reset(self, connection):
+        # соединение переиспользуется (CONN_MAX_AGE) другими запросами
+        if self.applied:
+            with connection.cursor() as cursor:
+                cursor.execute('SET statement_timeout = DEFAULT')
+
+
+IN_FLIGHT_PREFIX = 'load-shed:in-flight:'
+
+
+def clock():
+    return time.time()
+
+
+def bucket_keys():
+    """Ключи корзин счётчика за LOAD_SHED_WINDOW_SECONDS, текущая -
+    первая. Каждая корзина - LOAD_SHED_BUCKET_SECONDS.
+    """
+    size = settings.LOAD_SHED_BUCKET_SECONDS
+    current = int(clock() // size)
+    count = math.ceil(settings.LOAD_SHED_WINDOW_SECONDS / size)
+    return [
+        f'{IN_FLIGHT_PREFIX}{bucket}'
+        for bucket in range(current, current - count, -1)
+    ]
+
+
+def enter():
+    """Учитывает запрос в счётчике выполняющихся дорогих запросов.
+    Счётчик общий для всех воркеров и лежит в кеше, поэтому нужен
+    общий кеш (memcached): с LocMemCache порог считается в каждом
+    процессе отдельно, и gunicorn с несколькими воркерами не стартует.
+    Запрос учитывается в корзине времени входа, выполняющимися
+    считаются запросы из корзин за LOAD_SHED_WINDOW_SECONDS. Запрос,
+    не дошедший до leave (упавший процесс), выпадает из окна вместе
+    со своей корзиной, сколько бы запросов ни шло после него.
+    Возвращает ключ корзины для leave или None, если порог превышен
+    и запрос не учтён.
+    """
+    keys = bucket_keys()
+    key = keys[0]
+    timeout = (
+        settings.LOAD_SHED_WINDOW_SECONDS + settings.LOAD_SHED_BUCKET_SECONDS
+    )
+    if not cache.add(key, 1, timeout):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # корзина вытеснена между add и incr
+            cache.add(key, 1, timeout)
+    in_flight = sum(cache.get_many(keys).values())
+    if in_flight > settings.LOAD_SHED_MAX_IN_FLIGHT:
+        leave(key)
+        return None
+    return key
+
+
+def leave(key):
+    try:
+        cache.decr(key)
+    except ValueError:
+        # корзина истекла, пока выполнялся запрос
+        pass
@@ -0,0 +1,107 @@
+import math
+import random
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+EVENTS = ('hit', 'miss', 'coalesced', 'early_refresh', 'timeout')
+
+
+def metric_key(event):
+    return f'coalesce:metrics:{event}'
+
+
+def count(event):
+    key = metric_key(event)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # счётчик вытеснен между add и incr
+            pass
+
+
+def get_metrics():
+    values = cache.get_many([metric_key(event) for event in EVENTS])
+    return {event: values.get(metric_key(event), 0) for event in EVENTS}
+
+
+def reset_metrics():
+    cache.delete_many([metric_key(event) for event in EVENTS])
+
+
+def should_refresh(delta, expires):
+    """Вероятностное обновление до истечения (XFetch): чем дольше
+    считалось значение и чем ближе истечение, тем вероятнее, что этот
+    запрос пересчитает его заранее, пока остальные читают старое.
+    """
+    beta = settings.COALESCE_EARLY_REFRESH_BETA
+    return time.time() - delta * beta * math.log(random.random()) >= expires
+
+
+def compute_and_store(key, compute):
+    started = time.time()
+    value = compute()
+    delta = time.time() - started
+    ttl = settings.COALESCE_TTL_SECONDS
+    cache.set(key, (value, delta, time.time() + ttl), ttl)
+    return value
+
+
+def acquire(lock_key):
+    token = uuid.uuid4().hex
+    if cache.add(lock_key, token, settings.COALESCE_LEASE_SECONDS):
+        return token
+    return None
+
+
+def release(lock_key, token):
+    # после истечения аренды блокировку мог взять другой запрос
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def fetch(key, compute):
+    """Значение из общего кеша; при промахе считает его один запрос,
+    остальные ждут его результата не дольше аренды блокировки
+    (COALESCE_LEASE_SECONDS), а потом считают сами. Значение должно
+    сериализоваться pickle.
+    """
+    lock_key = f'{key}:lock'
+    entry = cache.get(key)
+    if entry is not None:
+        value, delta, expires = entry
+        if not should_refresh(delta, expires):
+            count('hit')
+            return value
+        token = acquire(lock_key)
+        if token is None:
+            count('hit')
+            return value
+        count('early_refresh')
+        try:
+            return compute_and_store(key, compute)
+        finally:
+            release(lock_key, token)
+    token = acquire(lock_key)
+    if token is not None:
+        count('miss')
+        try:
+            return compute_and_store(key, compute)
+        finally:
+            release(lock_key, token)
+    deadline = time.monotonic() + settings.COALESCE_LEASE_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(settings.COALESCE_POLL_SECONDS)
+        entry = cache.get(key)
+        if entry is not None:
+            count('coalesced')
+            return entry[0]
+        if cache.get(lock_key) is None:
+            # вычисление завершилось ошибкой, ждать нечего
+            break
+    else:
+        count('timeout')
+    return compute()
@@ -1,15 +1,15 @@
 import django_filters
-from reviews.models import Title
+from reviews import slugs
+from reviews.models import Comment, Review, Title
 
 
 class TitleFilter(django_filters.FilterSet):
-    """Фильтр для поиска произведений."""
-    category = django_filters.CharFilter(
-        field_name='category__slug'
-    )
-    genre = django_filters.CharFilter(
-        field_name='genre__slug'
-    )
+    """Фильтр для поиска произведений.
+    Slug жанра и категории переводится в id по реестру процесса,
+    поэтому таблицы жанров и категорий в запрос не попадают.
+    """
+    category = django_filters.CharFilter(method='filter_category')
+    genre = django_filters.CharFilter(method='filter_genre')
     name = django_filters.CharFilter(
         field_name='name', lookup_expr='contains'
     )
@@ -25,3 +25,51 @@ class TitleFilter(django_filters.FilterSet):
             'name',
             'year'
         )
+
+    def filter_category(self, queryset, name, value):
+        category_id = slugs.categories.get_id(value)
+        if category_id is None:
+            return queryset.none()
+        return queryset.filter(category_id=category_id)
+
+    def filter_genre(self, queryset, name, value):
+        genre_id = slugs.genres.get_id(value)
+        if genre_id is None:
+            return queryset.none()
+        return queryset.filter(genre=genre_id)
+
+
+class LatestReviewFilter(django_filters.FilterSet):
+    """Фильтр ленты последних отзывов по жанру и категории
+    произведения, slug переводится в id по реестру процесса.
+    """
+    title_field = 'title'
+    category = django_filters.CharFilter(method='filter_category')
+    genre = django_filters.CharFilter(method='filter_genre')
+
+    class Meta:
+        model = Review
+        fields = ('category', 'genre')
+
+    def filter_category(self, queryset, name, value):
+        category_id = slugs.categories.get_id(value)
+        if category_id is None:
+            return queryset.none()
+        return queryset.filter(
+            **{f'{self.title_field}__category_id': category_id}
+        )
+
+    def filter_genre(self, queryset, name, value):
+        genre_id = slugs.genres.get_id(value)
+        if genre_id is None:
+            return queryset.none()
+        return queryset.filter(**{f'{self.title_field}__genre': genre_id})
+
+
+class LatestCommentFilter(LatestReviewFilter):
+    """Фильтр ленты последних комментариев."""
+    title_field = 'review__title'
+
+    class Meta:
+        model = Comment
+        fields = ('category', 'genre')
@@ -0,0 +1,45 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.mail import send_mail
+
+logger = logging.getLogger(__name__)
+
+executor = None
+if settings.EMAIL_SEND_WORKERS:
+    executor = ThreadPoolExecutor(
+        max_workers=settings.EMAIL_SEND_WORKERS,
+        thread_name_prefix='email'
+    )
+
+
+def _send(email, confirmation_code):
+    send_mail(
+        'Ваш код подтверждения ',
+        f'"confirmation_code": "{confirmation_code}" ',
+        settings.EMAIL_SENDER,
+        [f'{email}'],
+        fail_silently=False,
+    )
+
+
+def _log_error(future):
+    if future.exception() is not None:
+        logger.error(
+            'Не удалось отправить код подтверждения',
+            exc_info=future.exception()
+        )
+
+
+def send_confirmation_code(email, confirmation_code):
+    """Отправка кода подтверждения.
+    При EMAIL_SEND_WORKERS > 0 письмо уходит в фоновом потоке
+    и не задерживает ответ на запрос.
+    """
+    if executor is None:
+        _send(email, confirmation_code)
+        return
+    executor.submit(_send, email, confirmation_code).add_done_callback(
+        _log_error
+    )
@@ -0,0 +1,30 @@
+from api import coalesce
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Счётчики общего кеша страниц: попадания, промахи, запросы, '
+        'дождавшиеся чужого расчёта, ранние обновления и таймауты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Обнулить счётчики после вывода.'
+        )
+
+    def handle(self, *args, **options):
+        # счётчики пишут воркеры, кеш этой команды - другой процесс
+        if isinstance(caches['default'], LocMemCache):
+            raise CommandError(
+                'LocMemCache виден только своему процессу, счётчиков '
+                'воркеров в нём нет. Запустите команду с теми же '
+                'CACHE_BACKEND и CACHE_LOCATION, что у web.'
+            )
+        for event, value in coalesce.get_metrics().items():
+            self.stdout.write(f'{event}: {value}')
+        if options['reset']:
+            coalesce.reset_metrics()
@@ -0,0 +1,213 @@
+import hashlib
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from rest_framework import serializers, status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from . import budget, coalesce
+
+
+class ValuesListMixin:
+    """list() через values-сериализатор при VALUES_SERIALIZERS = True.
+    Строки читаются через .values(), без создания экземпляров моделей.
+    """
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if (
+            not settings.VALUES_SERIALIZERS
+            or self.values_serializer_class is None
+        ):
+            return super().list(request, *args, **kwargs)
+        queryset = self.values_serializer_class.get_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.values_serializer_class(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.values_serializer_class(queryset, many=True)
+        return Response(serializer.data)
+
+
+class ArchiveMixin:
+    """GET с ?archived=1 читает архивную таблицу вместо основной.
+    Архив только для чтения.
+    """
+
+    def is_archived(self):
+        return (
+            self.request.method in SAFE_METHODS
+            and self.request.query_params.get('archived') in ('1', 'true')
+        )
+
+
+class RegistryListMixin:
+    """list() без поиска отдаёт строки из реестра slug процесса
+    (reviews.slugs), без запросов к БД.
+    """
+    registry = None
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get(api_settings.SEARCH_PARAM):
+            return super().list(request, *args, **kwargs)
+        objects = self.registry.objects()
+        page = self.paginate_queryset(objects)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        return Response(self.get_serializer(objects, many=True).data)
+
+
+class CoalesceMixin:
+    """list() и retrieve() для анонимных GET через общий кеш: одинаковые
+    одновременные запросы ждут одного вычисления (api.coalesce).
+    Кешируются данные ответа, а не отрисованный ответ, поэтому формат
+    выбирается как обычно. Авторизованные пользователи всегда получают
+    свежие данные, в том числе сразу после своих изменений.
+    """
+    coalesce_actions = ()
+
+    def coalesce(self, get_response):
+        if (
+            self.action not in self.coalesce_actions
+            or not settings.COALESCE_TTL_SECONDS
+            or self.request.user.is_authenticated
+        ):
+            return get_response()
+        path = hashlib.md5(
+            self.request.get_full_path().encode()
+        ).hexdigest()
+        key = f'coalesce:{self.basename}:{self.action}:{path}'
+        return Response(coalesce.fetch(key, lambda: get_response().data))
+
+    def list(self, request, *args, **kwargs):
+        return self.coalesce(
+            lambda: super(CoalesceMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.coalesce(
+            lambda: super(CoalesceMixin, self).retrieve(
+                request, *args, **kwargs
+            )
+        )
+
+
+class QueryBudgetMixin:
+    """Бюджет запроса для действий из QUERY_BUDGETS: statement_timeout
+    в Postgres и ограничение числа одновременно выполняющихся таких
+    запросов (LOAD_SHED_MAX_IN_FLIGHT). Сверх порога и при отмене
+    запроса по таймауту - 503 с Retry-After.
+    """
+    in_flight = None
+
+    def dispatch(self, request, *args, **kwargs):
+        connection = connections[DEFAULT_DB_ALIAS]
+        timeout = budget.StatementTimeout(self)
+        try:
+            if connection.vendor != 'postgresql':
+                return super().dispatch(request, *args, **kwargs)
+            with connection.execute_wrapper(timeout):
+                return super().dispatch(request, *args, **kwargs)
+        finally:
+            timeout.reset(connection)
+            if self.in_flight is not None:
+                budget.leave(self.in_flight)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if budget.get_budget(self) is None:
+            return
+        self.in_flight = budget.enter()
+        if self.in_flight is None:
+            raise budget.ServiceUnavailable()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, OperationalError) and budget.is_query_canceled(
+            exc
+        ):
+            return Response(
+                {'detail': 'Запрос выполнялся слишком долго, уточните '
+                           'фильтры или повторите позже.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(settings.LOAD_SHED_RETRY_AFTER)}
+            )
+        return super().handle_exception(exc)
+
+
+class MultiGetMixin:
+    """list() с ?ids=1,2,3: объекты по списку id в порядке запроса
+    и id, которых нет, за постоянное число запросов. Фильтры
+    и пагинация к такому запросу не применяются.
+    """
+
+    def get_ids(self):
+        values = [
+            value.strip()
+            for value in self.request.query_params['ids'].split(',')
+            if value.strip()
+        ]
+        if not all(value.isdigit() for value in values):
+            raise serializers.ValidationError(
+                {'ids': 'Ожидаются целые id через запятую.'}
+            )
+        ids = list(dict.fromkeys(int(value) for value in values))
+        if len(ids) > settings.MULTI_GET_MAX_IDS:
+            raise serializers.ValidationError({
+                'ids': f'Не больше {settings.MULTI_GET_MAX_IDS} id за запрос.'
+            })
+        return ids
+
+    def prepare_objects(self, objects):
+        """Дополняет найденные объекты перед сериализацией."""
+
+    def list(self, request, *args, **kwargs):
+        if 'ids' not in request.query_params:
+            return super().list(request, *args, **kwargs)
+        ids = self.get_ids()
+        found = {
+            obj.pk: obj
+            for obj in self.get_queryset().filter(pk__in=ids)
+        }
+        objects = [found[pk] for pk in ids if pk in found]
+        self.prepare_objects(objects)
+        return Response({
+            'results': self.get_serializer(objects, many=True).data,
+            'missing': [pk for pk in ids if pk not in found],
+        })
+
+
+class LatestMixin:
+    """list() ленты последних записей (KeysetPagination). Первая
+    страница без токена нарезается из головы ленты - LATEST_HEAD_SIZE
+    последних строк в общем кеше (api.coalesce), без запросов к БД.
+    Авторизованные пользователи и следующие страницы читают БД.
+    """
+
+    def list(self, request, *args, **kwargs):
+        paginator = self.paginator
+        limit = paginator.get_limit(request)
+        if (
+            paginator.cursor_query_param in request.query_params
+            or limit > settings.LATEST_HEAD_SIZE
+            or not settings.COALESCE_TTL_SECONDS
+            or request.user.is_authenticated
+        ):
+            return super().list(request, *args, **kwargs)
+        filters = '&'.join(
+            f'{name}={request.query_params.get(name, "")}'
+            for name in self.filterset_class.base_filters
+        )
+        key = (
+            f'latest:{self.basename}:'
+            f'{hashlib.md5(filters.encode()).hexdigest()}'
+        )
+        head = coalesce.fetch(key, lambda: paginator.get_head(
+            self.filter_queryset(self.get_queryset()), self,
+            settings.LATEST_HEAD_SIZE
+        ))
+        return paginator.get_head_response(head, limit)
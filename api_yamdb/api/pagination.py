@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+class CappedLimitOffsetPagination(LimitOffsetPagination):
+    """limit не больше PAGINATION_MAX_LIMIT, offset не больше
+    PAGINATION_MAX_OFFSET: глубокий OFFSET заставляет БД прочитать
+    и отбросить все предыдущие строки.
+    """
+    max_limit = settings.PAGINATION_MAX_LIMIT
+
+    def get_offset(self, request):
+        offset = super().get_offset(request)
+        if offset > settings.PAGINATION_MAX_OFFSET:
+            raise ValidationError({
+                self.offset_query_param: (
+                    'Смещение не может быть больше '
+                    f'{settings.PAGINATION_MAX_OFFSET}, уточните фильтры.'
+                )
+            })
+        return offset
+
+
+class KeysetPagination(BasePagination):
+    """Страницы от новых к старым по (pub_date, id) без OFFSET.
+    next - позиция последней строки страницы, с ?cursor=next следующая
+    страница читается по индексу сразу после неё, на любой глубине
+    за одно время.
+    """
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    ordering = ('-pub_date', '-id')
+
+    def get_limit(self, request):
+        value = request.query_params.get(self.limit_query_param, '')
+        if not value.isdigit() or not int(value):
+            return api_settings.PAGE_SIZE
+        return min(int(value), settings.PAGINATION_MAX_LIMIT)
+
+    def encode_cursor(self, obj):
+        return f'{(obj.pub_date - EPOCH) // MICROSECOND}.{obj.id}'
+
+    def decode_cursor(self, request):
+        value = request.query_params.get(self.cursor_query_param)
+        if value is None:
+            return None
+        try:
+            microseconds, pk = (int(part) for part in value.split('.'))
+            return EPOCH + microseconds * MICROSECOND, pk
+        except (ValueError, OverflowError):
+            raise ValidationError(
+                {self.cursor_query_param: 'Неверный курсор.'}
+            )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        limit = self.get_limit(request)
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            pub_date, pk = cursor
+            queryset = queryset.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+            )
+        rows = list(queryset.order_by(*self.ordering)[:limit + 1])
+        self.next = None
+        if len(rows) > limit:
+            self.next = self.encode_cursor(rows[limit - 1])
+        return rows[:limit]
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.next, 'results': data})
+
+    def get_head(self, queryset, view, size):
+        """Первые size строк с курсорами для кеша: любая первая
+        страница не длиннее size нарезается из них.
+        """
+        rows = list(queryset.order_by(*self.ordering)[:size + 1])
+        return {
+            'cursors': [self.encode_cursor(obj) for obj in rows[:size]],
+            'results': view.get_serializer(rows[:size], many=True).data,
+            'more': len(rows) > size,
+        }
+
+    def get_head_response(self, head, limit):
+        more = head['more'] or len(head['results']) > limit
+        return Response({
+            'next': head['cursors'][limit - 1] if more else None,
+            'results': head['results'][:limit],
+        })
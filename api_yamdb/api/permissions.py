@@ -11,6 +11,16 @@ class IsAdminOrSuperUser(BasePermission):
         )
 
 
+class IsModeratorOrAdmin(BasePermission):
+    """Доступ модератору, админу и суперюзеру."""
+
+    def has_permission(self, request, view):
+        return (
+            not request.user.is_anonymous
+            and request.user.is_moderator_or_admin_or_super_user
+        )
+
+
 class IsAdmimOrReadOnly(BasePermission):
     """У всех, кроме админа и суперюзера, права только на чтение."""
     def has_permission(self, request, view):
@@ -29,6 +39,9 @@ class IsAdmimOrReadOnly(BasePermission):
 
 
 class IsAdmimOrModeratorOrReadOnly(BasePermission):
+    """Менять и удалять объект могут автор, модератор и админ.
+    Автор сравнивается по author_id, без загрузки связанного пользователя.
+    """
 
     def has_permission(self, request, view):
         return (
@@ -41,5 +54,5 @@ class IsAdmimOrModeratorOrReadOnly(BasePermission):
             request.method in SAFE_METHODS
             or not request.user.is_anonymous
             and request.user.is_moderator_or_admin_or_super_user
-            or obj.author == request.user
+            or obj.author_id == request.user.id
         )
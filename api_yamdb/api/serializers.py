@@ -1,9 +1,14 @@
 import datetime as dt
 
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from reviews.models import Categorie, Comment, Genre, Review, Title
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews import slugs
+from reviews.models import (ArchivedReview, Categorie, ChangeLog, Comment,
+                            Genre, Review, SimilarTitle, Title, TitleGenre,
+                            TitleRanking)
+from users.codes import get_code_store
 from users.models import User
 
 
@@ -44,19 +49,125 @@ class TitleGetSerializer(serializers.ModelSerializer):
         model = Title
 
 
+class TitleRankingSerializer(serializers.ModelSerializer):
+    """Строка рейтинга для api/v1/titles/top/."""
+    title = TitleGetSerializer(read_only=True)
+
+    class Meta:
+        fields = ('title', 'rating', 'review_count')
+        model = TitleRanking
+
+
+class SimilarTitleSerializer(serializers.ModelSerializer):
+    """Похожее произведение для api/v1/titles/{id}/similar/."""
+    title = TitleGetSerializer(source='similar', read_only=True)
+
+    class Meta:
+        fields = ('title', 'score')
+        model = SimilarTitle
+
+
+class TitleStatsSerializer(serializers.Serializer):
+    """Распределение оценок для api/v1/titles/{id}/stats/."""
+    count = serializers.IntegerField()
+    mean = serializers.FloatField()
+    median = serializers.FloatField()
+    histogram = serializers.DictField(child=serializers.IntegerField())
+
+
+class ValuesSerializer:
+    """Сериализатор только для чтения поверх строк .values().
+    Собирает словари напрямую, без экземпляров моделей и полей DRF,
+    и отдаёт то же, что соответствующий ModelSerializer.
+    """
+    values = ()
+    datetime_field = serializers.DateTimeField()
+
+    def __init__(self, instance, many=False):
+        self.instance = instance
+        self.many = many
+
+    @classmethod
+    def get_queryset(cls, queryset):
+        return queryset.select_related(None).prefetch_related(None).values(
+            *cls.values
+        )
+
+    def prepare(self, rows):
+        """Догрузка связанных данных одним запросом на страницу."""
+
+    def to_representation(self, row):
+        raise NotImplementedError
+
+    @property
+    def data(self):
+        rows = list(self.instance) if self.many else [self.instance]
+        self.prepare(rows)
+        data = [self.to_representation(row) for row in rows]
+        return data if self.many else data[0]
+
+
+class TitleValuesSerializer(ValuesSerializer):
+    """Список произведений, как TitleGetSerializer."""
+    values = (
+        'id', 'name', 'description', 'year', 'category__name',
+        'category__slug',
+    )
+
+    def prepare(self, rows):
+        self.genres = {}
+        title_genres = TitleGenre.objects.filter(
+            title_id__in=[row['id'] for row in rows]
+        ).order_by('id').values_list('title_id', 'genre__name', 'genre__slug')
+        for title_id, name, slug in title_genres:
+            self.genres.setdefault(title_id, []).append(
+                {'name': name, 'slug': slug}
+            )
+
+    def to_representation(self, row):
+        category = None
+        if row['category__slug'] is not None:
+            category = {
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+            }
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'category': category,
+            'genre': self.genres.get(row['id'], []),
+            'description': row['description'],
+            'year': row['year'],
+        }
+
+
+class RegistrySlugField(serializers.SlugRelatedField):
+    """SlugRelatedField, который ищет slug в реестре процесса
+    (reviews.slugs), а не запросом к БД на каждое значение.
+    """
+
+    def __init__(self, registry, **kwargs):
+        self.registry = registry
+        super().__init__(
+            slug_field='slug', queryset=registry.model.objects.all(),
+            **kwargs
+        )
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        obj = self.registry.get_object(data)
+        if obj is None:
+            self.fail('does_not_exist', slug_name='slug', value=data)
+        return obj
+
+
 class TitlePostSerializer(serializers.ModelSerializer):
     """Сериализатор для модели Title.
     Для POST запросов к эндпоинтам /title/ и /title/id/.
     """
-    genre = serializers.SlugRelatedField(
-        many=True,
-        slug_field='slug',
-        queryset=Genre.objects.all()
-    )
-    category = serializers.SlugRelatedField(
-        slug_field='slug',
-        queryset=Categorie.objects.all()
-    )
+    genre = RegistrySlugField(slugs.genres, many=True)
+    category = RegistrySlugField(slugs.categories)
 
     class Meta:
         fields = ('id', 'name', 'category', 'genre', 'description', 'year')
@@ -73,15 +184,59 @@ class TitlePostSerializer(serializers.ModelSerializer):
 
 
 class CommentSerializer(serializers.ModelSerializer):
-    """Сериализатор для модели Comment."""
+    """Сериализатор для модели Comment.
+    parent - id комментария того же отзыва, на который это ответ.
+    """
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True
     )
+    parent = serializers.PrimaryKeyRelatedField(
+        queryset=Comment.objects.visible(),
+        required=False,
+        allow_null=True
+    )
 
     class Meta:
         model = Comment
-        fields = ('id', 'text', 'author', 'pub_date')
+        fields = ('id', 'text', 'author', 'pub_date', 'parent', 'depth')
+        read_only_fields = ('depth',)
+
+    def validate_parent(self, parent):
+        if self.instance is not None:
+            if getattr(parent, 'pk', None) != self.instance.parent_id:
+                raise serializers.ValidationError(
+                    'Ответ нельзя перенести в другую ветку.'
+                )
+            return parent
+        if parent is None:
+            return parent
+        if parent.review_id != int(self.context['view'].kwargs['review_id']):
+            raise serializers.ValidationError(
+                'Можно ответить только на комментарий к этому отзыву.'
+            )
+        if parent.depth >= settings.COMMENT_MAX_DEPTH:
+            raise serializers.ValidationError(
+                'Ветка слишком глубокая, ответьте выше по ветке.'
+            )
+        return parent
+
+
+class CommentValuesSerializer(ValuesSerializer):
+    """Список комментариев, как CommentSerializer."""
+    values = ('id', 'text', 'author__username', 'pub_date', 'parent', 'depth')
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'text': row['text'],
+            'author': row['author__username'],
+            'pub_date': self.datetime_field.to_representation(
+                row['pub_date']
+            ),
+            'parent': row['parent'],
+            'depth': row['depth'],
+        }
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -93,7 +248,7 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = '__all__'
+        fields = ('id', 'author', 'text', 'pub_date', 'score', 'title')
         read_only_fields = ['title', ]
 
     def validate(self, data):
@@ -102,14 +257,155 @@ class ReviewSerializer(serializers.ModelSerializer):
 
         title_id = self.context['view'].kwargs.get('title_id')
         author = self.context['request'].user
-        if Review.objects.filter(
-                author=author, title=title_id).exists():
+        if any(
+            model.objects.filter(author=author, title=title_id).exists()
+            for model in (Review, ArchivedReview)
+        ):
             raise serializers.ValidationError(
                 'Вы оставляли отзыв на это творение.'
             )
         return data
 
 
+class ReviewValuesSerializer(ValuesSerializer):
+    """Список отзывов, как ReviewSerializer."""
+    values = ('id', 'author__username', 'text', 'pub_date', 'score', 'title')
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'author': row['author__username'],
+            'text': row['text'],
+            'pub_date': self.datetime_field.to_representation(
+                row['pub_date']
+            ),
+            'score': row['score'],
+            'title': row['title'],
+        }
+
+
+class UserReviewSerializer(ReviewSerializer):
+    """Отзыв в списке отзывов пользователя: с названием произведения."""
+    title_name = serializers.CharField(source='title.name', read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('title_name',)
+
+
+class UserCommentSerializer(CommentSerializer):
+    """Комментарий в списке комментариев пользователя: с id отзыва,
+    id и названием произведения.
+    """
+    title = serializers.IntegerField(source='review.title_id', read_only=True)
+    title_name = serializers.CharField(
+        source='review.title.name', read_only=True
+    )
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + (
+            'review', 'title', 'title_name'
+        )
+
+
+class CommentChangeSerializer(CommentSerializer):
+    """Комментарий в ленте изменений: с id отзыва."""
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ('review',)
+
+
+class ChangeLogSerializer(serializers.ModelSerializer):
+    """Запись ленты изменений api/v1/changes/.
+    data - текущее состояние объекта, для удалённых - None.
+    """
+    cursor = serializers.IntegerField(source='id')
+    data = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ChangeLog
+        fields = ('cursor', 'model', 'object_id', 'action', 'data')
+
+    def get_data(self, obj):
+        if obj.action == ChangeLog.DELETED:
+            return None
+        return self.context['objects'].get((obj.model, obj.object_id))
+
+
+class TopReviewSerializer(ReviewSerializer):
+    """Отзыв с первыми комментариями.
+    Для GET запросов к /titles/id/?expand=reviews,comments.
+    """
+    comments = CommentSerializer(
+        source='top_comments',
+        many=True,
+        read_only=True
+    )
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('comments',)
+
+
+class BatchItemSerializer(serializers.Serializer):
+    """Вложенный запрос для api/v1/batch/."""
+    method = serializers.ChoiceField(
+        choices=('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+    )
+    path = serializers.RegexField(r'^/api/v1/')
+    body = serializers.JSONField(required=False)
+
+    def validate_path(self, value):
+        if value.split('?')[0].rstrip('/') == '/api/v1/batch':
+            raise serializers.ValidationError(
+                'Вложенный batch-запрос не поддерживается.'
+            )
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = BatchItemSerializer(many=True, allow_empty=False)
+
+    def validate_requests(self, value):
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(
+                f'Не больше {settings.BATCH_MAX_REQUESTS} запросов.'
+            )
+        return value
+
+
+class ModerationSerializer(serializers.Serializer):
+    """Массовая модерация отзывов или комментариев.
+    Объекты выбираются по списку id, автору и периоду публикации.
+    """
+    DELETE = 'delete'
+    HIDE = 'hide'
+    REVIEWS = 'reviews'
+    COMMENTS = 'comments'
+
+    action = serializers.ChoiceField(choices=(DELETE, HIDE))
+    target = serializers.ChoiceField(choices=(REVIEWS, COMMENTS))
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        max_length=settings.MODERATION_MAX_IDS,
+        required=False
+    )
+    author = serializers.SlugRelatedField(
+        slug_field='username',
+        queryset=User.objects.all(),
+        required=False
+    )
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if not any(
+            key in data for key in ('ids', 'author', 'since', 'until')
+        ):
+            raise serializers.ValidationError(
+                'Укажите id, автора или период публикации.'
+            )
+        return data
+
+
 class UserSerializer(serializers.ModelSerializer):
     role = serializers.ChoiceField(
         choices=User.ROLE_CHOICES,
@@ -153,10 +449,17 @@ class UserMeSerializer(serializers.ModelSerializer):
 
 
 class SignupSerializer(serializers.ModelSerializer):
+    """Проверяет только формат username и email.
+    Занятость проверяет сама вставка в User.objects.signup.
+    """
 
     class Meta:
         fields = ('username', 'email')
         model = User
+        extra_kwargs = {
+            'username': {'validators': [User.username_validator]},
+            'email': {'validators': []},
+        }
 
     def validate_username(self, value):
         if 'me' == value:
@@ -164,20 +467,26 @@ class SignupSerializer(serializers.ModelSerializer):
 
         return value
 
+    def get_conflict_errors(self, username):
+        field = 'username'
+        if not User.objects.filter(username=username).exists():
+            field = 'email'
+        return {
+            field: [User._meta.get_field(field).error_messages['unique']]
+        }
+
 
-class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.fields['confirmation_code'] = serializers.CharField()
-        del self.fields['password']
+class CustomTokenObtainPairSerializer(serializers.Serializer):
+    """Выдаёт только access-токен, refresh-токен не создаётся."""
+    username = serializers.CharField()
+    confirmation_code = serializers.CharField()
 
     def validate(self, attrs):
-        data = {}
-        user = get_object_or_404(User, username=attrs['username'])
-        if user.confirmation_code != attrs['confirmation_code']:
+        user_id = get_code_store().verify(
+            attrs['username'], attrs['confirmation_code']
+        )
+        if user_id is None:
+            get_object_or_404(User, username=attrs['username'])
             raise serializers.ValidationError("не верный код подверждения.")
-        refresh = self.get_token(user)
-
-        data["access"] = str(refresh.access_token)
 
-        return data
+        return {'access': str(AccessToken.for_user(User(id=user_id)))}
@@ -1,9 +1,12 @@
-from api.views import (CustomTokenObtainPairView, SignupViewSet, UserMeViewSet,
-                       UserViewSet)
+from api.views import (BatchViewSet, CustomTokenObtainPairView,
+                       ModerationViewSet, SignupViewSet, UserCommentViewSet,
+                       UserMeCommentViewSet, UserMeReviewViewSet,
+                       UserMeViewSet, UserReviewViewSet, UserViewSet)
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (CategorieViewSet, CommentViewSet, GenreViewSet,
+from .views import (CategorieViewSet, ChangeViewSet, CommentViewSet,
+                    GenreViewSet, LatestCommentViewSet, LatestReviewViewSet,
                     ReviewViewSet, TitleViewSet)
 
 app_name = 'api'
@@ -12,9 +15,26 @@ v1_router = DefaultRouter()
 
 
 v1_router.register(r'users', UserViewSet, basename='users')
+v1_router.register(
+    r'users/(?P<username>[^/.]+)/reviews',
+    UserReviewViewSet,
+    basename='user-reviews'
+)
+v1_router.register(
+    r'users/(?P<username>[^/.]+)/comments',
+    UserCommentViewSet,
+    basename='user-comments'
+)
 v1_router.register('titles', TitleViewSet, basename='titles')
 v1_router.register('genres', GenreViewSet, basename='genres')
 v1_router.register('categories', CategorieViewSet, basename='categories')
+v1_router.register('changes', ChangeViewSet, basename='changes')
+v1_router.register(
+    'reviews/latest', LatestReviewViewSet, basename='reviews-latest'
+)
+v1_router.register(
+    'comments/latest', LatestCommentViewSet, basename='comments-latest'
+)
 v1_router.register(
     r'titles/(?P<title_id>\d+)/reviews',
     ReviewViewSet,
@@ -32,6 +52,20 @@ urlpatterns = [
         UserMeViewSet.as_view({'get': 'retrieve', 'patch': 'update'}),
         name='user_me'
     ),
+    path(
+        r'v1/users/me/reviews/',
+        UserMeReviewViewSet.as_view(
+            {'get': 'list'}, basename='user-reviews'
+        ),
+        name='user_me_reviews'
+    ),
+    path(
+        r'v1/users/me/comments/',
+        UserMeCommentViewSet.as_view(
+            {'get': 'list'}, basename='user-comments'
+        ),
+        name='user_me_comments'
+    ),
     path(
         r'v1/auth/signup/',
         SignupViewSet.as_view({'post': 'create'}),
@@ -42,5 +76,15 @@ urlpatterns = [
         CustomTokenObtainPairView.as_view(),
         name='token_obtain_pair'
     ),
+    path(
+        r'v1/moderation/',
+        ModerationViewSet.as_view({'post': 'create'}),
+        name='moderation'
+    ),
+    path(
+        r'v1/batch/',
+        BatchViewSet.as_view({'post': 'create'}),
+        name='batch'
+    ),
     path(r'v1/', include(v1_router.urls)),
 ]
@@ -1,27 +1,77 @@
 from django.conf import settings
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import transaction
+from django.db.models import OuterRef, Prefetch, Subquery
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from django.utils.crypto import get_random_string
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, mixins, status, viewsets
-from rest_framework.permissions import AllowAny
+from rest_framework import filters, mixins, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView
-from reviews.models import Categorie, Genre, Review, Title
+from reviews import slugs
+from reviews.models import (ArchivedComment, ArchivedReview, Categorie,
+                            ChangeLog, Comment, Genre, Review, SimilarTitle,
+                            Title, TitleRanking, TitleStats)
+from reviews.moderation import delete_comments, delete_reviews, hide
+from reviews.purge import soft_delete_title, soft_delete_user
+from users.codes import get_code_store
 from users.models import User
 
-from .filters import TitleFilter
+from . import batch
+from .filters import LatestCommentFilter, LatestReviewFilter, TitleFilter
+from .mail import send_confirmation_code
+from .mixins import (ArchiveMixin, CoalesceMixin, LatestMixin, MultiGetMixin,
+                     QueryBudgetMixin, RegistryListMixin, ValuesListMixin)
+from .pagination import KeysetPagination
 from .permissions import (IsAdmimOrModeratorOrReadOnly, IsAdmimOrReadOnly,
-                          IsAdminOrSuperUser)
-from .serializers import (CategorieSerializer, CommentSerializer,
+                          IsAdminOrSuperUser, IsModeratorOrAdmin)
+from .serializers import (BatchSerializer, CategorieSerializer,
+                          ChangeLogSerializer, CommentChangeSerializer,
+                          CommentSerializer, CommentValuesSerializer,
                           CustomTokenObtainPairSerializer, GenreSerializer,
-                          ReviewSerializer, SignupSerializer,
-                          TitleGetSerializer, TitlePostSerializer,
-                          UserMeSerializer, UserSerializer)
+                          ModerationSerializer, ReviewSerializer,
+                          ReviewValuesSerializer, SignupSerializer,
+                          SimilarTitleSerializer, TitleGetSerializer,
+                          TitlePostSerializer, TitleRankingSerializer,
+                          TitleStatsSerializer, TitleValuesSerializer,
+                          TopReviewSerializer, UserCommentSerializer,
+                          UserMeSerializer, UserReviewSerializer,
+                          UserSerializer)
+
+TITLE_EXPAND_FIELDS = ('reviews', 'comments')
+
+CHANGE_SOURCES = {
+    'title': (
+        Title.objects.alive().select_related('category').prefetch_related(
+            'genre'
+        ),
+        TitlePostSerializer
+    ),
+    'genre': (Genre.objects.all(), GenreSerializer),
+    'categorie': (Categorie.objects.all(), CategorieSerializer),
+    'review': (
+        Review.objects.visible().filter(
+            title__deleted_at__isnull=True
+        ).select_related('author'),
+        ReviewSerializer
+    ),
+    'comment': (
+        Comment.objects.visible().filter(
+            review__title__deleted_at__isnull=True
+        ).select_related('author'),
+        CommentChangeSerializer
+    ),
+}
+
+TOP_REVIEWS_ORDERING = {
+    'recent': ('-pub_date', '-id'),
+    'score': ('-score', '-pub_date', '-id'),
+}
 
 
 class CategorieViewSet(
+    RegistryListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -40,9 +90,11 @@ class CategorieViewSet(
     search_fields = ('name',)
     lookup_field = 'slug'
     permission_classes = [IsAdmimOrReadOnly]
+    registry = slugs.categories
 
 
 class GenreViewSet(
+    RegistryListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -61,9 +113,13 @@ class GenreViewSet(
     search_fields = ('name',)
     lookup_field = 'slug'
     permission_classes = [IsAdmimOrReadOnly]
+    registry = slugs.genres
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    QueryBudgetMixin, CoalesceMixin, MultiGetMixin, ValuesListMixin,
+    viewsets.ModelViewSet
+):
     """"Эндпоинт api/v1/titles/.
     GET: Получить список всех объектов.+ Права доступа: Доступно без токена.
     фильтры по genre__slug  и category__slug, name и year.
@@ -77,11 +133,37 @@ class TitleViewSet(viewsets.ModelViewSet):
     PATCH: получение инфы о произведении по id.
     Доступно только администратору.
     DEL: удаление произведения по id - только администратор.
+    Произведение сразу скрывается, а отзывы и комментарии удаляет
+    команда purge_deleted.
+    GET с ?expand=reviews,comments: вместе с произведением вернуть
+    последние (или с наивысшей оценкой при ?reviews_order=score) отзывы
+    и первые комментарии к ним, чтобы страница собиралась одним запросом.
+    Эндпоинт api/v1/titles/top/?period=&category=&genre=:
+    GET: лучшие произведения по байесовскому рейтингу из заранее
+    посчитанной таблицы (команда rebuild_rankings).
+    Эндпоинт api/v1/titles/id/stats/:
+    GET: число отзывов с каждой оценкой, среднее и медиана
+    из хранимой гистограммы. Доступно без токена.
+    Эндпоинт api/v1/titles/id/similar/:
+    GET: произведения, которые высоко оценили те же пользователи,
+    с учётом общих жанров, из заранее посчитанной таблицы
+    (команда rebuild_similar_titles). Доступно без токена.
+    GET api/v1/titles/id/ без токена отдаётся из общего кеша
+    (до COALESCE_TTL_SECONDS), одновременные запросы ждут одного расчёта.
+    GET api/v1/titles/?ids=1,2,3: произведения с рейтингом по списку id
+    в порядке запроса и список отсутствующих id (missing).
     """
-    queryset = Title.objects.all()
+    queryset = Title.objects.alive().select_related(
+        'category'
+    ).prefetch_related(
+        'genre'
+    )
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
     permission_classes = [IsAdmimOrReadOnly]
+    values_serializer_class = TitleValuesSerializer
+    lookup_value_regex = r'\d+'
+    coalesce_actions = ('retrieve',)
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
@@ -90,14 +172,143 @@ class TitleViewSet(viewsets.ModelViewSet):
         return TitlePostSerializer
 
     def retrieve(self, request, *args, **kwargs):
+        return self.coalesce(self.retrieve_title)
+
+    def retrieve_title(self):
         instance = self.get_object()
-        avg = Review.objects.filter(title=instance).aggregate(Avg('score'))
-        instance.rating = avg['score__avg']
+        instance.rating = self.get_stats(instance.id).mean
         serializer = self.get_serializer(instance)
+        data = serializer.data
+        expand = self.get_expand()
+        if expand:
+            data['reviews'] = self.get_top_reviews_data(
+                instance, with_comments='comments' in expand
+            )
+        return Response(data)
+
+    def perform_destroy(self, instance):
+        soft_delete_title(instance)
+
+    def prepare_objects(self, titles):
+        stats = TitleStats.objects.in_bulk([title.id for title in titles])
+        for title in titles:
+            title.rating = stats.get(title.id, TitleStats()).mean
+
+    def get_stats(self, title_id):
+        stats = TitleStats.objects.filter(title_id=title_id).first()
+        return stats or TitleStats(title_id=title_id)
+
+    @action(detail=True, url_path='stats')
+    def stats(self, request, pk=None):
+        stats = TitleStats.objects.filter(
+            title_id=pk, title__deleted_at__isnull=True
+        ).first()
+        if stats is None:
+            stats = TitleStats(
+                title=get_object_or_404(Title.objects.alive(), pk=pk)
+            )
+        return Response(TitleStatsSerializer(stats).data)
+
+    @action(detail=True, url_path='similar')
+    def similar(self, request, pk=None):
+        similar = list(SimilarTitle.objects.filter(
+            title_id=pk, title__deleted_at__isnull=True,
+            similar__deleted_at__isnull=True
+        ).select_related('similar__category').prefetch_related(
+            'similar__genre'
+        ).order_by('-score', 'similar_id'))
+        if not similar:
+            get_object_or_404(Title.objects.alive(), pk=pk)
+        serializer = SimilarTitleSerializer(
+            similar, many=True, context=self.get_serializer_context()
+        )
         return Response(serializer.data)
 
-
-class CommentViewSet(viewsets.ModelViewSet):
+    @action(detail=False, url_path='top')
+    def top(self, request):
+        period = request.query_params.get('period', 'all')
+        if period not in settings.RANKING_PERIODS:
+            raise serializers.ValidationError({
+                'period': (
+                    'Допустимые значения: '
+                    f'{", ".join(settings.RANKING_PERIODS)}.'
+                )
+            })
+        rankings = TitleRanking.objects.filter(period=period)
+        genre = request.query_params.get('genre')
+        if genre:
+            rankings = rankings.filter(genre__slug=genre)
+        else:
+            rankings = rankings.filter(genre__isnull=True)
+        category = request.query_params.get('category')
+        if category:
+            rankings = rankings.filter(category__slug=category)
+        rankings = rankings.select_related(
+            'title__category'
+        ).prefetch_related('title__genre').order_by('-rating', 'title_id')
+        page = self.paginate_queryset(rankings)
+        serializer = TitleRankingSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return self.get_paginated_response(serializer.data)
+
+    def get_expand(self):
+        expand = {
+            field for field in
+            self.request.query_params.get('expand', '').split(',')
+            if field
+        }
+        unknown = expand.difference(TITLE_EXPAND_FIELDS)
+        if unknown:
+            raise serializers.ValidationError({
+                'expand': (
+                    f'Допустимые значения: {", ".join(TITLE_EXPAND_FIELDS)}.'
+                )
+            })
+        return expand
+
+    def get_top_reviews_data(self, title, with_comments):
+        """Топ отзывов произведения и первые комментарии к ним.
+        Два запроса к БД при любом числе отзывов: отзывы с авторами
+        и комментарии с авторами (первые комментарии каждого отзыва
+        отбираются подзапросом с LIMIT).
+        """
+        order = self.request.query_params.get('reviews_order', 'recent')
+        if order not in TOP_REVIEWS_ORDERING:
+            raise serializers.ValidationError({
+                'reviews_order': (
+                    f'Допустимые значения: {", ".join(TOP_REVIEWS_ORDERING)}.'
+                )
+            })
+        reviews = title.reviews.visible().select_related('author').order_by(
+            *TOP_REVIEWS_ORDERING[order]
+        )
+        serializer_class = ReviewSerializer
+        if with_comments:
+            first_comments = Comment.objects.visible().filter(
+                review=OuterRef('review')
+            ).order_by('pub_date', 'id').values('pk')[
+                :settings.TITLE_EXPAND_COMMENTS_LIMIT
+            ]
+            reviews = reviews.prefetch_related(Prefetch(
+                'comments',
+                queryset=Comment.objects.filter(
+                    pk__in=Subquery(first_comments)
+                ).select_related('author').order_by('pub_date', 'id'),
+                to_attr='top_comments'
+            ))
+            serializer_class = TopReviewSerializer
+        return serializer_class(
+            reviews[:settings.TITLE_EXPAND_REVIEWS_LIMIT],
+            many=True,
+            context=self.get_serializer_context()
+        ).data
+
+
+class CommentViewSet(
+    QueryBudgetMixin, ArchiveMixin, MultiGetMixin, ValuesListMixin,
+    viewsets.ModelViewSet
+):
     """Эндпоинт /api/v1/titles/{title_id}/reviews/{review_id}/comments/.
     GET запрос: Получить список всех комментариев к отзыву по id.
     Права доступа: Доступно без токена.
@@ -108,26 +319,96 @@ class CommentViewSet(viewsets.ModelViewSet):
     Права доступа: Доступно без токена.
     PATCH и DEL запросы: частичное изменение или удаление комментария по id.
     Права доступа: Автор отзыва, модератор или администратор.
+    GET с ?archived=1: комментарии из архива (команда archive_reviews).
+    GET с ?ids=1,2,3: комментарии отзыва по списку id в порядке запроса.
+    POST с parent: ответ на комментарий того же отзыва, не глубже
+    COMMENT_MAX_DEPTH уровней.
+    GET с ?tree=1: ветка обсуждения в порядке обхода (ответы сразу после
+    родителя, depth - уровень), постранично. ?parent=<id> - только
+    ответы на этот комментарий, ?levels=<n> - только n уровней.
     """
     serializer_class = CommentSerializer
+    values_serializer_class = CommentValuesSerializer
     permission_classes = [IsAdmimOrModeratorOrReadOnly]
 
     def get_queryset(self):
-        review = get_object_or_404(
-            Review,
-            id=self.kwargs.get('review_id')
+        review_id = self.kwargs.get('review_id')
+        if self.is_archived():
+            if not self.detail and not any(
+                model.objects.visible().filter(
+                    id=review_id, title__deleted_at__isnull=True
+                ).exists()
+                for model in (Review, ArchivedReview)
+            ):
+                raise Http404
+            return ArchivedComment.objects.visible().filter(
+                review_id=review_id
+            ).select_related('author')
+        if not self.detail:
+            get_object_or_404(self.get_reviews(), id=review_id)
+        return Comment.objects.visible().filter(
+            review_id=review_id, review__title__deleted_at__isnull=True
+        ).select_related('author')
+
+    def get_reviews(self):
+        return Review.objects.visible().filter(
+            title__deleted_at__isnull=True
         )
-        return review.comments.all()
 
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.detail or self.request.query_params.get('tree') not in (
+            '1', 'true'
+        ):
+            return queryset
+        return self.get_thread(queryset)
+
+    def get_thread(self, queryset):
+        """Ветка одним запросом по индексу (review, path): у ответов
+        путь начинается с пути родителя, поэтому поддерево выбирается
+        по префиксу пути, а уровни отсекаются по depth.
+        """
+        params = self.request.query_params
+        depth = 0
+        if 'parent' in params:
+            parent = queryset.filter(
+                pk=self.get_positive_param('parent')
+            ).values_list('path', 'depth').first()
+            if parent is None:
+                raise Http404
+            path, depth = parent
+            queryset = queryset.filter(path__startswith=path).exclude(
+                path=path
+            )
+            depth += 1
+        if 'levels' in params:
+            queryset = queryset.filter(
+                depth__lt=depth + self.get_positive_param('levels')
+            )
+        return queryset.order_by('path')
+
+    def get_positive_param(self, name):
+        value = self.request.query_params[name]
+        if not value.isdigit() or not int(value):
+            raise serializers.ValidationError(
+                {name: 'Ожидается положительное число.'}
+            )
+        return int(value)
+
+    # Путь в ветке пишется сигналом после вставки, в той же транзакции
     def perform_create(self, serializer):
         review = get_object_or_404(
-            Review,
+            self.get_reviews(),
             id=self.kwargs.get('review_id')
         )
-        serializer.save(author=self.request.user, review=review)
+        with transaction.atomic():
+            serializer.save(author=self.request.user, review=review)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    QueryBudgetMixin, CoalesceMixin, ArchiveMixin, MultiGetMixin,
+    ValuesListMixin, viewsets.ModelViewSet
+):
     """Эндпоинт /api/v1/titles/{title_id}/reviews/.
     GET запрос: получение списка всех отзывов. Доступно без токена.
     POST запрос: добавить новый отзыв. Пользователь может оставить
@@ -138,29 +419,246 @@ class ReviewViewSet(viewsets.ModelViewSet):
     Права доступа: Доступно без токена.
     PATCH и DEL запросы: частичное изменение или удаление отзыва по id.
     Права доступа: Автор отзыва, модератор или администратор.
+    GET с ?archived=1: отзывы из архива (команда archive_reviews).
+    Список без токена отдаётся из общего кеша (до COALESCE_TTL_SECONDS).
+    GET с ?ids=1,2,3: отзывы произведения по списку id в порядке запроса.
     """
     serializer_class = ReviewSerializer
+    values_serializer_class = ReviewValuesSerializer
     permission_classes = [IsAdmimOrModeratorOrReadOnly]
+    coalesce_actions = ('list',)
 
     def get_queryset(self):
-        title = get_object_or_404(
-            Title,
-            id=self.kwargs.get('title_id'))
-        return title.reviews.all()
-
+        title_id = self.kwargs.get('title_id')
+        if not self.detail:
+            get_object_or_404(Title.objects.alive(), id=title_id)
+        model = ArchivedReview if self.is_archived() else Review
+        return model.objects.visible().filter(
+            title_id=title_id, title__deleted_at__isnull=True
+        ).select_related('author')
+
+    # Гистограмму оценок (TitleStats) сдвигают сигналы отзыва в той же
+    # транзакции.
     def perform_create(self, serializer):
         title = get_object_or_404(
-            Title,
+            Title.objects.alive(),
             id=self.kwargs.get('title_id'))
         serializer.save(author=self.request.user, title=title)
 
+    def lock_review(self, review):
+        """Отзыв, перечитанный с блокировкой строки: параллельные
+        изменение, удаление и модерация ждут конца транзакции,
+        и гистограмма сдвигается по актуальной оценке ровно один раз.
+        """
+        locked = Review.objects.select_for_update().filter(
+            pk=review.pk
+        ).first()
+        if locked is None:
+            raise Http404
+        # автор отзыва не меняется, он уже загружен вместе с отзывом
+        locked.author = review.author
+        return locked
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            serializer.instance = self.lock_review(serializer.instance)
+            serializer.save()
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            self.lock_review(instance).delete()
+
+
+class LatestReviewViewSet(
+    QueryBudgetMixin, LatestMixin, mixins.ListModelMixin,
+    viewsets.GenericViewSet
+):
+    """Эндпоинт api/v1/reviews/latest/.
+    GET запрос: последние отзывы ко всем произведениям, от новых
+    к старым. Фильтры по genre и category (slug). Страницы по курсору:
+    next из ответа передаётся в ?cursor=, размер страницы - ?limit=.
+    Первая страница без токена отдаётся из общего кеша.
+    Права доступа: Доступно без токена.
+    """
+    queryset = Review.objects.visible().filter(
+        title__deleted_at__isnull=True
+    ).select_related('author')
+    serializer_class = ReviewSerializer
+    permission_classes = [AllowAny, ]
+    pagination_class = KeysetPagination
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = LatestReviewFilter
+
+
+class LatestCommentViewSet(
+    QueryBudgetMixin, LatestMixin, mixins.ListModelMixin,
+    viewsets.GenericViewSet
+):
+    """Эндпоинт api/v1/comments/latest/.
+    GET запрос: последние комментарии ко всем отзывам, с id отзыва,
+    как api/v1/reviews/latest/.
+    Права доступа: Доступно без токена.
+    """
+    queryset = Comment.objects.visible().filter(
+        review__is_hidden=False, review__title__deleted_at__isnull=True
+    ).select_related('author')
+    serializer_class = CommentChangeSerializer
+    permission_classes = [AllowAny, ]
+    pagination_class = KeysetPagination
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = LatestCommentFilter
+
+
+class ChangeViewSet(
+    QueryBudgetMixin, mixins.ListModelMixin, viewsets.GenericViewSet
+):
+    """Эндпоинт api/v1/changes/?since=<cursor>&limit=<n>.
+    GET запрос: изменения произведений, жанров, категорий, отзывов
+    и комментариев после курсора since в порядке записи в журнал.
+    Для созданных и изменённых объектов data - их текущее состояние,
+    для удалённых - None. В ответе next - курсор для следующего запроса.
+    Права доступа: Доступно без токена.
+    """
+    serializer_class = ChangeLogSerializer
+    permission_classes = [AllowAny, ]
+    pagination_class = None
+
+    def get_queryset(self):
+        # id выдаётся при вставке, и запись из ещё не закоммиченной
+        # транзакции может появиться позже записей с большим id:
+        # отдаём только записи до начала самой старой такой транзакции
+        return ChangeLog.objects.settled()
+
+    def get_int_param(self, name, default, max_value=None):
+        value = self.request.query_params.get(name, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise serializers.ValidationError({name: 'Ожидается число.'})
+        if value < 0:
+            raise serializers.ValidationError(
+                {name: 'Ожидается неотрицательное число.'}
+            )
+        return value if max_value is None else min(value, max_value)
+
+    def get_changed_objects(self, changes):
+        """Текущее состояние изменённых объектов: по запросу на модель."""
+        ids = {}
+        for change in changes:
+            if change.action != ChangeLog.DELETED:
+                ids.setdefault(change.model, set()).add(change.object_id)
+        objects = {}
+        context = self.get_serializer_context()
+        for model, object_ids in ids.items():
+            queryset, serializer_class = CHANGE_SOURCES[model]
+            for obj in queryset.filter(pk__in=object_ids):
+                objects[(model, obj.pk)] = serializer_class(
+                    obj, context=context
+                ).data
+        return objects
+
+    def list(self, request, *args, **kwargs):
+        since = self.get_int_param('since', 0)
+        limit = self.get_int_param(
+            'limit', settings.CHANGES_PAGE_SIZE, settings.CHANGES_MAX_PAGE_SIZE
+        )
+        changes = list(
+            self.get_queryset().filter(id__gt=since)[:limit + 1]
+        )
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        context = self.get_serializer_context()
+        context['objects'] = self.get_changed_objects(changes)
+        serializer = self.get_serializer_class()(
+            changes, many=True, context=context
+        )
+        return Response({
+            'next': changes[-1].id if changes else since,
+            'has_more': has_more,
+            'results': serializer.data,
+        })
+
+
+class BatchViewSet(viewsets.GenericViewSet):
+    """Эндпоинт api/v1/batch/.
+    POST запрос: список вложенных запросов (method, path, body)
+    выполняется внутри процесса через те же URL и представления,
+    с правами текущего пользователя. В ответе - status и body каждого
+    в порядке запросов. Подряд идущие GET выполняются параллельно
+    при BATCH_WORKERS > 1. Каждый вложенный запрос - отдельная
+    транзакция.
+    Права доступа: Доступно без токена, права проверяет каждый
+    вложенный запрос.
+    """
+    serializer_class = BatchSerializer
+    permission_classes = [AllowAny, ]
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({'responses': batch.run(
+            request, serializer.validated_data['requests']
+        )})
+
+
+class ModerationViewSet(viewsets.GenericViewSet):
+    """Эндпоинт api/v1/moderation/.
+    POST запрос: удалить (action=delete) или скрыть (action=hide)
+    отзывы или комментарии (target=reviews|comments) по списку id,
+    автору и периоду публикации одной транзакцией, без загрузки объектов.
+    С отзывами удаляются их комментарии. В ответе - число затронутых
+    отзывов и комментариев.
+    Права доступа: Модератор или администратор.
+    """
+    serializer_class = ModerationSerializer
+    permission_classes = [IsModeratorOrAdmin, ]
+
+    def get_moderated_queryset(self, data):
+        if data['target'] == ModerationSerializer.REVIEWS:
+            model = Review
+        else:
+            model = Comment
+        lookups = {}
+        if 'ids' in data:
+            lookups['pk__in'] = data['ids']
+        if 'author' in data:
+            lookups['author'] = data['author']
+        if 'since' in data:
+            lookups['pub_date__gte'] = data['since']
+        if 'until' in data:
+            lookups['pub_date__lt'] = data['until']
+        return model.objects.filter(**lookups)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        queryset = self.get_moderated_queryset(data)
+        reviews = comments = 0
+        if data['action'] == ModerationSerializer.HIDE:
+            if queryset.model is Review:
+                reviews = hide(queryset)
+            else:
+                comments = hide(queryset)
+        elif queryset.model is Review:
+            reviews, comments = delete_reviews(queryset)
+        else:
+            comments = delete_comments(queryset)
+        return Response({'reviews': reviews, 'comments': comments})
+
 
 class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all()
+    """DEL удаляет пользователя мягко: он скрыт и не может войти,
+    а отзывы и комментарии удаляет команда purge_deleted.
+    """
+    queryset = User.objects.alive()
     serializer_class = UserSerializer
     lookup_field = 'username'
     permission_classes = [IsAdminOrSuperUser, ]
 
+    def perform_destroy(self, instance):
+        soft_delete_user(instance)
+
 
 class UserMeViewSet(
         mixins.RetrieveModelMixin,
@@ -171,13 +669,70 @@ class UserMeViewSet(
     serializer_class = UserMeSerializer
 
     def get_object(self):
-        queryset = self.filter_queryset(self.get_queryset())
-        obj = queryset.get(username=self.request.user.username)
+        obj = self.request.user
         self.check_object_permissions(self.request, obj)
 
         return obj
 
 
+class UserReviewViewSet(
+    QueryBudgetMixin, mixins.ListModelMixin, viewsets.GenericViewSet
+):
+    """Эндпоинт api/v1/users/{username}/reviews/.
+    GET запрос: отзывы пользователя от новых к старым, с названием
+    произведения. Страницы по курсору, как api/v1/reviews/latest/.
+    Права доступа: Доступно без токена.
+    """
+    serializer_class = UserReviewSerializer
+    permission_classes = [AllowAny, ]
+    pagination_class = KeysetPagination
+
+    def get_author(self):
+        return get_object_or_404(
+            User.objects.alive(), username=self.kwargs['username']
+        )
+
+    def get_queryset(self):
+        return Review.objects.visible().filter(
+            author=self.get_author(), title__deleted_at__isnull=True
+        ).select_related('author', 'title')
+
+
+class UserCommentViewSet(UserReviewViewSet):
+    """Эндпоинт api/v1/users/{username}/comments/.
+    GET запрос: комментарии пользователя от новых к старым, с id
+    отзыва и названием произведения.
+    Права доступа: Доступно без токена.
+    """
+    serializer_class = UserCommentSerializer
+
+    def get_queryset(self):
+        return Comment.objects.visible().filter(
+            author=self.get_author(), review__is_hidden=False,
+            review__title__deleted_at__isnull=True
+        ).select_related('author', 'review__title')
+
+
+class UserMeReviewViewSet(UserReviewViewSet):
+    """Эндпоинт api/v1/users/me/reviews/: свои отзывы.
+    Права доступа: Аутентифицированные пользователи.
+    """
+    permission_classes = [IsAuthenticated, ]
+
+    def get_author(self):
+        return self.request.user
+
+
+class UserMeCommentViewSet(UserCommentViewSet):
+    """Эндпоинт api/v1/users/me/comments/: свои комментарии.
+    Права доступа: Аутентифицированные пользователи.
+    """
+    permission_classes = [IsAuthenticated, ]
+
+    def get_author(self):
+        return self.request.user
+
+
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
     permission_classes = [AllowAny, ]
@@ -193,61 +748,21 @@ class SignupViewSet(
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
-        try:
-            email = serializer.initial_data['email']
-            username = serializer.initial_data['username']
-        except KeyError:
-            serializer.is_valid(raise_exception=True)
-            self.perform_create(serializer)
-            headers = self.get_success_headers(serializer.data)
-
-            return Response(
-                serializer.data,
-                status=status.HTTP_201_CREATED,
-                headers=headers
-            )
-
-        if not User.objects.filter(username=username, email=email).exists():
-            serializer.is_valid(raise_exception=True)
-            self.perform_create(serializer)
-            headers = self.get_success_headers(serializer.data)
-
-            return Response(
-                serializer.data,
-                status=status.HTTP_200_OK,
-                headers=headers
+        serializer.is_valid(raise_exception=True)
+        username = serializer.validated_data['username']
+        email = serializer.validated_data['email']
+        user_id = User.objects.signup(username, email)
+        if user_id is None:
+            raise serializers.ValidationError(
+                serializer.get_conflict_errors(username)
             )
-        confirmation_code = get_random_string(
-            length=settings.CONFIRMATION_CODE_LENGTH
+        send_confirmation_code(
+            email, get_code_store().issue(user_id, username)
         )
-        User.objects.filter(
-            username=username
-        ).update(confirmation_code=confirmation_code)
-        send_mail(
-            'Ваш код подтверждения ',
-            f'"confirmation_code": "{confirmation_code}" ',
-            settings.EMAIL_SENDER,
-            [f'{email}'],
-            fail_silently=False,
-        )
-        headers = self.get_success_headers(serializer.initial_data)
+        headers = self.get_success_headers(serializer.data)
 
         return Response(
-            serializer.initial_data,
+            serializer.data,
             status=status.HTTP_200_OK,
             headers=headers
         )
-
-    def perform_create(self, serializer):
-        email = serializer.validated_data['email']
-        confirmation_code = get_random_string(
-            length=settings.CONFIRMATION_CODE_LENGTH
-        )
-        send_mail(
-            'Ваш код подтверждения ',
-            f'"confirmation_code": "{confirmation_code}" ',
-            settings.EMAIL_SENDER,
-            [f'{email}'],
-            fail_silently=False,
-        )
-        serializer.save(confirmation_code=confirmation_code)
@@ -0,0 +1,76 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.http import JsonResponse
+
+# Результат проверок готовности в этом процессе: (время, проверки)
+_ready_result = (None, {})
+# Применённые миграции не откатываются без нового кода, поэтому после
+# первой успешной проверки граф миграций больше не загружается.
+_migrated = False
+
+
+def check_database():
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+def check_migrations():
+    global _migrated
+    if _migrated:
+        return
+    executor = MigrationExecutor(connections[DEFAULT_DB_ALIAS])
+    if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+        raise RuntimeError('есть непримененные миграции')
+    _migrated = True
+
+
+def check_cache():
+    cache.set('health:ready', 1, settings.HEALTH_CHECK_CACHE_SECONDS)
+    if cache.get('health:ready') != 1:
+        raise RuntimeError('кеш не вернул записанное значение')
+
+
+READY_CHECKS = {
+    'database': check_database,
+    'migrations': check_migrations,
+    'cache': check_cache,
+}
+
+
+def run_checks():
+    checks = {}
+    for name, check in READY_CHECKS.items():
+        try:
+            check()
+        except Exception as error:
+            checks[name] = str(error) or error.__class__.__name__
+        else:
+            checks[name] = 'ok'
+    return checks
+
+
+def live(request):
+    """Процесс жив и отвечает. Зависимости не проверяются."""
+    return JsonResponse({'status': 'ok'})
+
+
+def ready(request):
+    """Готовность принимать трафик: БД, миграции и кеш.
+    Результат кешируется в процессе на HEALTH_CHECK_CACHE_SECONDS,
+    чтобы частые проверки балансировщика не нагружали БД.
+    """
+    global _ready_result
+    checked, checks = _ready_result
+    now = time.monotonic()
+    if checked is None or now - checked > settings.HEALTH_CHECK_CACHE_SECONDS:
+        checks = run_checks()
+        _ready_result = (now, checks)
+    ok = all(result == 'ok' for result in checks.values())
+    return JsonResponse(
+        {'status': 'ok' if ok else 'unavailable', 'checks': checks},
+        status=200 if ok else 503
+    )
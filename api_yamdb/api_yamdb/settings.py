@@ -61,7 +61,23 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='qwerty'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+    }
+}
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default']['OPTIONS'] = {
+        'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', default=3)),
+    }
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
     }
 }
 
@@ -107,8 +123,18 @@ EMAIL_SENDER = 'from@example.com'
 
 CONFIRMATION_CODE_LENGTH = 6
 
+CONFIRMATION_CODE_TTL = timedelta(hours=1)
+
+CONFIRMATION_CODE_MAX_ATTEMPTS = 5
+
+CONFIRMATION_CODE_STORE = os.getenv(
+    'CONFIRMATION_CODE_STORE', default='users.codes.DatabaseCodeStore'
+)
+
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+EMAIL_SEND_WORKERS = int(os.getenv('EMAIL_SEND_WORKERS', default=2))
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -117,12 +143,98 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.CappedLimitOffsetPagination',
     'PAGE_SIZE': 10
 }
 
+VALUES_SERIALIZERS = os.getenv('VALUES_SERIALIZERS', default='False') == 'True'
+
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=14),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
+
+TITLE_EXPAND_REVIEWS_LIMIT = 5
+
+TITLE_EXPAND_COMMENTS_LIMIT = 3
+
+CHANGES_PAGE_SIZE = 100
+
+CHANGES_MAX_PAGE_SIZE = 1000
+
+CHANGES_FEED_LAG = timedelta(seconds=2)
+
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 100000
+
+ADMIN_TEXT_PREVIEW_LENGTH = 50
+
+BULK_BATCH_SIZE = 1000
+
+MODERATION_MAX_IDS = 10000
+
+RANKING_PERIODS = {
+    'all': None,
+    'month': timedelta(days=30),
+    'week': timedelta(days=7),
+}
+
+RANKING_PRIOR_WEIGHT = 10
+
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', default=365))
+
+SLUG_REGISTRY_CHECK_SECONDS = 1
+
+HEALTH_CHECK_CACHE_SECONDS = 2
+
+COALESCE_TTL_SECONDS = int(os.getenv('COALESCE_TTL_SECONDS', default=10))
+
+COALESCE_LEASE_SECONDS = 5
+
+COALESCE_POLL_SECONDS = 0.05
+
+COALESCE_EARLY_REFRESH_BETA = 1.0
+
+PAGINATION_MAX_LIMIT = 100
+
+PAGINATION_MAX_OFFSET = 10000
+
+MULTI_GET_MAX_IDS = 200
+
+BATCH_MAX_REQUESTS = 20
+
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', default=1))
+
+QUERY_BUDGETS = {
+    'titles.list': 2000,
+    'titles.top': 1000,
+    'reviews.list': 1000,
+    'comments.list': 1000,
+    'changes.list': 3000,
+    'reviews-latest.list': 1000,
+    'comments-latest.list': 1000,
+    'user-reviews.list': 1000,
+    'user-comments.list': 1000,
+}
+
+LOAD_SHED_MAX_IN_FLIGHT = int(os.getenv('LOAD_SHED_MAX_IN_FLIGHT', default=20))
+
+LOAD_SHED_WINDOW_SECONDS = 60
+
+LOAD_SHED_BUCKET_SECONDS = 5
+
+LOAD_SHED_RETRY_AFTER = 2
+
+SIMILAR_TITLES_LIMIT = 10
+
+SIMILAR_MIN_SCORE = 7
+
+SIMILAR_GENRE_WEIGHT = 1.0
+
+COMMENT_MAX_DEPTH = 20
+
+LATEST_HEAD_SIZE = 50
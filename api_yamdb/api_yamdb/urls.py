@@ -1,8 +1,12 @@
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 from django.views.generic import TemplateView
 
+from . import health
+
 urlpatterns = [
+    re_path(r'^health/live/?$', health.live, name='health-live'),
+    re_path(r'^health/ready/?$', health.ready, name='health-ready'),
     path('admin/', admin.site.urls),
     path('api/', include('api.urls', namespace='api')),
     path(
@@ -0,0 +1,40 @@
+import os
+
+bind = '0:8000'
+workers = int(os.getenv('GUNICORN_WORKERS', default=2))
+
+# Приложение импортируется один раз в мастере, воркеры получают его
+# готовым через fork и стартуют быстрее.
+preload_app = True
+
+
+def on_starting(server):
+    """Несколько воркеров должны делить кеш: в нём версии реестров
+    slug, счётчик сброса нагрузки и метрики склейки запросов.
+    LocMemCache у каждого процесса свой, с ним воркеры расходятся молча.
+    """
+    from django.conf import settings
+    backend = settings.CACHES['default']['BACKEND']
+    if server.cfg.workers > 1 and backend.endswith('.LocMemCache'):
+        raise RuntimeError(
+            f'{backend} не общий для {server.cfg.workers} воркеров: '
+            'укажите CACHE_BACKEND и CACHE_LOCATION (memcached) '
+            'или GUNICORN_WORKERS=1.'
+        )
+
+
+def when_ready(server):
+    """Импорт URLconf (views, serializers) до запуска воркеров."""
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+
+
+def post_worker_init(worker):
+    """Соединение с БД открывается до первого запроса.
+    В мастере соединений нет: fork не должен делить их между воркерами.
+    """
+    from django.db import connection
+    try:
+        connection.ensure_connection()
+    except Exception as error:
+        worker.log.warning('БД недоступна при старте воркера: %s', error)
@@ -1,21 +1,132 @@
+from django.conf import settings
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Exists, OuterRef
+from django.utils.functional import cached_property
+from django.utils.text import Truncator
 
+from . import slugs
 from .models import Categorie, Comment, Genre, Review, Title, TitleGenre
 
 
-class TitlesAdmin(admin.ModelAdmin):
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор для больших таблиц.
+    Без фильтров берёт число строк из статистики Postgres (pg_class),
+    а не считает COUNT(*) по всей таблице.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if not queryset.query.where and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class '
+                    'WHERE relname = %s',
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] > settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return row[0]
+        return super().count
+
+
+class ScoreFilter(admin.SimpleListFilter):
+    """Фильтр по оценке без SELECT DISTINCT по всей таблице."""
+    title = 'оценка'
+    parameter_name = 'score'
+
+    def lookups(self, request, model_admin):
+        return [(score, score) for score in range(1, 11)]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(score=self.value())
+        return queryset
+
+
+class GenreFilter(admin.SimpleListFilter):
+    """Фильтр по жанру через EXISTS вместо JOIN с DISTINCT по всей
+    таблице произведений. Список жанров - из реестра slug.
+    """
+    title = 'жанр'
+    parameter_name = 'genre'
+
+    def lookups(self, request, model_admin):
+        return [(genre.slug, genre.name) for genre in slugs.genres.objects()]
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        return queryset.annotate(has_genre=Exists(TitleGenre.objects.filter(
+            title=OuterRef('pk'), genre_id=slugs.genres.get_id(self.value())
+        ))).filter(has_genre=True)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Общие настройки для таблиц с миллионами строк."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    empty_value_display = '-пусто-'
+
+    def short_text(self, obj):
+        return Truncator(obj.text).chars(settings.ADMIN_TEXT_PREVIEW_LENGTH)
+    short_text.short_description = 'Текст'
+
+
+class TitlesAdmin(LargeTableAdmin):
 
     list_display = (
-        'pk', 'name', 'year', 'description',
+        'pk', 'name', 'year', 'category', 'short_description',
     )
+    list_select_related = ('category',)
     search_fields = ('name',)
-    list_filter = ('name',)
-    empty_value_display = '-пусто-'
+    list_filter = ('category', GenreFilter)
+
+    def short_description(self, obj):
+        return Truncator(obj.description).chars(
+            settings.ADMIN_TEXT_PREVIEW_LENGTH
+        )
+    short_description.short_description = 'Описание'
+
+
+class TitleGenreAdmin(LargeTableAdmin):
+
+    list_display = ('pk', 'title', 'genre')
+    list_select_related = ('title', 'genre')
+    list_filter = ('genre',)
+    raw_id_fields = ('title', 'genre')
+
+
+class ReviewAdmin(LargeTableAdmin):
+
+    list_display = (
+        'pk', 'short_text', 'title', 'author', 'score', 'pub_date',
+    )
+    list_select_related = ('title', 'author')
+    list_filter = (ScoreFilter, 'is_hidden')
+    search_fields = ('=author__username',)
+    raw_id_fields = ('title', 'author')
+
+
+class CommentAdmin(LargeTableAdmin):
+
+    list_display = ('pk', 'short_text', 'review_id', 'author', 'pub_date')
+    list_select_related = ('author',)
+    list_filter = ('is_hidden',)
+    search_fields = ('=author__username',)
+    raw_id_fields = ('review', 'author')
+
+    def review_id(self, obj):
+        return obj.review_id
+    review_id.short_description = 'Отзыв'
 
 
 admin.site.register(Title, TitlesAdmin)
 admin.site.register(Genre)
 admin.site.register(Categorie)
-admin.site.register(TitleGenre)
-admin.site.register(Review)
-admin.site.register(Comment)
+admin.site.register(TitleGenre, TitleGenreAdmin)
+admin.site.register(Review, ReviewAdmin)
+admin.site.register(Comment, CommentAdmin)
@@ -0,0 +1,104 @@
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+
+from .models import ArchivedComment, ArchivedReview, Comment, Review
+from .moderation import chunked
+
+
+def score_totals(title_ids, since=None):
+    """Число видимых отзывов и сумма оценок по произведениям
+    из основной и архивной таблиц: {title_id: (число, сумма)}.
+    """
+    totals = {}
+    for model in (Review, ArchivedReview):
+        reviews = model.objects.visible().filter(title_id__in=title_ids)
+        if since is not None:
+            reviews = reviews.filter(pub_date__gte=since)
+        rows = reviews.values('title_id').annotate(
+            review_count=Count('id'), score_sum=Sum('score')
+        ).order_by().values_list('title_id', 'review_count', 'score_sum')
+        for title_id, review_count, score_sum in rows:
+            count, total = totals.get(title_id, (0, 0))
+            totals[title_id] = (count + review_count, total + score_sum)
+    return totals
+
+
+def move_rows(model, archive_model, field, values):
+    """INSERT ... SELECT в архивную таблицу и DELETE из основной
+    для строк с field IN values. Колонки в таблицах совпадают.
+    """
+    quote = connection.ops.quote_name
+    columns = ', '.join(
+        quote(archive_field.column)
+        for archive_field in archive_model._meta.concrete_fields
+    )
+    placeholders = ', '.join(['%s'] * len(values))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(archive_model._meta.db_table)} ({columns}) '
+            f'SELECT {columns} FROM {quote(model._meta.db_table)} '
+            f'WHERE {quote(field)} IN ({placeholders})',
+            values
+        )
+        queryset = model.objects.filter(**{f'{field}__in': values})
+        queryset._raw_delete(queryset.db)
+        return cursor.rowcount
+
+
+def archive_batch(model, cutoff, batch_size):
+    """Очередная пачка id старше cutoff, заблокированная до конца
+    транзакции.
+    """
+    return list(
+        model.objects.filter(pub_date__lt=cutoff).order_by('pk')
+        .select_for_update().values_list('pk', flat=True)[:batch_size]
+    )
+
+
+def archive(cutoff, batch_size):
+    """Переносит в архив отзывы старше cutoff вместе со всеми их
+    комментариями, затем старые комментарии остальных отзывов.
+    Каждая пачка - отдельная транзакция, чтобы не держать блокировки
+    на всю таблицу. Возвращает число перенесённых отзывов и комментариев.
+    """
+    reviews = comments = 0
+    while True:
+        with transaction.atomic():
+            review_ids = archive_batch(Review, cutoff, batch_size)
+            if not review_ids:
+                break
+            comments += move_rows(
+                Comment, ArchivedComment, 'review_id', review_ids
+            )
+            reviews += move_rows(Review, ArchivedReview, 'id', review_ids)
+    while True:
+        with transaction.atomic():
+            comment_ids = archive_batch(Comment, cutoff, batch_size)
+            if not comment_ids:
+                break
+            comments += move_rows(Comment, ArchivedComment, 'id', comment_ids)
+    return reviews, comments
+
+
+def purge_orphan_comments(batch_size):
+    """Архивные комментарии удалённых отзывов: у review_id нет
+    внешнего ключа, и каскадное удаление до них не доходит.
+    """
+    review_ids = set(ArchivedComment.objects.values_list(
+        'review_id', flat=True
+    ).distinct())
+    orphans = []
+    for chunk in chunked(sorted(review_ids), batch_size):
+        existing = set(Review.objects.filter(
+            pk__in=chunk
+        ).values_list('pk', flat=True))
+        existing.update(ArchivedReview.objects.filter(
+            pk__in=chunk
+        ).values_list('pk', flat=True))
+        orphans.extend(set(chunk).difference(existing))
+    deleted = 0
+    for chunk in chunked(orphans, batch_size):
+        deleted += ArchivedComment.objects.filter(
+            review_id__in=chunk
+        )._raw_delete(ArchivedComment.objects.db)
+    return deleted
@@ -0,0 +1,359 @@
+import csv
+from collections import namedtuple
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import AutoField
+from users.models import User
+
+from . import slugs, stats, threads
+from .models import Categorie, Comment, Genre, Review, Title, TitleGenre
+
+CsvTable = namedtuple(
+    'CsvTable', ['model', 'columns', 'optional'], defaults=[()]
+)
+
+# Файлы в порядке загрузки: сначала таблицы, на которые ссылаются.
+# columns: колонка CSV -> атрибут модели. optional - колонки, которых
+# может не быть в файле (нет в static/data), выгружаются всегда.
+CSV_TABLES = {
+    'users': CsvTable(User, {
+        'id': 'id', 'username': 'username', 'email': 'email',
+        'role': 'role', 'bio': 'bio', 'first_name': 'first_name',
+        'last_name': 'last_name',
+    }),
+    'category': CsvTable(Categorie, {
+        'id': 'id', 'name': 'name', 'slug': 'slug',
+    }),
+    'genre': CsvTable(Genre, {
+        'id': 'id', 'name': 'name', 'slug': 'slug',
+    }),
+    'titles': CsvTable(Title, {
+        'id': 'id', 'name': 'name', 'year': 'year',
+        'category': 'category_id', 'description': 'description',
+    }, ('description',)),
+    'genre_title': CsvTable(TitleGenre, {
+        'id': 'id', 'title_id': 'title_id', 'genre_id': 'genre_id',
+    }),
+    'review': CsvTable(Review, {
+        'id': 'id', 'title_id': 'title_id', 'text': 'text',
+        'author': 'author_id', 'score': 'score', 'pub_date': 'pub_date',
+        'is_hidden': 'is_hidden',
+    }, ('is_hidden',)),
+    'comments': CsvTable(Comment, {
+        'id': 'id', 'review_id': 'review_id', 'text': 'text',
+        'author': 'author_id', 'pub_date': 'pub_date',
+        'is_hidden': 'is_hidden', 'parent': 'parent_id', 'depth': 'depth',
+    }, ('is_hidden', 'parent', 'depth')),
+}
+
+INVALID_SAMPLE_SIZE = 5
+
+
+@contextmanager
+def explicit_pub_date():
+    """bulk_create с auto_now_add перезаписывает pub_date текущим
+    временем, а при загрузке даты должны остаться как есть.
+    """
+    fields = [model._meta.get_field('pub_date') for model in (Review, Comment)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def get_fields(table, header=None):
+    """Колонка CSV -> поле модели, для загрузки - только колонки файла."""
+    fields = {
+        field.attname: field for field in table.model._meta.concrete_fields
+    }
+    return {
+        column: fields[attname] for column, attname in table.columns.items()
+        if header is None or column in header
+    }
+
+
+def check_header(table, header):
+    required = set(table.columns).difference(table.optional)
+    if not required.issubset(header) or not set(header).issubset(
+        table.columns
+    ):
+        raise CommandError(
+            f'Ожидались колонки {", ".join(table.columns)} '
+            f'(необязательные: {", ".join(table.optional) or "нет"}), '
+            f'в файле: {", ".join(header)}.'
+        )
+
+
+def is_checked_relation(table, field):
+    """Внешний ключ, который проверяется при загрузке. Родитель
+    комментария может быть в том же файле или удалён (ветка
+    с сиротами), поэтому не проверяется.
+    """
+    return field.is_relation and field.related_model is not table.model
+
+
+def invalid_rows_error(table, column, values):
+    return CommandError(
+        f'{table.model._meta.model_name}.{column}: нет объектов с id '
+        f'{", ".join(str(value) for value in values)}. '
+        'Загрузите их раньше или запустите с --skip-invalid.'
+    )
+
+
+def use_copy():
+    return connection.vendor == 'postgresql'
+
+
+def cast_type(field):
+    if isinstance(field, AutoField):
+        return field.rel_db_type(connection)
+    return field.db_type(connection)
+
+
+def drop_indexes(cursor, model):
+    """Удаляет индексы таблицы, кроме индексов ограничений
+    (первичный ключ, unique). Возвращает их определения.
+    """
+    table = model._meta.db_table
+    cursor.execute(
+        'SELECT indexname, indexdef FROM pg_indexes '
+        'WHERE schemaname = current_schema() AND tablename = %s '
+        'AND indexname NOT IN ('
+        '    SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass'
+        ')',
+        [table, connection.ops.quote_name(table)]
+    )
+    indexes = cursor.fetchall()
+    for name, _ in indexes:
+        cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+    return [definition for _, definition in indexes]
+
+
+def check_foreign_keys(cursor, table, staging, fields, skip_invalid):
+    """Один запрос на внешний ключ по всей временной таблице.
+    Возвращает число отброшенных строк.
+    """
+    quote = connection.ops.quote_name
+    invalid = 0
+    for column, field in fields.items():
+        if not is_checked_relation(table, field):
+            continue
+        target = field.related_model._meta
+        condition = (
+            f'{quote(column)} IS NOT NULL AND NOT EXISTS ('
+            f'SELECT 1 FROM {quote(target.db_table)} t '
+            f'WHERE t.{quote(target.pk.column)} = '
+            f'{staging}.{quote(column)}::{cast_type(field)})'
+        )
+        if skip_invalid:
+            cursor.execute(f'DELETE FROM {staging} WHERE {condition}')
+            invalid += cursor.rowcount
+            continue
+        cursor.execute(
+            f'SELECT {quote(column)} FROM {staging} WHERE {condition} '
+            f'LIMIT {INVALID_SAMPLE_SIZE}'
+        )
+        values = [value for value, in cursor.fetchall()]
+        if values:
+            raise invalid_rows_error(table, column, values)
+    return invalid
+
+
+def insert_from_staging(cursor, model, staging, fields):
+    """INSERT ... SELECT с приведением типов. Поля, которых нет в CSV,
+    заполняются значениями по умолчанию из модели.
+    """
+    quote = connection.ops.quote_name
+    targets, selects, params = [], [], []
+    for column, field in fields.items():
+        value = f'{staging}.{quote(column)}'
+        if not field.null and field.empty_strings_allowed:
+            value = f"COALESCE({value}, '')"
+        targets.append(quote(field.column))
+        selects.append(f'{value}::{cast_type(field)}')
+    for field in model._meta.concrete_fields:
+        if field.primary_key or field in fields.values():
+            continue
+        targets.append(quote(field.column))
+        selects.append('%s')
+        params.append(
+            field.get_db_prep_save(field.get_default(), connection)
+        )
+    cursor.execute(
+        f'INSERT INTO {quote(model._meta.db_table)} '
+        f'({", ".join(targets)}) '
+        f'SELECT {", ".join(selects)} FROM {staging} '
+        'ON CONFLICT DO NOTHING',
+        params
+    )
+    return cursor.rowcount
+
+
+def copy_import(table, path, skip_invalid=False, rebuild_indexes=False):
+    """Загрузка через COPY во временную таблицу, проверка внешних ключей
+    и INSERT ... SELECT в целевую таблицу.
+    Возвращает число добавленных и отброшенных строк.
+    """
+    model = table.model
+    quote = connection.ops.quote_name
+    staging = quote(f'staging_{model._meta.db_table}')
+    with transaction.atomic(), connection.cursor() as cursor:
+        with open(path, encoding='utf-8') as source:
+            header = next(csv.reader([source.readline()]))
+            check_header(table, header)
+            fields = get_fields(table, header)
+            cursor.execute(f'DROP TABLE IF EXISTS {staging}')
+            cursor.execute(
+                f'CREATE TEMPORARY TABLE {staging} ('
+                f'{", ".join(f"{quote(column)} text" for column in header)}'
+                ') ON COMMIT DROP'
+            )
+            cursor.copy_expert(
+                f'COPY {staging} '
+                f'({", ".join(quote(column) for column in header)}) '
+                'FROM STDIN WITH (FORMAT csv)',
+                source
+            )
+        invalid = check_foreign_keys(
+            cursor, table, staging, fields, skip_invalid
+        )
+        indexes = drop_indexes(cursor, model) if rebuild_indexes else []
+        inserted = insert_from_staging(cursor, model, staging, fields)
+        if indexes:
+            # внешние ключи Django отложенные, а CREATE INDEX не строится
+            # при непроверенных ограничениях
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        for definition in indexes:
+            cursor.execute(definition)
+        for sql in connection.ops.sequence_reset_sql(no_style(), [model]):
+            cursor.execute(sql)
+        cursor.execute(f'ANALYZE {quote(model._meta.db_table)}')
+    return inserted, invalid
+
+
+def read_batches(reader):
+    batch = []
+    for row in reader:
+        batch.append(row)
+        if len(batch) == settings.BULK_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def batch_import(table, path, skip_invalid=False):
+    """Загрузка пачками через bulk_create для SQLite и других СУБД.
+    Внешние ключи проверяются одним запросом на ключ и пачку.
+    """
+    model = table.model
+    invalid = 0
+    with transaction.atomic(), explicit_pub_date():
+        # bulk_create с ignore_conflicts не сообщает, сколько строк вставлено
+        count = model.objects.count()
+        with open(path, encoding='utf-8', newline='') as source:
+            reader = csv.DictReader(source)
+            check_header(table, reader.fieldnames)
+            fields = get_fields(table, reader.fieldnames)
+            for batch in read_batches(reader):
+                objects = [
+                    model(**{
+                        field.attname: (
+                            None if row[column] == '' and field.null
+                            else row[column]
+                        )
+                        for column, field in fields.items()
+                    })
+                    for row in batch
+                ]
+                for column, field in fields.items():
+                    if not is_checked_relation(table, field):
+                        continue
+                    values = {
+                        int(getattr(obj, field.attname)) for obj in objects
+                        if getattr(obj, field.attname) is not None
+                    }
+                    missing = values.difference(
+                        field.related_model.objects.filter(
+                            pk__in=values
+                        ).values_list('pk', flat=True)
+                    )
+                    if missing and not skip_invalid:
+                        raise invalid_rows_error(
+                            table, column,
+                            sorted(missing)[:INVALID_SAMPLE_SIZE]
+                        )
+                    if missing:
+                        kept = [
+                            obj for obj in objects
+                            if getattr(obj, field.attname) is None
+                            or int(getattr(obj, field.attname)) not in missing
+                        ]
+                        invalid += len(objects) - len(kept)
+                        objects = kept
+                model.objects.bulk_create(objects, ignore_conflicts=True)
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), [model]
+            ):
+                cursor.execute(sql)
+        inserted = model.objects.count() - count
+    return inserted, invalid
+
+
+def import_table(table, path, skip_invalid=False, rebuild_indexes=False,
+                 copy=True):
+    try:
+        if copy and use_copy():
+            result = copy_import(table, path, skip_invalid, rebuild_indexes)
+        else:
+            result = batch_import(table, path, skip_invalid)
+        if table.model is Comment:
+            threads.fill_paths()
+        elif table.model is Review:
+            stats.rebuild_title_stats()
+        return result
+    finally:
+        # bulk_create и COPY не вызывают сигналов
+        slugs.invalidate(table.model)
+
+
+def export_table(table, path, copy=True):
+    """Выгрузка в CSV того же формата, что и для загрузки.
+    Возвращает число строк, для COPY - None.
+    """
+    model = table.model
+    fields = get_fields(table)
+    with open(path, 'w', encoding='utf-8', newline='') as target:
+        if copy and use_copy():
+            quote = connection.ops.quote_name
+            columns = ', '.join(
+                f'{quote(field.column)} AS {quote(column)}'
+                for column, field in fields.items()
+            )
+            with connection.cursor() as cursor:
+                cursor.copy_expert(
+                    f'COPY (SELECT {columns} '
+                    f'FROM {quote(model._meta.db_table)} '
+                    f'ORDER BY {quote(model._meta.pk.column)}) '
+                    'TO STDOUT WITH (FORMAT csv, HEADER true)',
+                    target
+                )
+            return None
+        writer = csv.writer(target)
+        writer.writerow(fields)
+        rows = model.objects.order_by('pk').values_list(
+            *(field.attname for field in fields.values())
+        )
+        count = 0
+        for row in rows.iterator(chunk_size=settings.BULK_BATCH_SIZE):
+            writer.writerow(row)
+            count += 1
+        return count
@@ -0,0 +1,38 @@
+import datetime as dt
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from reviews.archive import archive, purge_orphan_comments
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит отзывы и комментарии старше --days дней в архивные '
+        'таблицы пачками, по транзакции на пачку.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+            help='Возраст по pub_date, после которого объект уходит в архив.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.BULK_BATCH_SIZE,
+            help='Сколько строк переносить за одну транзакцию.'
+        )
+        parser.add_argument(
+            '--purge-orphans', action='store_true',
+            help='Удалить архивные комментарии удалённых отзывов.'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - dt.timedelta(days=options['days'])
+        reviews, comments = archive(cutoff, options['batch_size'])
+        self.stdout.write(
+            f'В архив перенесено отзывов: {reviews}, '
+            f'комментариев: {comments}'
+        )
+        if options['purge_orphans']:
+            deleted = purge_orphan_comments(options['batch_size'])
+            self.stdout.write(f'Удалено комментариев без отзыва: {deleted}')
@@ -0,0 +1,42 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from reviews.bulk import CSV_TABLES, export_table
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает таблицы в CSV того же формата, что читает import_csv. '
+        'На PostgreSQL - через COPY TO STDOUT.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tables', nargs='*',
+            help='Какие таблицы выгрузить, по умолчанию все.'
+        )
+        parser.add_argument(
+            '--path', default='.',
+            help='Папка для файлов <таблица>.csv.'
+        )
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Выгружать через ORM и на PostgreSQL.'
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options['tables']).difference(CSV_TABLES)
+        if unknown:
+            raise CommandError(
+                f'Неизвестные таблицы: {", ".join(sorted(unknown))}. '
+                f'Допустимые значения: {", ".join(CSV_TABLES)}.'
+            )
+        os.makedirs(options['path'], exist_ok=True)
+        for name, table in CSV_TABLES.items():
+            if options['tables'] and name not in options['tables']:
+                continue
+            path = os.path.join(options['path'], f'{name}.csv')
+            count = export_table(table, path, copy=not options['no_copy'])
+            self.stdout.write(
+                f'{name}: {path}' + (f', строк {count}' if count else '')
+            )
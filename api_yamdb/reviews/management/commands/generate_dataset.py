@@ -0,0 +1,299 @@
+import datetime as dt
+import random
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from reviews import slugs, stats, threads
+from reviews.bulk import explicit_pub_date
+from reviews.models import Categorie, Comment, Genre, Review, Title, TitleGenre
+from users.models import User
+
+WORDS = (
+    'фильм книга песня сюжет герой финал автор актёр роль сцена музыка '
+    'смысл идея история вечер время жизнь мир голос свет мечта'
+).split()
+
+# Верхняя граница - как в ограничении year__lte=now_year, которое
+# хранится в БД с годом создания миграции
+YEARS = (1950, 2020)
+
+
+def zipf_weights(count, exponent):
+    return [1 / rank ** exponent for rank in range(1, count + 1)]
+
+
+def random_round(rng, value):
+    """Округление с сохранением ожидаемой суммы: 0.3 -> 1 в 30% случаев."""
+    whole = int(value)
+    return whole + (rng.random() < value - whole)
+
+
+def make_text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетические данные: пользователей, произведения '
+        'с несколькими жанрами, отзывы с распределением Ципфа по '
+        'произведениям и комментарии. Один seed и те же параметры - '
+        'одни и те же данные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument(
+            '--reviews-per-title', type=float, default=20,
+            help='Среднее число отзывов на произведение.'
+        )
+        parser.add_argument(
+            '--comments-per-review', type=float, default=2,
+            help='Среднее число комментариев на отзыв.'
+        )
+        parser.add_argument(
+            '--replies-per-comment', type=float, default=0.5,
+            help='Среднее число ответов на комментарий.'
+        )
+        parser.add_argument(
+            '--reply-depth', type=int, default=3,
+            help='Сколько уровней ответов под корневым комментарием, '
+                 'не больше COMMENT_MAX_DEPTH.'
+        )
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--categories', type=int, default=5)
+        parser.add_argument(
+            '--max-genres', type=int, default=3,
+            help='Сколько жанров может быть у одного произведения.'
+        )
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='Показатель распределения Ципфа для числа отзывов.'
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней назад разносить даты отзывов.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--prefix', default='gen',
+            help='Префикс имён, чтобы не пересекаться с другими данными.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.BULK_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.prefix = options['prefix']
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.options = options
+        if not 0 <= options['reply_depth'] <= settings.COMMENT_MAX_DEPTH:
+            raise CommandError(
+                f'--reply-depth должен быть от 0 до '
+                f'{settings.COMMENT_MAX_DEPTH} (COMMENT_MAX_DEPTH).'
+            )
+        if User.objects.filter(
+            username__startswith=f'{self.prefix}_'
+        ).exists():
+            raise CommandError(
+                f'Данные с префиксом {self.prefix} уже есть, '
+                'укажите другой --prefix.'
+            )
+        user_ids = self.create_users(options['users'])
+        category_ids = self.create_named(
+            Categorie, 'category', options['categories']
+        )
+        genre_ids = self.create_named(Genre, 'genre', options['genres'])
+        counts = self.review_counts(options['titles'], len(user_ids))
+        totals = [0, 0]
+        with explicit_pub_date():
+            for start in range(0, options['titles'], self.batch_size):
+                with transaction.atomic():
+                    title_ids = self.create_titles(
+                        start, min(start + self.batch_size, options['titles']),
+                        category_ids, genre_ids
+                    )
+                    reviews, comments = self.create_reviews(
+                        title_ids, counts[start:start + len(title_ids)],
+                        user_ids
+                    )
+                totals[0] += reviews
+                totals[1] += comments
+                self.stdout.write(
+                    f'Произведений: {start + len(title_ids)}, '
+                    f'отзывов: {totals[0]}, комментариев: {totals[1]}'
+                )
+        stats.rebuild_title_stats()
+        self.stdout.write(
+            'Готово. Гистограммы оценок пересчитаны, но данные записаны '
+            'без журнала изменений: пересчитайте рейтинги и похожие '
+            'произведения командами rebuild_rankings --full '
+            'и rebuild_similar_titles --full.'
+        )
+
+    def bulk_create(self, model, objects):
+        # списки уже нарезаны по batch_size, размер INSERT выбирает Django
+        # (на SQLite он ограничен числом параметров запроса)
+        model.objects.bulk_create(objects)
+
+    def create_users(self, count):
+        for start in range(0, count, self.batch_size):
+            self.bulk_create(User, [
+                User(
+                    username=f'{self.prefix}_user{number}',
+                    email=f'{self.prefix}_user{number}@yamdb.fake',
+                )
+                for number in range(
+                    start, min(start + self.batch_size, count)
+                )
+            ])
+        return list(User.objects.filter(
+            username__startswith=f'{self.prefix}_user'
+        ).order_by('id').values_list('id', flat=True))
+
+    def create_named(self, model, name, count):
+        self.bulk_create(model, [
+            model(
+                name=f'{name.capitalize()} {number}',
+                slug=f'{self.prefix}-{name}-{number}'
+            )
+            for number in range(count)
+        ])
+        slugs.invalidate(model)
+        return list(model.objects.filter(
+            slug__startswith=f'{self.prefix}-{name}-'
+        ).order_by('id').values_list('id', flat=True))
+
+    def review_counts(self, titles, users):
+        """Число отзывов по Ципфу: ранги перемешаны, чтобы популярные
+        произведения не шли подряд по id. Не больше одного отзыва
+        от пользователя на произведение.
+        """
+        weights = zipf_weights(titles, self.options['zipf'])
+        scale = titles * self.options['reviews_per_title'] / sum(weights)
+        self.rng.shuffle(weights)
+        return [
+            min(users, random_round(self.rng, weight * scale))
+            for weight in weights
+        ]
+
+    def create_titles(self, start, stop, category_ids, genre_ids):
+        names = [
+            f'{self.prefix} {make_text(self.rng, 2)} {number}'
+            for number in range(start, stop)
+        ]
+        category_weights = zipf_weights(len(category_ids), 1)
+        self.bulk_create(Title, [
+            Title(
+                name=name,
+                year=self.rng.randint(*YEARS),
+                description=make_text(self.rng, self.rng.randint(5, 30)),
+                category_id=self.rng.choices(
+                    category_ids, category_weights
+                )[0],
+            )
+            for name in names
+        ])
+        ids = dict(
+            Title.objects.filter(name__in=names).values_list('name', 'id')
+        )
+        title_ids = [ids[name] for name in names]
+        genre_weights = zipf_weights(len(genre_ids), 1)
+        title_genres = []
+        for title_id in title_ids:
+            genres = set(self.rng.choices(
+                genre_ids, genre_weights,
+                k=self.rng.randint(1, self.options['max_genres'])
+            ))
+            title_genres.extend(
+                TitleGenre(title_id=title_id, genre_id=genre_id)
+                for genre_id in sorted(genres)
+            )
+        self.bulk_create(TitleGenre, title_genres)
+        return title_ids
+
+    def random_date(self, after=None):
+        start = after or self.now - dt.timedelta(days=self.options['days'])
+        return start + (self.now - start) * self.rng.random()
+
+    def create_reviews(self, title_ids, counts, user_ids):
+        reviews = []
+        review_count = 0
+        for title_id, count in zip(title_ids, counts):
+            quality = self.rng.uniform(3, 9)
+            for author_id in self.rng.sample(user_ids, count):
+                reviews.append(Review(
+                    title_id=title_id,
+                    author_id=author_id,
+                    text=make_text(self.rng, self.rng.randint(5, 60)),
+                    score=min(10, max(1, round(self.rng.gauss(quality, 2)))),
+                    pub_date=self.random_date(),
+                ))
+                if len(reviews) == self.batch_size:
+                    self.bulk_create(Review, reviews)
+                    review_count += len(reviews)
+                    reviews = []
+        self.bulk_create(Review, reviews)
+        review_count += len(reviews)
+        return review_count, self.create_comments(title_ids, user_ids)
+
+    def create_comments(self, title_ids, user_ids):
+        """Комментарии: у большинства отзывов их нет или мало,
+        у немногих - длинные обсуждения (экспоненциальное распределение).
+        Затем так же ответы на них, уровень за уровнем до --reply-depth.
+        """
+        reviews = Review.objects.filter(title_id__in=title_ids).order_by(
+            'id'
+        ).values_list('id', 'pub_date')
+        comment_count = self.create_level(
+            reviews, ('review_id', 'pub_date'), {},
+            self.options['comments_per_review'], user_ids
+        )
+        if not comment_count:
+            return 0
+        # bulk_create не вызывает сигналов, путь в ветке пишется отдельно
+        threads.fill_root_paths(models=(Comment,))
+        for depth in range(1, self.options['reply_depth'] + 1):
+            parents = Comment.objects.filter(
+                review__title_id__in=title_ids, depth=depth - 1
+            ).order_by('id').values_list('id', 'review_id', 'pub_date')
+            count = self.create_level(
+                parents, ('parent_id', 'review_id', 'pub_date'),
+                {'depth': depth}, self.options['replies_per_comment'],
+                user_ids
+            )
+            if not count:
+                break
+            threads.fill_reply_paths(depth)
+            comment_count += count
+        return comment_count
+
+    def create_level(self, parents, fields, extra, mean, user_ids):
+        """Комментарии к строкам parents, в среднем mean на строку.
+        Строка - значения полей fields, pub_date в ней - дата родителя,
+        комментарий пишется позже неё.
+        """
+        comments = []
+        comment_count = 0
+        if not mean:
+            return 0
+        for row in parents.iterator():
+            count = random_round(self.rng, self.rng.expovariate(1 / mean))
+            for _ in range(count):
+                comment = Comment(
+                    author_id=self.rng.choice(user_ids),
+                    text=make_text(self.rng, self.rng.randint(3, 30)),
+                    **dict(zip(fields, row)), **extra
+                )
+                comment.pub_date = self.random_date(after=comment.pub_date)
+                comments.append(comment)
+                if len(comments) == self.batch_size:
+                    self.bulk_create(Comment, comments)
+                    comment_count += len(comments)
+                    comments = []
+        self.bulk_create(Comment, comments)
+        return comment_count + len(comments)
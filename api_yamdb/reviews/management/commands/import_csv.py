@@ -0,0 +1,66 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from reviews.bulk import CSV_TABLES, import_table
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает CSV-файлы (формат static/data) в БД. На PostgreSQL - '
+        'через COPY во временную таблицу, на остальных СУБД - пачками '
+        'через bulk_create. Строки с уже занятыми id пропускаются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tables', nargs='*',
+            help='Какие файлы загрузить, по умолчанию все по порядку.'
+        )
+        parser.add_argument(
+            '--path', default=os.path.join(settings.BASE_DIR, 'static/data'),
+            help='Папка с файлами <таблица>.csv.'
+        )
+        parser.add_argument(
+            '--skip-invalid', action='store_true',
+            help='Отбрасывать строки со ссылками на несуществующие объекты.'
+        )
+        parser.add_argument(
+            '--drop-indexes', action='store_true',
+            help='Удалить индексы на время загрузки и построить заново '
+                 '(только PostgreSQL).'
+        )
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Загружать через bulk_create и на PostgreSQL.'
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options['tables']).difference(CSV_TABLES)
+        if unknown:
+            raise CommandError(
+                f'Неизвестные таблицы: {", ".join(sorted(unknown))}. '
+                f'Допустимые значения: {", ".join(CSV_TABLES)}.'
+            )
+        tables = options['tables'] or list(CSV_TABLES)
+        for name in CSV_TABLES:
+            if name not in tables:
+                continue
+            path = os.path.join(options['path'], f'{name}.csv')
+            if not os.path.exists(path):
+                raise CommandError(f'Нет файла {path}.')
+            inserted, invalid = import_table(
+                CSV_TABLES[name], path,
+                skip_invalid=options['skip_invalid'],
+                rebuild_indexes=options['drop_indexes'],
+                copy=not options['no_copy']
+            )
+            self.stdout.write(
+                f'{name}: добавлено {inserted}, отброшено {invalid}'
+            )
+        self.stdout.write(
+            'Гистограммы оценок пересчитаны после загрузки отзывов, но '
+            'данные записаны без журнала изменений: пересчитайте рейтинги '
+            'и похожие произведения командами rebuild_rankings --full '
+            'и rebuild_similar_titles --full.'
+        )
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from reviews.purge import purge_deleted
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет произведения и пользователей, удалённые через API, '
+        'вместе с их отзывами и комментариями. Отзывы удаляются пачками '
+        'в коротких транзакциях, гистограммы оценок пересчитываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.BULK_BATCH_SIZE,
+            help='Сколько отзывов удалять в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        titles, users, reviews, comments = purge_deleted(
+            options['batch_size']
+        )
+        self.stdout.write(
+            f'Произведений: {titles}, пользователей: {users}, '
+            f'отзывов: {reviews}, комментариев: {comments}'
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from reviews.rankings import rebuild_rankings
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рейтинги произведений для api/v1/titles/top/ '
+        'по изменениям отзывов с прошлого запуска.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Пересчитать общий рейтинг по всем отзывам.'
+        )
+
+    def handle(self, *args, **options):
+        created = rebuild_rankings(full=options['full'])
+        self.stdout.write(f'Записано строк рейтинга: {created}')
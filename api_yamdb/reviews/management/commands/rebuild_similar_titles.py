@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from reviews.similar import rebuild_similar_titles
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает похожие произведения для '
+        'api/v1/titles/{id}/similar/ по изменениям с прошлого запуска.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Пересчитать соседей всех произведений.'
+        )
+
+    def handle(self, *args, **options):
+        created = rebuild_similar_titles(full=options['full'])
+        self.stdout.write(f'Записано похожих произведений: {created}')
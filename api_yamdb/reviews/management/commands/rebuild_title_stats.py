@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from reviews.stats import rebuild_title_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает гистограммы оценок произведений по всем отзывам. '
+        'Нужна после загрузки данных в обход API (import_csv, '
+        'generate_dataset).'
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild_title_stats()
+        self.stdout.write(f'Пересчитано произведений: {count}')
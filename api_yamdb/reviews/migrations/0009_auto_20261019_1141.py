@@ -0,0 +1,78 @@
+# Generated by Django 2.2.16 on 2026-10-19 11:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_auto_20261019_1130'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BuildCursor',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=32, unique=True, verbose_name='Название')),
+                ('change_id', models.BigIntegerField(default=0, verbose_name='Последнее учтённое изменение')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Дата пересчёта')),
+            ],
+            options={
+                'verbose_name': 'Курсор пересчёта',
+                'verbose_name_plural': 'Курсоры пересчёта',
+            },
+        ),
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('all', 'all'), ('month', 'month'), ('week', 'week')], max_length=8, verbose_name='Период')),
+                ('review_count', models.IntegerField(verbose_name='Число отзывов')),
+                ('score_sum', models.IntegerField(verbose_name='Сумма оценок')),
+                ('rating', models.FloatField(default=0, verbose_name='Рейтинг')),
+            ],
+            options={
+                'verbose_name': 'Рейтинг',
+                'verbose_name_plural': 'Рейтинги',
+            },
+        ),
+        migrations.AddField(
+            model_name='changelog',
+            name='parent_id',
+            field=models.IntegerField(blank=True, null=True, verbose_name='id родителя'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='pub_date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата публикации'),
+        ),
+        migrations.AddField(
+            model_name='titleranking',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='reviews.Categorie', verbose_name='Категория'),
+        ),
+        migrations.AddField(
+            model_name='titleranking',
+            name='genre',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.Genre', verbose_name='Жанр'),
+        ),
+        migrations.AddField(
+            model_name='titleranking',
+            name='title',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.Title', verbose_name='Произведение'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['period', 'genre', '-rating', 'title'], name='ranking_genre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['period', 'category', '-rating', 'title'], name='ranking_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['period', 'title'], name='ranking_title_idx'),
+        ),
+    ]
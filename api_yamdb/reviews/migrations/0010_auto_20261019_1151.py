@@ -0,0 +1,68 @@
+# Generated by Django 2.2.16 on 2026-10-19 11:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reviews', '0009_auto_20261019_1141'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('text', models.TextField(verbose_name='Текст')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата Публикации')),
+                ('review_id', models.IntegerField(db_index=True, verbose_name='Отзыв')),
+                ('is_hidden', models.BooleanField(default=False, verbose_name='Скрыт модератором')),
+            ],
+            options={
+                'verbose_name': 'Архивный комментарий',
+                'verbose_name_plural': 'Архив комментариев',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedReview',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('text', models.TextField()),
+                ('pub_date', models.DateTimeField(verbose_name='Дата публикации')),
+                ('score', models.SmallIntegerField(verbose_name='Оценка')),
+                ('is_hidden', models.BooleanField(default=False, verbose_name='Скрыт модератором')),
+            ],
+            options={
+                'verbose_name': 'Архивный отзыв',
+                'verbose_name_plural': 'Архив отзывов',
+            },
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='pub_date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата Публикации'),
+        ),
+        migrations.AddField(
+            model_name='archivedreview',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_reviews', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AddField(
+            model_name='archivedreview',
+            name='title',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_reviews', to='reviews.Title', verbose_name='Произведение'),
+        ),
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_comments', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AddConstraint(
+            model_name='archivedreview',
+            constraint=models.UniqueConstraint(fields=('author', 'title'), name='unique archived review'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 2.2.16 on 2026-10-19 11:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_title_stats(apps, schema_editor):
+    from reviews.stats import rebuild_title_stats
+    rebuild_title_stats(
+        review_models=(
+            apps.get_model('reviews', 'Review'),
+            apps.get_model('reviews', 'ArchivedReview'),
+        ),
+        stats_model=apps.get_model('reviews', 'TitleStats'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_auto_20261019_1151'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.Title', verbose_name='Произведение')),
+                ('score_1', models.IntegerField(default=0)),
+                ('score_2', models.IntegerField(default=0)),
+                ('score_3', models.IntegerField(default=0)),
+                ('score_4', models.IntegerField(default=0)),
+                ('score_5', models.IntegerField(default=0)),
+                ('score_6', models.IntegerField(default=0)),
+                ('score_7', models.IntegerField(default=0)),
+                ('score_8', models.IntegerField(default=0)),
+                ('score_9', models.IntegerField(default=0)),
+                ('score_10', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Статистика оценок',
+                'verbose_name_plural': 'Статистика оценок',
+            },
+        ),
+        migrations.RunPython(fill_title_stats, migrations.RunPython.noop),
+    ]
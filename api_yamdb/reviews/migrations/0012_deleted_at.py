@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_titlestats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='удалено'),
+        ),
+    ]
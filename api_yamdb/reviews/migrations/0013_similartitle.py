@@ -0,0 +1,43 @@
+# Generated by Django 2.2.16 on 2026-10-19 12:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_deleted_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarTitle',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Сходство')),
+            ],
+            options={
+                'verbose_name': 'Похожее произведение',
+                'verbose_name_plural': 'Похожие произведения',
+            },
+        ),
+        migrations.AddField(
+            model_name='similartitle',
+            name='similar',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.Title', verbose_name='Похожее произведение'),
+        ),
+        migrations.AddField(
+            model_name='similartitle',
+            name='title',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_titles', to='reviews.Title', verbose_name='Произведение'),
+        ),
+        migrations.AddIndex(
+            model_name='similartitle',
+            index=models.Index(fields=['title', '-score', 'similar'], name='similar_title_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='similartitle',
+            constraint=models.UniqueConstraint(fields=('title', 'similar'), name='unique similar title'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 2.2.16 on 2026-10-19 12:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_paths(apps, schema_editor):
+    from reviews.threads import fill_root_paths
+    fill_root_paths(models=(
+        apps.get_model('reviews', 'Comment'),
+        apps.get_model('reviews', 'ArchivedComment'),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_similartitle'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='depth',
+            field=models.SmallIntegerField(default=0, verbose_name='Уровень вложенности'),
+        ),
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='parent',
+            field=models.IntegerField(blank=True, db_column='parent_id', null=True, verbose_name='Ответ на'),
+        ),
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='path',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Путь в ветке'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.SmallIntegerField(default=0, verbose_name='Уровень вложенности'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='parent',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='replies', to='reviews.Comment', verbose_name='Ответ на'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Путь в ветке'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedcomment',
+            index=models.Index(fields=['review_id', 'path'], name='archived_comment_tree_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['review', 'path'], name='comment_tree_idx'),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
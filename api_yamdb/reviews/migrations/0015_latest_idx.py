@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-19 12:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0014_comment_tree'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['pub_date', 'id'], name='comment_latest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['pub_date', 'id'], name='review_latest_idx'),
+        ),
+    ]
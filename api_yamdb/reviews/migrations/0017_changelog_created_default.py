@@ -0,0 +1,19 @@
+# Generated by Django 2.2.16 on 2026-10-19 12:50
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0016_author_latest_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='changelog',
+            name='created',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата изменения'),
+        ),
+    ]
@@ -1,8 +1,10 @@
 import datetime as dt
 
+from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import connections, models
 from django.db.models import Q
+from django.utils import timezone
 from users.models import User
 
 
@@ -24,6 +26,18 @@ class Categorie(models.Model):
         return self.slug
 
 
+class SoftDeleteQuerySet(models.QuerySet):
+    """Удалённые через API объекты скрыты сразу, а строки
+    и зависимые данные удаляет команда purge_deleted.
+    """
+
+    def alive(self):
+        return self.filter(deleted_at__isnull=True)
+
+    def deleted(self):
+        return self.filter(deleted_at__isnull=False)
+
+
 class Title(models.Model):
     """Произведения, к которым пишут отзывы.
     (определённый фильм, книга или песенка).
@@ -52,6 +66,14 @@ class Title(models.Model):
     description = models.TextField(
         verbose_name="описание произведения",
     )
+    deleted_at = models.DateTimeField(
+        verbose_name="удалено",
+        null=True,
+        blank=True,
+        db_index=True,
+    )
+
+    objects = SoftDeleteQuerySet.as_manager()
 
     class Meta:
         constraints = models.CheckConstraint(
@@ -83,6 +105,13 @@ class TitleGenre(models.Model):
         return f'{self.title} {self.genre}'
 
 
+class ModeratedQuerySet(models.QuerySet):
+    """Отзывы и комментарии, скрытые модератором, в API не отдаются."""
+
+    def visible(self):
+        return self.filter(is_hidden=False)
+
+
 class Review(models.Model):
     """Модель для отзывов к произведениям."""
     author = models.ForeignKey(
@@ -94,6 +123,7 @@ class Review(models.Model):
     text = models.TextField()
     pub_date = models.DateTimeField(
         auto_now_add=True,
+        db_index=True,
         verbose_name='Дата публикации'
     )
     title = models.ForeignKey(
@@ -109,6 +139,12 @@ class Review(models.Model):
         ],
         verbose_name='Оценка'
     )
+    is_hidden = models.BooleanField(
+        default=False,
+        verbose_name='Скрыт модератором'
+    )
+
+    objects = ModeratedQuerySet.as_manager()
 
     class Meta:
         constraints = [
@@ -116,15 +152,42 @@ class Review(models.Model):
                 fields=['author', 'title'],
                 name='unique review'),
         ]
+        indexes = [
+            models.Index(
+                fields=['pub_date', 'id'],
+                name='review_latest_idx'
+            ),
+            models.Index(
+                fields=['author', 'pub_date', 'id'],
+                name='review_author_latest_idx'
+            ),
+        ]
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
 
     def __str__(self):
         return self.text
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        review = super().from_db(db, field_names, values)
+        # с чем отзыв учтён в гистограмме, для сигналов save и delete
+        if {'title_id', 'score', 'is_hidden'}.issubset(review.__dict__):
+            review.counted = review.histogram_entry()
+        return review
+
+    def histogram_entry(self):
+        """(id произведения, оценка) в TitleStats или None для скрытого."""
+        return None if self.is_hidden else (self.title_id, self.score)
+
 
 class Comment(models.Model):
-    """Модель для комментариев к отзывам."""
+    """Модель для комментариев к отзывам.
+    Ответы образуют дерево: path - id всех предков и самого комментария
+    через '/' с нулями слева, поэтому сортировка по path выдаёт ветку
+    в порядке обхода. Ответы остаются после удаления или архивации
+    родителя, поэтому у parent нет ограничения в БД.
+    """
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -136,6 +199,7 @@ class Comment(models.Model):
     )
     pub_date = models.DateTimeField(
         auto_now_add=True,
+        db_index=True,
         verbose_name='Дата Публикации'
     )
     review = models.ForeignKey(
@@ -144,10 +208,492 @@ class Comment(models.Model):
         related_name='comments',
         verbose_name='Отзыв',
     )
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='replies',
+        null=True,
+        blank=True,
+        verbose_name='Ответ на'
+    )
+    path = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name='Путь в ветке'
+    )
+    depth = models.SmallIntegerField(
+        default=0,
+        verbose_name='Уровень вложенности'
+    )
+    is_hidden = models.BooleanField(
+        default=False,
+        verbose_name='Скрыт модератором'
+    )
+
+    objects = ModeratedQuerySet.as_manager()
 
     class Meta:
+        indexes = [
+            models.Index(
+                fields=['review', 'path'],
+                name='comment_tree_idx'
+            ),
+            models.Index(
+                fields=['pub_date', 'id'],
+                name='comment_latest_idx'
+            ),
+            models.Index(
+                fields=['author', 'pub_date', 'id'],
+                name='comment_author_latest_idx'
+            ),
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
     def __str__(self):
         return self.text
+
+
+class ArchivedReview(models.Model):
+    """Отзывы старше ARCHIVE_AFTER_DAYS, перенесённые командой
+    archive_reviews. Id сохраняются, в API доступны с ?archived=1.
+    """
+    id = models.IntegerField(primary_key=True)
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_reviews',
+        verbose_name='Автор'
+    )
+    text = models.TextField()
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации'
+    )
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='archived_reviews',
+        verbose_name='Произведение'
+    )
+    score = models.SmallIntegerField(
+        verbose_name='Оценка'
+    )
+    is_hidden = models.BooleanField(
+        default=False,
+        verbose_name='Скрыт модератором'
+    )
+
+    objects = ModeratedQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['author', 'title'],
+                name='unique archived review'),
+        ]
+        verbose_name = 'Архивный отзыв'
+        verbose_name_plural = 'Архив отзывов'
+
+    def __str__(self):
+        return self.text
+
+
+class ArchivedComment(models.Model):
+    """Комментарии, перенесённые в архив вместе со своим отзывом
+    или по собственной дате. review_id ссылается на отзыв в любой
+    из двух таблиц, поэтому это не внешний ключ. parent - так же
+    id родителя в любой из таблиц комментариев.
+    """
+    id = models.IntegerField(primary_key=True)
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments',
+        verbose_name='Автор'
+    )
+    text = models.TextField(
+        verbose_name='Текст'
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата Публикации'
+    )
+    review_id = models.IntegerField(
+        db_index=True,
+        verbose_name='Отзыв'
+    )
+    parent = models.IntegerField(
+        db_column='parent_id',
+        null=True,
+        blank=True,
+        verbose_name='Ответ на'
+    )
+    path = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name='Путь в ветке'
+    )
+    depth = models.SmallIntegerField(
+        default=0,
+        verbose_name='Уровень вложенности'
+    )
+    is_hidden = models.BooleanField(
+        default=False,
+        verbose_name='Скрыт модератором'
+    )
+
+    objects = ModeratedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['review_id', 'path'],
+                name='archived_comment_tree_idx'
+            ),
+        ]
+        verbose_name = 'Архивный комментарий'
+        verbose_name_plural = 'Архив комментариев'
+
+    def __str__(self):
+        return self.text
+
+
+class ClockTimestamp(models.Func):
+    """Время вставки строки по часам Postgres, а не начала транзакции."""
+    template = 'clock_timestamp()'
+    output_field = models.DateTimeField()
+
+
+class ChangeLogQuerySet(models.QuerySet):
+
+    def settled(self):
+        """Записи, раньше которых в журнал уже ничего не попадёт.
+        Старше CHANGES_FEED_LAG и, в Postgres, раньше начала самой
+        старой другой пишущей транзакции: её записи вставлены позже
+        её начала и получат id больше отданных. В SQLite запись
+        в БД одна на всех, хватает задержки.
+        """
+        connection = connections[self.db]
+        horizon = timezone.now() - settings.CHANGES_FEED_LAG
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT min(xact_start) FROM pg_stat_activity '
+                    'WHERE datname = current_database() '
+                    'AND backend_xid IS NOT NULL '
+                    'AND pid <> pg_backend_pid()'
+                )
+                oldest = cursor.fetchone()[0]
+            if oldest is not None:
+                horizon = min(horizon, oldest)
+        return self.filter(created__lt=horizon)
+
+
+class ChangeLog(models.Model):
+    """Журнал изменений произведений, жанров, категорий, отзывов
+    и комментариев. Только дописывается, удаления хранятся как записи
+    с action='deleted'. Источник для эндпоинта api/v1/changes/.
+    Для отзывов и комментариев в parent_id пишется id произведения
+    и отзыва: после удаления объекта его больше неоткуда взять.
+    """
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ACTION_CHOICES = [
+        (CREATED, 'created'),
+        (UPDATED, 'updated'),
+        (DELETED, 'deleted'),
+    ]
+    PARENT_FIELDS = {
+        'review': 'title_id',
+        'comment': 'review_id',
+    }
+
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(
+        verbose_name='Модель',
+        max_length=16,
+    )
+    object_id = models.IntegerField(
+        verbose_name='id объекта',
+    )
+    parent_id = models.IntegerField(
+        verbose_name='id родителя',
+        null=True,
+        blank=True,
+    )
+    action = models.CharField(
+        verbose_name='Действие',
+        max_length=7,
+        choices=ACTION_CHOICES,
+    )
+    created = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Дата изменения'
+    )
+
+    objects = ChangeLogQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Изменение'
+        verbose_name_plural = 'Журнал изменений'
+
+    def __str__(self):
+        return f'{self.id} {self.action} {self.model} {self.object_id}'
+
+    @classmethod
+    def parent_field(cls, model):
+        return cls.PARENT_FIELDS.get(model._meta.model_name)
+
+    @classmethod
+    def record(cls, model, object_ids, action, parent_ids=None):
+        """Запись в журнал для массовых операций, которые минуют сигналы.
+        parent_ids, если переданы, идут в том же порядке, что и object_ids.
+        """
+        if parent_ids is None:
+            parent_ids = [None] * len(object_ids)
+        created = timezone.now()
+        if connections[cls.objects.db].vendor == 'postgresql':
+            # по времени вставки, а не начала транзакции, см. settled
+            created = ClockTimestamp()
+        rows = [
+            cls(
+                model=model._meta.model_name,
+                object_id=object_id,
+                parent_id=parent_id,
+                action=action,
+                created=created
+            )
+            for object_id, parent_id in zip(object_ids, parent_ids)
+        ]
+        # без batch_size Django сам дробит INSERT под лимиты SQLite
+        for start in range(0, len(rows), settings.BULK_BATCH_SIZE):
+            cls.objects.bulk_create(
+                rows[start:start + settings.BULK_BATCH_SIZE]
+            )
+
+
+class BuildCursor(models.Model):
+    """Позиция в журнале изменений, до которой досчитаны производные
+    таблицы. Следующий запуск пересчёта берёт только новые записи.
+    """
+    name = models.CharField(
+        verbose_name='Название',
+        max_length=32,
+        unique=True,
+    )
+    change_id = models.BigIntegerField(
+        verbose_name='Последнее учтённое изменение',
+        default=0,
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата пересчёта'
+    )
+
+    class Meta:
+        verbose_name = 'Курсор пересчёта'
+        verbose_name_plural = 'Курсоры пересчёта'
+
+    def __str__(self):
+        return f'{self.name} {self.change_id}'
+
+
+class TitleRanking(models.Model):
+    """Рейтинг произведения за период для api/v1/titles/top/.
+    Строка с genre=NULL - общий зачёт и зачёт по категории, строки
+    с жанром - зачёт по каждому жанру произведения. Таблицу заполняет
+    команда rebuild_rankings, API её только читает.
+    """
+    PERIOD_CHOICES = [
+        (period, period) for period in settings.RANKING_PERIODS
+    ]
+
+    period = models.CharField(
+        verbose_name='Период',
+        max_length=8,
+        choices=PERIOD_CHOICES,
+    )
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='rankings',
+        verbose_name='Произведение'
+    )
+    category = models.ForeignKey(
+        Categorie,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        null=True,
+        blank=True,
+        verbose_name='Категория'
+    )
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        related_name='+',
+        null=True,
+        blank=True,
+        verbose_name='Жанр'
+    )
+    review_count = models.IntegerField(
+        verbose_name='Число отзывов',
+    )
+    score_sum = models.IntegerField(
+        verbose_name='Сумма оценок',
+    )
+    rating = models.FloatField(
+        verbose_name='Рейтинг',
+        default=0,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['period', 'genre', '-rating', 'title'],
+                name='ranking_genre_idx'
+            ),
+            models.Index(
+                fields=['period', 'category', '-rating', 'title'],
+                name='ranking_category_idx'
+            ),
+            models.Index(
+                fields=['period', 'title'],
+                name='ranking_title_idx'
+            ),
+        ]
+        verbose_name = 'Рейтинг'
+        verbose_name_plural = 'Рейтинги'
+
+    def __str__(self):
+        return f'{self.period} {self.title_id} {self.rating}'
+
+
+class TitleStats(models.Model):
+    """Гистограмма оценок произведения: число видимых отзывов
+    (включая архив) с каждой оценкой от 1 до 10. Обновляется
+    сигналами save и delete отзыва и модерацией.
+    """
+    SCORES = range(1, 11)
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Произведение'
+    )
+    score_1 = models.IntegerField(default=0)
+    score_2 = models.IntegerField(default=0)
+    score_3 = models.IntegerField(default=0)
+    score_4 = models.IntegerField(default=0)
+    score_5 = models.IntegerField(default=0)
+    score_6 = models.IntegerField(default=0)
+    score_7 = models.IntegerField(default=0)
+    score_8 = models.IntegerField(default=0)
+    score_9 = models.IntegerField(default=0)
+    score_10 = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Статистика оценок'
+        verbose_name_plural = 'Статистика оценок'
+
+    def __str__(self):
+        return f'{self.title_id} {self.histogram}'
+
+    @staticmethod
+    def field(score):
+        return f'score_{score}'
+
+    @property
+    def histogram(self):
+        return {
+            score: getattr(self, self.field(score)) for score in self.SCORES
+        }
+
+    @property
+    def count(self):
+        return sum(self.histogram.values())
+
+    @property
+    def mean(self):
+        count = self.count
+        if not count:
+            return None
+        return sum(
+            score * number for score, number in self.histogram.items()
+        ) / count
+
+    @property
+    def median(self):
+        count = self.count
+        if not count:
+            return None
+        middle = [(count + 1) // 2, count // 2 + 1]
+        values = []
+        seen = 0
+        for score, number in self.histogram.items():
+            seen += number
+            while middle and middle[0] <= seen:
+                values.append(score)
+                middle.pop(0)
+        return sum(values) / len(values)
+
+    @classmethod
+    def add(cls, title_id, changes, create=True):
+        """Сдвигает счётчики одним UPDATE: changes - {оценка: дельта}.
+        Строка создаётся при первом отзыве произведения. create=False -
+        только уменьшение: строки нет, если произведение удаляется.
+        """
+        changes = {
+            cls.field(score): models.F(cls.field(score)) + delta
+            for score, delta in changes.items() if delta
+        }
+        if not changes:
+            return
+        updated = cls.objects.filter(title_id=title_id).update(**changes)
+        if not updated and create:
+            cls.objects.get_or_create(title_id=title_id)
+            cls.objects.filter(title_id=title_id).update(**changes)
+
+
+class SimilarTitle(models.Model):
+    """Похожее произведение для api/v1/titles/{id}/similar/: до
+    SIMILAR_TITLES_LIMIT соседей на произведение с мерой сходства.
+    Таблицу заполняет команда rebuild_similar_titles, API её только
+    читает.
+    """
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='similar_titles',
+        verbose_name='Произведение'
+    )
+    similar = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Похожее произведение'
+    )
+    score = models.FloatField(
+        verbose_name='Сходство',
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'similar'],
+                name='unique similar title'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['title', '-score', 'similar'],
+                name='similar_title_idx'
+            ),
+        ]
+        verbose_name = 'Похожее произведение'
+        verbose_name_plural = 'Похожие произведения'
+
+    def __str__(self):
+        return f'{self.title_id} {self.similar_id} {self.score}'
@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from .models import ChangeLog, Comment, Review, TitleStats
+
+
+def chunked(items, size=None):
+    size = size or settings.BULK_BATCH_SIZE
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def select_ids(queryset):
+    """Блокирует строки и возвращает их id и id родителей
+    для журнала изменений.
+    """
+    rows = list(queryset.select_for_update().values_list(
+        'pk', ChangeLog.parent_field(queryset.model)
+    ))
+    return [row[0] for row in rows], [row[1] for row in rows]
+
+
+def raw_delete(model, object_ids, parent_ids):
+    """DELETE по списку id без загрузки объектов и без сигналов."""
+    for chunk in chunked(object_ids):
+        queryset = model.objects.filter(pk__in=chunk)
+        queryset._raw_delete(queryset.db)
+    ChangeLog.record(model, object_ids, ChangeLog.DELETED, parent_ids)
+
+
+def subtract_reviews(reviews):
+    """Вычитает из гистограмм видимые отзывы queryset.
+    Вызывается до удаления или скрытия отзывов, в той же транзакции.
+    """
+    changes = {}
+    rows = reviews.filter(is_hidden=False).values(
+        'title_id', 'score'
+    ).annotate(count=Count('id')).order_by().values_list(
+        'title_id', 'score', 'count'
+    )
+    for title_id, score, count in rows:
+        changes.setdefault(title_id, {})[score] = -count
+    for title_id, title_changes in changes.items():
+        TitleStats.add(title_id, title_changes)
+
+
+def delete_reviews(reviews):
+    """Удаляет отзывы вместе с их комментариями в одной транзакции.
+    Возвращает число удалённых отзывов и комментариев.
+    """
+    with transaction.atomic():
+        review_ids, title_ids = select_ids(reviews)
+        comment_ids, parent_ids = [], []
+        for chunk in chunked(review_ids):
+            ids, parents = select_ids(
+                Comment.objects.filter(review_id__in=chunk)
+            )
+            comment_ids.extend(ids)
+            parent_ids.extend(parents)
+            subtract_reviews(Review.objects.filter(pk__in=chunk))
+        raw_delete(Comment, comment_ids, parent_ids)
+        raw_delete(Review, review_ids, title_ids)
+    return len(review_ids), len(comment_ids)
+
+
+def delete_comments(comments):
+    """Удаляет комментарии, возвращает их число."""
+    with transaction.atomic():
+        comment_ids, review_ids = select_ids(comments)
+        raw_delete(Comment, comment_ids, review_ids)
+    return len(comment_ids)
+
+
+def hide(queryset):
+    """Скрывает отзывы или комментарии, возвращает их число.
+    Для потребителей ленты изменений скрытый объект - удалённый.
+    """
+    model = queryset.model
+    with transaction.atomic():
+        object_ids, parent_ids = select_ids(queryset.visible())
+        for chunk in chunked(object_ids):
+            if model is Review:
+                subtract_reviews(model.objects.filter(pk__in=chunk))
+            model.objects.filter(pk__in=chunk).update(is_hidden=True)
+        ChangeLog.record(model, object_ids, ChangeLog.DELETED, parent_ids)
+    return len(object_ids)
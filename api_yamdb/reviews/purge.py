@@ -0,0 +1,146 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from users.models import User
+
+from .models import (ArchivedComment, ArchivedReview, ChangeLog, Comment,
+                     Review, SimilarTitle, Title, TitleGenre, TitleRanking,
+                     TitleStats)
+from .moderation import delete_comments, delete_reviews, subtract_reviews
+
+
+def soft_delete_title(title):
+    """Скрывает произведение из API одним UPDATE. Строки рейтингов
+    удаляются сразу, чтобы оно пропало из titles/top/.
+    """
+    with transaction.atomic():
+        Title.objects.filter(pk=title.pk).update(deleted_at=timezone.now())
+        TitleRanking.objects.filter(title_id=title.pk).delete()
+        ChangeLog.record(Title, [title.pk], ChangeLog.DELETED)
+
+
+def soft_delete_user(user):
+    """Скрывает пользователя и запрещает ему вход. Его отзывы
+    и комментарии видны до очистки командой purge_deleted.
+    """
+    User.objects.filter(pk=user.pk).update(
+        deleted_at=timezone.now(), is_active=False
+    )
+
+
+def batches(queryset, batch_size):
+    """Очередные id queryset, пока они есть. Каждая пачка удаляется
+    до следующей выборки, поэтому смещение не нужно.
+    """
+    while True:
+        ids = list(queryset.order_by('pk').values_list(
+            'pk', flat=True
+        )[:batch_size])
+        if not ids:
+            return
+        yield ids
+
+
+def purge_reviews(reviews, batch_size):
+    """Отзывы с комментариями, гистограммами и журналом изменений."""
+    deleted = [0, 0]
+    for ids in batches(reviews, batch_size):
+        review_count, comment_count = delete_reviews(
+            Review.objects.filter(pk__in=ids)
+        )
+        deleted[0] += review_count
+        deleted[1] += comment_count
+    return tuple(deleted)
+
+
+def purge_comments(comments, batch_size):
+    deleted = 0
+    for ids in batches(comments, batch_size):
+        deleted += delete_comments(Comment.objects.filter(pk__in=ids))
+    return deleted
+
+
+def purge_archived_reviews(reviews, batch_size):
+    """Архивные отзывы с их комментариями. У ArchivedComment.review_id
+    нет внешнего ключа, поэтому комментарии удаляются явно.
+    """
+    deleted = [0, 0]
+    for ids in batches(reviews, batch_size):
+        with transaction.atomic():
+            subtract_reviews(ArchivedReview.objects.filter(pk__in=ids))
+            comments = ArchivedComment.objects.filter(review_id__in=ids)
+            deleted[1] += comments._raw_delete(comments.db)
+            reviews_batch = ArchivedReview.objects.filter(pk__in=ids)
+            deleted[0] += reviews_batch._raw_delete(reviews_batch.db)
+    return tuple(deleted)
+
+
+def purge_archived_comments(comments, batch_size):
+    deleted = 0
+    for ids in batches(comments, batch_size):
+        batch = ArchivedComment.objects.filter(pk__in=ids)
+        deleted += batch._raw_delete(batch.db)
+    return deleted
+
+
+def purge_title(title_id, batch_size):
+    """Удаляет отзывы пачками, затем мелкие зависимые строки и само
+    произведение. Каскаду Django остаётся только проверить пустые
+    таблицы. Возвращает число удалённых отзывов и комментариев.
+    """
+    reviews, comments = purge_reviews(
+        Review.objects.filter(title_id=title_id), batch_size
+    )
+    archived = purge_archived_reviews(
+        ArchivedReview.objects.filter(title_id=title_id), batch_size
+    )
+    with transaction.atomic():
+        # delete() у TitleGenre записал бы в журнал изменение произведения
+        for model in (TitleGenre, TitleRanking, TitleStats, SimilarTitle):
+            queryset = model.objects.filter(title_id=title_id)
+            queryset._raw_delete(queryset.db)
+        queryset = SimilarTitle.objects.filter(similar_id=title_id)
+        queryset._raw_delete(queryset.db)
+        Title.objects.filter(pk=title_id).delete()
+    return reviews + archived[0], comments + archived[1]
+
+
+def purge_user(user_id, batch_size):
+    """Удаляет отзывы и комментарии пользователя пачками, затем его
+    самого. Возвращает число удалённых отзывов и комментариев.
+    """
+    reviews, comments = purge_reviews(
+        Review.objects.filter(author_id=user_id), batch_size
+    )
+    comments += purge_comments(
+        Comment.objects.filter(author_id=user_id), batch_size
+    )
+    archived = purge_archived_reviews(
+        ArchivedReview.objects.filter(author_id=user_id), batch_size
+    )
+    comments += archived[1] + purge_archived_comments(
+        ArchivedComment.objects.filter(author_id=user_id), batch_size
+    )
+    User.objects.filter(pk=user_id).delete()
+    return reviews + archived[0], comments
+
+
+def purge_deleted(batch_size=None):
+    """Очистка всех удалённых через API произведений и пользователей.
+    Возвращает число произведений, пользователей, отзывов и комментариев.
+    """
+    batch_size = batch_size or settings.BULK_BATCH_SIZE
+    title_ids = list(Title.objects.deleted().values_list('pk', flat=True))
+    user_ids = list(User.objects.filter(
+        deleted_at__isnull=False
+    ).values_list('pk', flat=True))
+    reviews = comments = 0
+    for title_id in title_ids:
+        deleted = purge_title(title_id, batch_size)
+        reviews += deleted[0]
+        comments += deleted[1]
+    for user_id in user_ids:
+        deleted = purge_user(user_id, batch_size)
+        reviews += deleted[0]
+        comments += deleted[1]
+    return len(title_ids), len(user_ids), reviews, comments
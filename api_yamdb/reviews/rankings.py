@@ -0,0 +1,118 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, FloatField, Max, Sum, Value
+from django.utils import timezone
+
+from .archive import score_totals
+from .models import BuildCursor, ChangeLog, Title, TitleGenre, TitleRanking
+from .moderation import chunked
+
+CURSOR_NAME = 'rankings'
+
+
+def changed_title_ids(after, until):
+    """Произведения, у которых менялись отзывы, категория или жанры."""
+    changes = ChangeLog.objects.filter(id__gt=after, id__lte=until)
+    title_ids = set(changes.filter(model='title').values_list(
+        'object_id', flat=True
+    ))
+    title_ids.update(changes.filter(
+        model='review', parent_id__isnull=False
+    ).values_list('parent_id', flat=True))
+    return title_ids
+
+
+def create_rows(period, stats):
+    """stats - строки (title_id, review_count, score_sum).
+    На каждое произведение строка общего зачёта и по строке на жанр.
+    """
+    title_ids = [title_id for title_id, _, _ in stats]
+    categories = dict(Title.objects.alive().filter(
+        id__in=title_ids
+    ).values_list('id', 'category_id'))
+    genres = {}
+    for title_id, genre_id in TitleGenre.objects.filter(
+        title_id__in=title_ids, genre__isnull=False
+    ).values_list('title_id', 'genre_id'):
+        genres.setdefault(title_id, []).append(genre_id)
+    rows = []
+    for title_id, review_count, score_sum in stats:
+        if title_id not in categories:
+            continue
+        for genre_id in [None] + genres.get(title_id, []):
+            rows.append(TitleRanking(
+                period=period,
+                title_id=title_id,
+                category_id=categories[title_id],
+                genre_id=genre_id,
+                review_count=review_count,
+                score_sum=score_sum,
+            ))
+    TitleRanking.objects.bulk_create(rows)
+    return len(rows)
+
+
+def rebuild_period(period, since=None, title_ids=None):
+    """Пересчитывает суммы оценок за период, включая архив отзывов.
+    title_ids=None - всю таблицу, иначе только указанные произведения.
+    """
+    rankings = TitleRanking.objects.filter(period=period)
+    if title_ids is None:
+        rankings.delete()
+        title_ids = Title.objects.alive().values_list('id', flat=True)
+    created = 0
+    for chunk in chunked(sorted(title_ids)):
+        rankings.filter(title_id__in=chunk).delete()
+        totals = score_totals(chunk, since)
+        created += create_rows(period, [
+            (title_id, review_count, score_sum)
+            for title_id, (review_count, score_sum) in totals.items()
+        ])
+    return created
+
+
+def update_ratings(period):
+    """Байесовский рейтинг одним UPDATE по всем строкам периода:
+    (сумма оценок + m * C) / (число отзывов + m), где C - средняя
+    оценка за период, m - RANKING_PRIOR_WEIGHT.
+    """
+    rankings = TitleRanking.objects.filter(period=period)
+    totals = rankings.filter(genre__isnull=True).aggregate(
+        review_count=Sum('review_count'), score_sum=Sum('score_sum')
+    )
+    if not totals['review_count']:
+        return
+    weight = settings.RANKING_PRIOR_WEIGHT
+    mean = totals['score_sum'] / totals['review_count']
+    rankings.update(rating=(
+        F('score_sum') + Value(weight * mean, output_field=FloatField())
+    ) / (F('review_count') + Value(weight, output_field=FloatField())))
+
+
+def rebuild_rankings(full=False):
+    """Пересчёт рейтингов по журналу изменений.
+    Общий период пересчитывается только для произведений, у которых
+    что-то изменилось с прошлого запуска; периоды-окна - целиком,
+    но по отзывам только внутри окна. Возвращает число строк.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        cursor, _ = BuildCursor.objects.select_for_update().get_or_create(
+            name=CURSOR_NAME
+        )
+        last_id = ChangeLog.objects.settled().aggregate(
+            Max('id')
+        )['id__max'] or 0
+        title_ids = None
+        if not full and cursor.change_id:
+            title_ids = changed_title_ids(cursor.change_id, last_id)
+        created = 0
+        for period, window in settings.RANKING_PERIODS.items():
+            if window is None:
+                created += rebuild_period(period, title_ids=title_ids)
+            else:
+                created += rebuild_period(period, since=now - window)
+            update_ratings(period)
+        cursor.change_id = max(last_id, cursor.change_id)
+        cursor.save()
+    return created
@@ -0,0 +1,116 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from . import slugs, threads
+from .models import (Categorie, ChangeLog, Comment, Genre, Review, Title,
+                     TitleGenre, TitleStats)
+
+TRACKED_MODELS = (Title, Genre, Categorie, Review, Comment)
+
+
+def log_change(model, object_id, action, parent_id=None):
+    ChangeLog.record(model, [object_id], action, [parent_id])
+
+
+def get_parent_id(sender, instance):
+    parent_field = ChangeLog.parent_field(sender)
+    return getattr(instance, parent_field) if parent_field else None
+
+
+def log_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    log_change(
+        sender,
+        instance.pk,
+        ChangeLog.CREATED if created else ChangeLog.UPDATED,
+        get_parent_id(sender, instance)
+    )
+
+
+def log_delete(sender, instance, **kwargs):
+    log_change(
+        sender, instance.pk, ChangeLog.DELETED,
+        get_parent_id(sender, instance)
+    )
+
+
+for model in TRACKED_MODELS:
+    post_save.connect(log_save, sender=model)
+    post_delete.connect(log_delete, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def log_title_genres(sender, instance, action, reverse, pk_set, **kwargs):
+    """Смена жанров - это изменение произведения. add() вставляет
+    строки TitleGenre без сигналов, а remove() и clear() удаляют их
+    через delete() и попадают в журнал через log_title_genre.
+    """
+    if action != 'post_add':
+        return
+    title_ids = (pk_set or ()) if reverse else (instance.pk,)
+    for title_id in title_ids:
+        log_change(Title, title_id, ChangeLog.UPDATED)
+
+
+@receiver(post_save, sender=TitleGenre)
+@receiver(post_delete, sender=TitleGenre)
+def log_title_genre(sender, instance, raw=False, **kwargs):
+    if not raw and instance.title_id is not None:
+        log_change(Title, instance.title_id, ChangeLog.UPDATED)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Categorie)
+@receiver(post_delete, sender=Categorie)
+def invalidate_slugs(sender, **kwargs):
+    slugs.invalidate(sender)
+
+
+@receiver(post_save, sender=Comment)
+def set_comment_path(sender, instance, created, raw=False, **kwargs):
+    """Путь в ветке содержит id комментария, известный после вставки."""
+    if created and not raw:
+        threads.set_path(instance)
+
+
+# Гистограмма оценок меняется в той же транзакции, что и отзыв, при
+# любом save и delete, в том числе из админки и каскадом. Массовые
+# update и _raw_delete (модерация, архив, очистка) сигналов не шлют
+# и сдвигают гистограмму сами.
+@receiver(pre_save, sender=Review)
+def load_counted_review(sender, instance, raw=False, **kwargs):
+    """Учтённое состояние отзыва, созданного не из БД (from_db)."""
+    if raw or instance.pk is None or hasattr(instance, 'counted'):
+        return
+    row = sender.objects.filter(pk=instance.pk).values_list(
+        'title_id', 'score', 'is_hidden'
+    ).first()
+    instance.counted = row[:2] if row and not row[2] else None
+
+
+@receiver(post_save, sender=Review)
+def count_saved_review(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    before = None if created else instance.counted
+    after = instance.histogram_entry()
+    instance.counted = after
+    if before == after:
+        return
+    changes = {}
+    for entry, delta in ((before, -1), (after, 1)):
+        if entry is not None:
+            changes.setdefault(entry[0], {})[entry[1]] = delta
+    for title_id, title_changes in changes.items():
+        TitleStats.add(title_id, title_changes)
+
+
+@receiver(post_delete, sender=Review)
+def count_deleted_review(sender, instance, **kwargs):
+    counted = getattr(instance, 'counted', instance.histogram_entry())
+    if counted is not None:
+        TitleStats.add(counted[0], {counted[1]: -1}, create=False)
+    instance.counted = None
@@ -0,0 +1,136 @@
+import heapq
+import math
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+
+from .models import (ArchivedReview, BuildCursor, ChangeLog, Review,
+                     SimilarTitle, TitleGenre)
+from .moderation import chunked
+from .rankings import changed_title_ids
+
+CURSOR_NAME = 'similar'
+
+
+def load_likes():
+    """Разреженная матрица пользователь x произведение по видимым
+    отзывам (включая архив) с оценкой от SIMILAR_MIN_SCORE. Вес
+    оценки SIMILAR_MIN_SCORE - 1, каждый балл выше добавляет единицу.
+    Возвращает строки {title_id: {user_id: вес}} и столбцы
+    {user_id: {title_id: вес}}.
+    """
+    min_score = settings.SIMILAR_MIN_SCORE
+    by_title = {}
+    by_user = {}
+    for model in (Review, ArchivedReview):
+        rows = model.objects.visible().filter(
+            score__gte=min_score, title__deleted_at__isnull=True
+        ).values_list('title_id', 'author_id', 'score')
+        for title_id, user_id, score in rows.iterator():
+            weight = score - min_score + 1
+            by_title.setdefault(title_id, {})[user_id] = weight
+            by_user.setdefault(user_id, {})[title_id] = weight
+    return by_title, by_user
+
+
+def load_genres():
+    genres = {}
+    for title_id, genre_id in TitleGenre.objects.filter(
+        title__isnull=False, genre__isnull=False
+    ).values_list('title_id', 'genre_id').iterator():
+        genres.setdefault(title_id, set()).add(genre_id)
+    return genres
+
+
+def genre_overlap(genres, title_id, other_id):
+    """Доля общих жанров (коэффициент Жаккара)."""
+    own = genres.get(title_id, set())
+    other = genres.get(other_id, set())
+    union = own | other
+    return len(own & other) / len(union) if union else 0
+
+
+def neighbours(title_id, by_title, by_user, norms, genres):
+    """SIMILAR_TITLES_LIMIT ближайших произведений: косинус векторов
+    оценок, умноженный на 1 + SIMILAR_GENRE_WEIGHT * доля общих жанров.
+    Перебираются только произведения с общими пользователями.
+    """
+    dots = {}
+    for user_id, weight in by_title[title_id].items():
+        for other_id, other_weight in by_user[user_id].items():
+            if other_id != title_id:
+                dots[other_id] = dots.get(other_id, 0) + weight * other_weight
+    scores = {
+        other_id: dot / (norms[title_id] * norms[other_id]) * (
+            1 + settings.SIMILAR_GENRE_WEIGHT * genre_overlap(
+                genres, title_id, other_id
+            )
+        )
+        for other_id, dot in dots.items()
+    }
+    return heapq.nlargest(
+        settings.SIMILAR_TITLES_LIMIT, scores.items(),
+        key=lambda item: (item[1], -item[0])
+    )
+
+
+def affected_title_ids(title_ids, by_title, by_user):
+    """Изменённые произведения, произведения с общими пользователями
+    и те, у кого изменённые сейчас записаны в соседях: после удаления
+    отзыва общих пользователей может уже не остаться.
+    """
+    affected = set(title_ids)
+    for title_id in title_ids:
+        for user_id in by_title.get(title_id, {}):
+            affected.update(by_user[user_id])
+    for chunk in chunked(sorted(title_ids)):
+        affected.update(SimilarTitle.objects.filter(
+            similar_id__in=chunk
+        ).values_list('title_id', flat=True))
+    return affected
+
+
+def rebuild_similar_titles(full=False):
+    """Пересчёт похожих произведений по журналу изменений. Матрица
+    оценок читается целиком (нужны нормы всех векторов), а строки
+    соседей пишутся заново только для затронутых произведений.
+    Возвращает число записанных строк.
+    """
+    with transaction.atomic():
+        cursor, _ = BuildCursor.objects.select_for_update().get_or_create(
+            name=CURSOR_NAME
+        )
+        last_id = ChangeLog.objects.settled().aggregate(
+            Max('id')
+        )['id__max'] or 0
+        by_title, by_user = load_likes()
+        if full or not cursor.change_id:
+            SimilarTitle.objects.all().delete()
+            title_ids = set(by_title)
+        else:
+            title_ids = affected_title_ids(
+                changed_title_ids(cursor.change_id, last_id),
+                by_title, by_user
+            )
+        norms = {
+            title_id: math.sqrt(sum(w * w for w in weights.values()))
+            for title_id, weights in by_title.items()
+        }
+        genres = load_genres()
+        created = 0
+        for chunk in chunked(sorted(title_ids)):
+            SimilarTitle.objects.filter(title_id__in=chunk).delete()
+            rows = [
+                SimilarTitle(title_id=title_id, similar_id=other_id,
+                             score=score)
+                for title_id in chunk if title_id in by_title
+                for other_id, score in neighbours(
+                    title_id, by_title, by_user, norms, genres
+                )
+            ]
+            SimilarTitle.objects.bulk_create(rows)
+            created += len(rows)
+        cursor.change_id = max(last_id, cursor.change_id)
+        cursor.save()
+    return created
@@ -0,0 +1,105 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Categorie, Genre
+
+# Все поля Genre и Categorie в порядке модели, как ждёт Model.from_db
+FIELDS = ('id', 'name', 'slug')
+
+
+class SlugRegistry:
+    """slug <-> id небольшой и почти неизменной таблицы в памяти процесса.
+    Загружается целиком при первом обращении. Версия хранится в общем
+    кеше: изменение строки меняет версию, и каждый процесс перечитывает
+    таблицу. Версия сверяется не чаще раза в SLUG_REGISTRY_CHECK_SECONDS,
+    остальные обращения - поиск в словаре без похода в кеш.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.version_key = f'slugs:{model._meta.label_lower}:version'
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = None
+        self._rows = ()
+        self._by_slug = {}
+
+    def __deepcopy__(self, memo):
+        # один реестр на процесс, в том числе в копиях полей DRF
+        return self
+
+    def get_version(self):
+        version = cache.get(self.version_key)
+        if version is not None:
+            return version
+        # ключ вытеснен или ещё не создан
+        cache.add(self.version_key, uuid.uuid4().hex, None)
+        return cache.get(self.version_key)
+
+    def load(self):
+        checked_at = self._checked_at
+        now = time.monotonic()
+        if (
+            self._version is not None and checked_at is not None
+            and now - checked_at < settings.SLUG_REGISTRY_CHECK_SECONDS
+        ):
+            return
+        version = self.get_version()
+        self._checked_at = now
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            rows = tuple(self.model.objects.order_by('id').values_list(
+                *FIELDS
+            ))
+            self._by_slug = {row[2]: row for row in rows}
+            self._rows = rows
+            self._version = version
+
+    def invalidate(self):
+        self._version = None
+        cache.set(self.version_key, uuid.uuid4().hex, None)
+
+    def make_object(self, row):
+        return self.model.from_db(self.model.objects.db, FIELDS, row)
+
+    def get_id(self, slug):
+        self.load()
+        row = self._by_slug.get(slug)
+        return row[0] if row else None
+
+    def get_object(self, slug):
+        """Экземпляр модели по slug или None, без запроса к БД."""
+        self.load()
+        row = self._by_slug.get(slug)
+        return self.make_object(row) if row else None
+
+    def objects(self):
+        """Все строки как экземпляры модели по порядку id."""
+        self.load()
+        return [self.make_object(row) for row in self._rows]
+
+
+genres = SlugRegistry(Genre)
+categories = SlugRegistry(Categorie)
+
+REGISTRIES = {Genre: genres, Categorie: categories}
+
+
+def invalidate(model):
+    """Сбрасывает реестр модели, если он есть, сразу и ещё раз после
+    коммита: другой процесс мог перечитать таблицу до коммита
+    и запомнить старые строки с новой версией.
+    """
+    registry = REGISTRIES.get(model)
+    if registry is None:
+        return
+    registry.invalidate()
+    transaction.on_commit(registry.invalidate)
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from .models import ArchivedReview, Review, TitleStats
+from .moderation import chunked
+
+
+def rebuild_title_stats(review_models=(Review, ArchivedReview),
+                        stats_model=TitleStats, batch_size=None):
+    """Пересчёт гистограмм по всем видимым отзывам, включая архив.
+    Модели передаются параметрами, чтобы функцию можно было вызвать
+    из миграции с историческими моделями. Возвращает число строк.
+    """
+    batch_size = batch_size or settings.BULK_BATCH_SIZE
+    histograms = {}
+    for model in review_models:
+        rows = model.objects.filter(is_hidden=False).values(
+            'title_id', 'score'
+        ).annotate(count=Count('id')).order_by().values_list(
+            'title_id', 'score', 'count'
+        )
+        for title_id, score, count in rows.iterator():
+            histogram = histograms.setdefault(title_id, {})
+            histogram[score] = histogram.get(score, 0) + count
+    with transaction.atomic():
+        stats_model.objects.all().delete()
+        for chunk in chunked(sorted(histograms), batch_size):
+            stats_model.objects.bulk_create([
+                stats_model(title_id=title_id, **{
+                    f'score_{score}': count
+                    for score, count in histograms[title_id].items()
+                })
+                for title_id in chunk
+            ])
+    return len(histograms)
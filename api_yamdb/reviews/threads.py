@@ -0,0 +1,68 @@
+from django.db.models import CharField, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Concat, LPad
+
+from .models import ArchivedComment, Comment
+
+# int в Postgres - до 10 цифр, так сравнение строк совпадает с числовым
+PATH_DIGITS = 10
+
+
+def path_segment(pk):
+    return f'{pk:0{PATH_DIGITS}d}/'
+
+
+def set_path(comment):
+    """Путь и уровень нового комментария. Путь содержит его id,
+    поэтому пишется после вставки, UPDATE без сигналов.
+    """
+    parent = comment.parent
+    comment.depth = parent.depth + 1 if parent else 0
+    comment.path = (parent.path if parent else '') + path_segment(comment.pk)
+    Comment.objects.filter(pk=comment.pk).update(
+        path=comment.path, depth=comment.depth
+    )
+
+
+def id_segment():
+    """path_segment(id) в SQL."""
+    return LPad(Cast('id', CharField()), PATH_DIGITS, Value('0'))
+
+
+def fill_root_paths(models=(Comment, ArchivedComment)):
+    """Путь корневых комментариев, вставленных без него (bulk_create,
+    COPY), одним UPDATE на таблицу. Модели передаются параметром
+    для вызова из миграции.
+    """
+    filled = 0
+    for model in models:
+        filled += model.objects.filter(
+            path='', parent__isnull=True
+        ).update(path=Concat(id_segment(), Value('/')))
+    return filled
+
+
+def fill_reply_paths(depth):
+    """Путь ответов уровня depth, вставленных без него: путь родителя
+    и свой id. У родителей путь уже должен быть, поэтому уровни
+    заполняются по очереди, от корня.
+    """
+    parent_path = Comment.objects.filter(
+        pk=OuterRef('parent_id')
+    ).values('path')[:1]
+    return Comment.objects.filter(path='', depth=depth).update(
+        path=Concat(Subquery(parent_path), id_segment(), Value('/'))
+    )
+
+
+def fill_paths():
+    """Путь всех комментариев, вставленных без него: корни, затем
+    ответы уровень за уровнем. Ответ без родителя (удалён)
+    получает путь из одного своего id.
+    """
+    filled = fill_root_paths(models=(Comment,))
+    depths = list(Comment.objects.filter(path='').order_by(
+        'depth'
+    ).values_list('depth', flat=True).distinct())
+    for depth in depths:
+        filled += fill_reply_paths(depth)
+    return filled
@@ -0,0 +1,142 @@
+import functools
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import F
+from django.utils import timezone
+from django.utils.crypto import (constant_time_compare, get_random_string,
+                                 salted_hmac)
+from django.utils.module_loading import import_string
+
+from .models import ConfirmationCode, User
+
+
+def make_code():
+    return get_random_string(length=settings.CONFIRMATION_CODE_LENGTH)
+
+
+def hash_code(user_id, code):
+    return salted_hmac(
+        'users.codes.confirmation_code', f'{user_id}:{code}'
+    ).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def get_code_store():
+    """Хранилище кодов из настройки CONFIRMATION_CODE_STORE."""
+    return import_string(settings.CONFIRMATION_CODE_STORE)()
+
+
+class DatabaseCodeStore:
+    """Коды в отдельной таблице, по строке на пользователя.
+    Выдача кода - один upsert, проверка - один запрос по индексу username,
+    просроченные коды удаляет команда purge_confirmation_codes.
+    """
+
+    def issue(self, user_id, username):
+        code = make_code()
+        connection = connections[ConfirmationCode.objects.db]
+        quote = connection.ops.quote_name
+        table = quote(ConfirmationCode._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} '
+                f'(user_id, code_hash, expires_at, attempts) '
+                f'VALUES (%s, %s, %s, 0) '
+                f'ON CONFLICT (user_id) DO UPDATE '
+                f'SET code_hash = EXCLUDED.code_hash, '
+                f'expires_at = EXCLUDED.expires_at, attempts = 0',
+                [
+                    user_id,
+                    hash_code(user_id, code),
+                    timezone.now() + settings.CONFIRMATION_CODE_TTL,
+                ]
+            )
+        return code
+
+    def verify(self, username, code):
+        """id пользователя, если код верный. Код одноразовый.
+        Удалённому (заблокированному) пользователю код не подходит.
+        """
+        row = ConfirmationCode.objects.filter(
+            user__username=username, user__is_active=True,
+            user__deleted_at__isnull=True
+        ).values_list('user_id', 'code_hash', 'expires_at', 'attempts')[:1]
+        if not row:
+            return None
+        user_id, code_hash, expires_at, attempts = row[0]
+        queryset = ConfirmationCode.objects.filter(pk=user_id)
+        if (
+            expires_at <= timezone.now()
+            or attempts >= settings.CONFIRMATION_CODE_MAX_ATTEMPTS
+        ):
+            queryset.delete()
+            return None
+        if not constant_time_compare(code_hash, hash_code(user_id, code)):
+            queryset.update(attempts=F('attempts') + 1)
+            return None
+        deleted, _ = queryset.filter(code_hash=code_hash).delete()
+        return user_id if deleted else None
+
+    def purge_expired(self, batch_size):
+        purged = 0
+        while True:
+            batch = list(
+                ConfirmationCode.objects.filter(
+                    expires_at__lte=timezone.now()
+                ).values_list('pk', flat=True)[:batch_size]
+            )
+            if not batch:
+                return purged
+            ConfirmationCode.objects.filter(pk__in=batch).delete()
+            purged += len(batch)
+
+
+class CacheCodeStore:
+    """Коды в кеше Django с TTL, без обращений к БД.
+    Кеш должен быть общим для всех воркеров (memcached, redis).
+    """
+    key_prefix = 'confirmation_code:'
+
+    def issue(self, user_id, username):
+        code = make_code()
+        ttl = settings.CONFIRMATION_CODE_TTL.total_seconds()
+        expires_at = timezone.now().timestamp() + ttl
+        cache.set(
+            self.key_prefix + username,
+            (user_id, hash_code(user_id, code), expires_at, 0),
+            timeout=ttl
+        )
+        return code
+
+    def verify(self, username, code):
+        key = self.key_prefix + username
+        value = cache.get(key)
+        if value is None:
+            return None
+        user_id, code_hash, expires_at, attempts = value
+        remaining = expires_at - timezone.now().timestamp()
+        if remaining <= 0:
+            return None
+        if not constant_time_compare(code_hash, hash_code(user_id, code)):
+            attempts += 1
+            if attempts >= settings.CONFIRMATION_CODE_MAX_ATTEMPTS:
+                cache.delete(key)
+            else:
+                cache.set(
+                    key, (user_id, code_hash, expires_at, attempts),
+                    timeout=remaining
+                )
+            return None
+        cache.delete(key)
+        # пользователя могли удалить после выдачи кода
+        if not User.objects.filter(
+            pk=user_id, is_active=True, deleted_at__isnull=True
+        ).exists():
+            return None
+        return user_id
+
+    def purge_expired(self, batch_size):
+        # записи кеша истекают сами
+        return 0
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from users.codes import get_code_store
+
+
+class Command(BaseCommand):
+    help = 'Удаляет просроченные коды подтверждения пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько кодов удалять за один запрос.'
+        )
+
+    def handle(self, *args, **options):
+        purged = get_code_store().purge_expired(options['batch_size'])
+        self.stdout.write(f'Удалено кодов: {purged}')
@@ -0,0 +1,32 @@
+# Generated by Django 2.2.16 on 2026-10-19 11:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConfirmationCode',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='confirmation_code', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('code_hash', models.CharField(max_length=64, verbose_name='Хеш кода')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Действует до')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Неверных попыток')),
+            ],
+            options={
+                'verbose_name': 'Код подтверждения',
+                'verbose_name_plural': 'Коды подтверждения',
+            },
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='confirmation_code',
+        ),
+    ]
@@ -1,7 +1,7 @@
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.validators import UnicodeUsernameValidator
-from django.db import models
+from django.db import IntegrityError, connections, models
 
 
 class CustomUserManager(BaseUserManager):
@@ -38,6 +38,58 @@ class CustomUserManager(BaseUserManager):
 
         return self.create_user(username, email, password, **extra_fields)
 
+    def alive(self):
+        """Без удалённых через API, ещё не очищенных purge_deleted."""
+        return self.filter(deleted_at__isnull=True)
+
+    def signup(self, username, email):
+        """Регистрация без записи в таблицу пользователей при повторах.
+        Новый пользователь создаётся одним INSERT ... ON CONFLICT DO NOTHING,
+        для существующего с той же почтой id читается вторым запросом.
+        Возвращает id пользователя или None, если username или email
+        заняты другим пользователем или пользователь удалён
+        (заблокирован).
+        """
+        user = self.model(
+            username=self.model.normalize_username(username),
+            email=self.normalize_email(email),
+        )
+        user.set_unusable_password()
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        table = quote(self.model._meta.db_table)
+        fields = [
+            field for field in self.model._meta.concrete_fields
+            if not field.primary_key
+        ]
+        sql = (
+            f'INSERT INTO {table} '
+            f'({", ".join(quote(field.column) for field in fields)}) '
+            f'SELECT {", ".join(["%s"] * len(fields))} '
+            f'WHERE NOT EXISTS (SELECT 1 FROM {table} '
+            f'WHERE email = %s AND username <> %s) '
+            f'ON CONFLICT (username) DO NOTHING '
+            f'RETURNING id'
+        )
+        params = [
+            field.get_db_prep_save(field.pre_save(user, True), connection)
+            for field in fields
+        ]
+        params += [user.email, user.username]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                row = cursor.fetchone()
+        except IntegrityError:
+            # параллельная регистрация с той же почтой успела раньше
+            return None
+        if row:
+            return row[0]
+        return self.filter(
+            username=user.username, email=user.email, is_active=True,
+            deleted_at__isnull=True
+        ).values_list('id', flat=True).first()
+
 
 class User(AbstractUser):
 
@@ -69,9 +121,6 @@ class User(AbstractUser):
     first_name = models.CharField('Имя', max_length=150, blank=True)
     last_name = models.CharField('Фамилия', max_length=150, blank=True)
     bio = models.TextField('Биография', blank=True)
-    confirmation_code = models.CharField(
-        'Код подтверждения', max_length=6, blank=True
-    )
     role = models.CharField(
         'Роль пользователя',
         max_length=9,
@@ -82,6 +131,9 @@ class User(AbstractUser):
         },
         blank=True,
     )
+    deleted_at = models.DateTimeField(
+        'Удалён', null=True, blank=True, db_index=True
+    )
 
     class Meta:
         ordering = ['id']
@@ -98,3 +150,29 @@ class User(AbstractUser):
         return (
             self.role == self.MODERATOR or self.is_admin_or_super_user
         )
+
+
+class ConfirmationCode(models.Model):
+    """Код подтверждения для получения токена.
+    Хранится только хеш кода, код живёт CONFIRMATION_CODE_TTL
+    и допускает CONFIRMATION_CODE_MAX_ATTEMPTS неверных попыток.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='confirmation_code',
+        verbose_name='Пользователь'
+    )
+    code_hash = models.CharField('Хеш кода', max_length=64)
+    expires_at = models.DateTimeField('Действует до', db_index=True)
+    attempts = models.PositiveSmallIntegerField(
+        'Неверных попыток', default=0
+    )
+
+    class Meta:
+        verbose_name = 'Код подтверждения'
+        verbose_name_plural = 'Коды подтверждения'
+
+    def __str__(self):
+        return f'{self.user_id} {self.expires_at}'
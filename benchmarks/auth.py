@@ -0,0 +1,107 @@
+"""Замер пропускной способности регистрации и выдачи токена.
+
+Скрипт шлёт запросы к работающему серверу (docker-compose, gunicorn
+или runserver) из нескольких потоков и печатает req/s и задержки.
+Коды подтверждения для фазы выдачи токена выпускаются напрямую через
+хранилище кодов, поэтому скрипту нужен доступ к той же БД (и к тому же
+общему кешу при CacheCodeStore), что и серверу:
+
+    python benchmarks/auth.py --url http://localhost:8000 \\
+        --concurrency 16 --requests 2000
+
+Созданные пользователи удаляются после замера.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_yamdb'
+)
+
+
+def setup_django():
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    import django
+    django.setup()
+
+
+def post(url, payload):
+    request = Request(
+        url,
+        data=json.dumps(payload).encode(),
+        headers={'Content-Type': 'application/json'},
+        method='POST'
+    )
+    started = time.perf_counter()
+    try:
+        with urlopen(request) as response:
+            status = response.status
+            response.read()
+    except HTTPError as error:
+        status = error.code
+    return status, time.perf_counter() - started
+
+
+def run(name, url, payloads, concurrency):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda data: post(url, data), payloads))
+    elapsed = time.perf_counter() - started
+    latencies = sorted(latency for _, latency in results)
+    errors = sum(1 for status, _ in results if status != 200)
+    print(
+        f'{name:8} {len(results) / elapsed:8.1f} req/s  '
+        f'p50 {statistics.median(latencies) * 1000:6.1f} ms  '
+        f'p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:6.1f} ms  '
+        f'errors {errors}'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    from users.codes import get_code_store
+    from users.models import User
+
+    prefix = f'bench{int(time.time())}'
+    usernames = [f'{prefix}_{i}' for i in range(args.requests)]
+    signup_url = f'{args.url}/api/v1/auth/signup/'
+    token_url = f'{args.url}/api/v1/auth/token/'
+    try:
+        run('signup', signup_url, [
+            {'username': username, 'email': f'{username}@yamdb.fake'}
+            for username in usernames
+        ], args.concurrency)
+        run('resignup', signup_url, [
+            {'username': username, 'email': f'{username}@yamdb.fake'}
+            for username in usernames
+        ], args.concurrency)
+        store = get_code_store()
+        run('token', token_url, [
+            {
+                'username': username,
+                'confirmation_code': store.issue(user_id, username)
+            }
+            for username, user_id in User.objects.filter(
+                username__startswith=prefix
+            ).values_list('username', 'id')
+        ], args.concurrency)
+    finally:
+        User.objects.filter(username__startswith=prefix).delete()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""Замер CPU на сериализацию и рендеринг больших списков.
+
+Скрипт работает внутри процесса: создаёт тестовые данные в транзакции,
+сравнивает ModelSerializer с values-сериализаторами и стандартный
+JSONRenderer с FastJSONRenderer, затем откатывает транзакцию:
+
+    python benchmarks/serializers.py --rows 5000 --repeat 5
+
+Печатается процессорное время (time.process_time) на один проход.
+"""
+import argparse
+import os
+import sys
+import time
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_yamdb'
+)
+
+
+def setup_django():
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    import django
+    django.setup()
+
+
+def seed(rows):
+    from reviews.models import Categorie, Comment, Genre, Review, Title
+    from users.models import User
+
+    category = Categorie.objects.create(name='bench', slug='bench-category')
+    genre = Genre.objects.create(name='bench', slug='bench-genre')
+    title = Title.objects.create(
+        name='bench', year=2000, description='', category=category
+    )
+    # bulk_create не возвращает первичные ключи на SQLite
+    User.objects.bulk_create(
+        User(username=f'bench{i}', email=f'bench{i}@example.com')
+        for i in range(rows)
+    )
+    authors = User.objects.filter(username__startswith='bench')
+    Review.objects.bulk_create(
+        Review(author=author, title=title, text='x' * 200, score=i % 10 + 1)
+        for i, author in enumerate(authors)
+    )
+    review = Review.objects.filter(title=title).first()
+    Comment.objects.bulk_create(
+        Comment(author=author, review=review, text='x' * 200)
+        for author in authors
+    )
+    Title.objects.bulk_create(
+        Title(name=f'bench{i}', year=2000, description='', category=category)
+        for i in range(rows)
+    )
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title_id=title_id, genre=genre)
+        for title_id in Title.objects.filter(
+            name__startswith='bench'
+        ).values_list('id', flat=True)
+    )
+    return title, review
+
+
+def measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.process_time()
+        function()
+        timings.append(time.process_time() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from api import serializers
+    from api.renderers import FastJSONRenderer
+    from django.db import transaction
+    from rest_framework.renderers import JSONRenderer
+    from reviews.models import Comment, Review, Title
+
+    with transaction.atomic():
+        title, review = seed(args.rows)
+        sources = [
+            (
+                'titles',
+                Title.objects.select_related('category')
+                .prefetch_related('genre')
+                .filter(name__startswith='bench'),
+                serializers.TitleGetSerializer,
+                serializers.TitleValuesSerializer,
+            ),
+            (
+                'reviews',
+                Review.objects.filter(title=title)
+                .select_related('author'),
+                serializers.ReviewSerializer,
+                serializers.ReviewValuesSerializer,
+            ),
+            (
+                'comments',
+                Comment.objects.filter(review=review)
+                .select_related('author'),
+                serializers.CommentSerializer,
+                serializers.CommentValuesSerializer,
+            ),
+        ]
+        for name, queryset, model_class, values_class in sources:
+            model_data = model_class(queryset.all(), many=True).data
+            values_data = values_class(
+                values_class.get_queryset(queryset.all()), many=True
+            ).data
+            results = {
+                'model': measure(
+                    lambda: model_class(queryset.all(), many=True).data,
+                    args.repeat
+                ),
+                'values': measure(
+                    lambda: values_class(
+                        values_class.get_queryset(queryset.all()),
+                        many=True
+                    ).data,
+                    args.repeat
+                ),
+                'json': measure(
+                    lambda: JSONRenderer().render(model_data),
+                    args.repeat
+                ),
+                'orjson': measure(
+                    lambda: FastJSONRenderer().render(values_data),
+                    args.repeat
+                ),
+            }
+            print(f'{name}: {len(values_data)} rows, ' + ', '.join(
+                f'{key} {value * 1000:.1f} ms'
+                for key, value in results.items()
+            ))
+        transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    main()
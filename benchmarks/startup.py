@@ -0,0 +1,89 @@
+"""Замер времени старта контейнера web.
+
+Время считается от `docker run` до первого ответа 200 на
+/health/ready/ и на /api/v1/titles/. Контейнеру нужна доступная БД:
+удобно запускать рядом с docker-compose из infra/, указав его сеть:
+
+    python benchmarks/startup.py --image yanastasya/api_yamdb-web \\
+        --env-file infra/.env --network infra_default --runs 5
+
+Контейнеры удаляются после каждого замера.
+"""
+import argparse
+import statistics
+import subprocess
+import time
+from urllib.error import URLError
+from urllib.request import urlopen
+
+POLL_INTERVAL = 0.05
+
+PATHS = ('/health/ready/', '/api/v1/titles/')
+
+
+def is_ok(url):
+    try:
+        with urlopen(url, timeout=1) as response:
+            return response.status == 200
+    except (URLError, ConnectionError, OSError):
+        return False
+
+
+def run_once(args):
+    command = [
+        'docker', 'run', '-d', '--rm', '-p', f'{args.port}:8000',
+    ]
+    if args.env_file:
+        command += ['--env-file', args.env_file]
+    if args.network:
+        command += ['--network', args.network]
+    started = time.perf_counter()
+    container = subprocess.run(
+        command + [args.image], check=True, capture_output=True, text=True
+    ).stdout.strip()
+    timings = {}
+    try:
+        while len(timings) < len(PATHS):
+            elapsed = time.perf_counter() - started
+            if elapsed > args.timeout:
+                raise TimeoutError(f'Нет ответа 200 за {args.timeout} с')
+            for path in PATHS:
+                if path not in timings and is_ok(
+                    f'http://localhost:{args.port}{path}'
+                ):
+                    timings[path] = time.perf_counter() - started
+            time.sleep(POLL_INTERVAL)
+    finally:
+        subprocess.run(
+            ['docker', 'rm', '-f', container], capture_output=True
+        )
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--image', default='yanastasya/api_yamdb-web')
+    parser.add_argument('--env-file')
+    parser.add_argument('--network')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=60)
+    args = parser.parse_args()
+
+    results = {path: [] for path in PATHS}
+    for number in range(1, args.runs + 1):
+        timings = run_once(args)
+        print(f'#{number}: ' + ', '.join(
+            f'{path} {timings[path]:.2f} s' for path in PATHS
+        ))
+        for path in PATHS:
+            results[path].append(timings[path])
+    for path, values in results.items():
+        print(
+            f'{path}: медиана {statistics.median(values):.2f} s, '
+            f'max {max(values):.2f} s'
+        )
+
+
+if __name__ == '__main__':
+    main()
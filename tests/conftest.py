@@ -1,9 +1,24 @@
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
+    'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Реестры slug и кеши живут дольше транзакции теста."""
+    from django.core.cache import cache
+    from reviews import slugs
+    cache.clear()
+    # версия в процессе сверяется с кешем не при каждом обращении
+    for registry in slugs.REGISTRIES.values():
+        registry.invalidate()
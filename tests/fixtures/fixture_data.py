@@ -0,0 +1,40 @@
+import pytest
+
+
+@pytest.fixture
+def category():
+    from reviews.models import Categorie
+    return Categorie.objects.create(name='Фильм', slug='movie')
+
+
+@pytest.fixture
+def genre():
+    from reviews.models import Genre
+    return Genre.objects.create(name='Драма', slug='drama')
+
+
+@pytest.fixture
+def title(category, genre):
+    from reviews.models import Title
+    title = Title.objects.create(
+        name='Побег из Шоушенка', year=1994, description='',
+        category=category
+    )
+    title.genre.add(genre)
+    return title
+
+
+@pytest.fixture
+def review(user, title):
+    from reviews.models import Review
+    return Review.objects.create(
+        author=user, title=title, text='Ставлю десять звёзд!', score=10
+    )
+
+
+@pytest.fixture
+def comment(user, review):
+    from reviews.models import Comment
+    return Comment.objects.create(
+        author=user, review=review, text='Согласен.'
+    )
@@ -0,0 +1,31 @@
+import pytest
+from django.test import Client
+
+
+@pytest.mark.django_db
+class TestTitlesAdmin:
+    """Фильтр произведений по жанру в админке."""
+
+    def test_genre_filter(self, django_user_model, title, category):
+        from reviews.models import Genre, Title
+
+        other = Title.objects.create(
+            name='Без жанра', year=1999, description='', category=category
+        )
+        Genre.objects.create(name='Комедия', slug='comedy')
+        staff = django_user_model.objects.create_superuser(
+            username='staff', email='staff@yamdb.fake', password='x'
+        )
+        client = Client()
+        client.force_login(staff)
+
+        response = client.get('/admin/reviews/title/', {'genre': 'drama'})
+        assert response.status_code == 200
+        assert list(response.context['cl'].result_list) == [title]
+        assert 'DISTINCT' not in str(response.context['cl'].queryset.query)
+
+        response = client.get('/admin/reviews/title/', {'genre': 'comedy'})
+        assert list(response.context['cl'].result_list) == []
+
+        response = client.get('/admin/reviews/title/')
+        assert set(response.context['cl'].result_list) == {title, other}
@@ -0,0 +1,57 @@
+import datetime as dt
+
+import pytest
+from django.core.management import call_command
+
+
+def make_old(*objects):
+    for obj in objects:
+        type(obj).objects.filter(pk=obj.pk).update(
+            pub_date=obj.pub_date - dt.timedelta(days=400)
+        )
+
+
+@pytest.mark.django_db
+class TestArchive:
+    """archive_reviews переносит старые отзывы и комментарии в архив."""
+
+    def test_archived_review_is_readable(
+        self, client, user_client, review, comment
+    ):
+        from reviews.models import ArchivedComment, ArchivedReview, Review
+
+        make_old(review)
+        call_command('archive_reviews', days=365)
+        assert not Review.objects.exists()
+        assert ArchivedReview.objects.filter(pk=review.pk).exists()
+        assert ArchivedComment.objects.filter(pk=comment.pk).exists()
+
+        reviews_url = f'/api/v1/titles/{review.title_id}/reviews/'
+        assert client.get(reviews_url).json()['results'] == []
+        results = client.get(
+            reviews_url, {'archived': 1}
+        ).json()['results']
+        assert [item['id'] for item in results] == [review.pk]
+        response = client.get(
+            f'{reviews_url}{review.pk}/comments/', {'archived': 1}
+        )
+        assert response.status_code == 200
+        assert response.json()['results'][0]['id'] == comment.pk
+
+        # фикстура создаёт отзыв в обход API
+        call_command('rebuild_title_stats')
+        title = client.get(f'/api/v1/titles/{review.title_id}/').json()
+        assert title['rating'] == review.score
+
+        response = user_client.post(
+            reviews_url, data={'text': 'Ещё раз', 'score': 1}, format='json'
+        )
+        assert response.status_code == 400
+
+    def test_old_comment_of_recent_review(self, client, review, comment):
+        from reviews.models import ArchivedComment, Review
+
+        make_old(comment)
+        call_command('archive_reviews', days=365)
+        assert Review.objects.filter(pk=review.pk).exists()
+        assert ArchivedComment.objects.filter(pk=comment.pk).exists()
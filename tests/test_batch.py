@@ -0,0 +1,82 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+@pytest.mark.django_db
+class TestBatch:
+    """api/v1/batch/ выполняет вложенные запросы с правами
+    текущего пользователя и возвращает ответы по порядку.
+    """
+
+    def test_requests_in_order(self, user, user_client, title):
+        response = user_client.post('/api/v1/batch/', data={'requests': [
+            {'method': 'GET', 'path': '/api/v1/users/me/'},
+            {
+                'method': 'POST',
+                'path': f'/api/v1/titles/{title.id}/reviews/',
+                'body': {'text': 'Хорошо', 'score': 8},
+            },
+            {
+                'method': 'GET',
+                'path': f'/api/v1/titles/{title.id}/reviews/?limit=1',
+            },
+            {'method': 'DELETE', 'path': f'/api/v1/titles/{title.id}/'},
+            {'method': 'GET', 'path': '/api/v1/unknown/'},
+        ]}, format='json')
+        assert response.status_code == 200
+        responses = response.json()['responses']
+        assert [item['status'] for item in responses] == [
+            200, 201, 200, 403, 404
+        ]
+        assert responses[0]['body']['username'] == user.username
+        assert responses[2]['body']['results'][0]['text'] == 'Хорошо'
+
+    def test_successful_delete(self, user_client, review):
+        from reviews.models import Review
+
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+        response = user_client.post('/api/v1/batch/', data={'requests': [
+            {'method': 'DELETE', 'path': url},
+            {'method': 'GET', 'path': url},
+        ]}, format='json')
+        assert response.status_code == 200
+        assert response.json()['responses'][0] == {
+            'status': 204, 'body': None
+        }
+        assert response.json()['responses'][1]['status'] == 404
+        assert not Review.objects.filter(pk=review.pk).exists()
+
+    def test_anonymous(self, client, title):
+        response = client.post('/api/v1/batch/', data={'requests': [
+            {'method': 'GET', 'path': f'/api/v1/titles/{title.id}/'},
+            {'method': 'GET', 'path': '/api/v1/users/me/'},
+        ]}, content_type='application/json')
+        responses = response.json()['responses']
+        assert responses[0]['body']['name'] == title.name
+        assert responses[1]['status'] == 401
+
+    def test_concurrent_gets(self, user, user_client, monkeypatch):
+        from api import batch
+
+        monkeypatch.setattr(batch, 'executor', ThreadPoolExecutor(2))
+        response = user_client.post('/api/v1/batch/', data={'requests': [
+            {'method': 'GET', 'path': '/api/v1/users/me/'},
+        ] * 3}, format='json')
+        responses = response.json()['responses']
+        assert [item['body']['username'] for item in responses] == [
+            user.username
+        ] * 3
+
+    def test_invalid(self, user_client, settings):
+        settings.BATCH_MAX_REQUESTS = 1
+        for requests in (
+            [],
+            [{'method': 'GET', 'path': '/api/v1/batch/'}],
+            [{'method': 'GET', 'path': '/admin/'}],
+            [{'method': 'GET', 'path': '/api/v1/titles/'}] * 2,
+        ):
+            response = user_client.post(
+                '/api/v1/batch/', data={'requests': requests}, format='json'
+            )
+            assert response.status_code == 400
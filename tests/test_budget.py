@@ -0,0 +1,92 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+postgres_only = pytest.mark.skipif(
+    connection.vendor != 'postgresql', reason='statement_timeout в Postgres'
+)
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+    """Бюджеты запросов: пагинация, statement_timeout и сброс нагрузки."""
+
+    def test_pagination_caps(self, client, title):
+        response = client.get('/api/v1/titles/', {'limit': 1000})
+        assert response.status_code == 200
+        assert len(response.json()['results']) == 1
+        response = client.get('/api/v1/titles/', {'offset': 10001})
+        assert response.status_code == 400
+        assert 'offset' in response.json()
+
+    def test_load_shedding(self, client, settings, title):
+        settings.LOAD_SHED_MAX_IN_FLIGHT = 0
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 503
+        assert response['Retry-After'] == str(settings.LOAD_SHED_RETRY_AFTER)
+        # у карточки произведения нет бюджета
+        assert client.get(f'/api/v1/titles/{title.id}/').status_code == 200
+        settings.LOAD_SHED_MAX_IN_FLIGHT = 1
+        assert client.get('/api/v1/titles/').status_code == 200
+        assert client.get('/api/v1/titles/').status_code == 200
+
+    def test_load_shedding_shared_counter(self, client, settings, title):
+        from api import budget
+        from django.core.cache import cache
+
+        # запросы, выполняющиеся в других воркерах, видны через кеш
+        settings.LOAD_SHED_MAX_IN_FLIGHT = 2
+        key = budget.bucket_keys()[-1]
+        cache.set(key, 2, 60)
+        assert client.get('/api/v1/titles/').status_code == 503
+        assert cache.get(key) == 2
+        budget.leave(key)
+        assert client.get('/api/v1/titles/').status_code == 200
+        assert sum(cache.get_many(budget.bucket_keys()).values()) == 1
+
+    def test_leaked_slot_expires(self, client, settings, monkeypatch, title):
+        from api import budget
+
+        settings.LOAD_SHED_MAX_IN_FLIGHT = 1
+        now = [1000.0]
+        monkeypatch.setattr(budget, 'clock', lambda: now[0])
+        # воркер упал между enter и leave
+        assert budget.enter() is not None
+        for _ in range(2 * settings.LOAD_SHED_WINDOW_SECONDS
+                       // settings.LOAD_SHED_BUCKET_SECONDS):
+            if now[0] - 1000 < settings.LOAD_SHED_WINDOW_SECONDS:
+                assert client.get('/api/v1/titles/').status_code == 503
+            else:
+                assert client.get('/api/v1/titles/').status_code == 200
+            now[0] += settings.LOAD_SHED_BUCKET_SECONDS
+
+    @postgres_only
+    def test_statement_timeout_set_and_reset(self, client, title):
+        with CaptureQueriesContext(connection) as queries:
+            client.get('/api/v1/titles/')
+        statements = [query['sql'] for query in queries]
+        assert statements[0] == 'SET statement_timeout = 2000'
+        assert statements[-1] == 'SET statement_timeout = DEFAULT'
+
+        with CaptureQueriesContext(connection) as queries:
+            client.get(f'/api/v1/titles/{title.id}/reviews/1/')
+        assert not any(
+            'statement_timeout' in query['sql'] for query in queries
+        )
+
+    @postgres_only
+    @pytest.mark.django_db(transaction=True)
+    def test_canceled_query(self, client, settings, monkeypatch, title):
+        from api.views import TitleViewSet
+
+        settings.QUERY_BUDGETS = {'titles.list': 10}
+        filter_queryset = TitleViewSet.filter_queryset
+        monkeypatch.setattr(
+            TitleViewSet, 'filter_queryset',
+            lambda self, queryset: filter_queryset(self, queryset).extra(
+                where=['pg_sleep(0.2) IS NOT NULL']
+            )
+        )
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 503
+        assert 'Retry-After' in response
@@ -0,0 +1,97 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('copy', [True, False])
+class TestCsv:
+    """import_csv/export_csv: COPY на PostgreSQL и пачки на SQLite."""
+
+    def test_import_export_roundtrip(self, copy, tmp_path):
+        from reviews.models import Comment, Review, TitleStats
+
+        options = {} if copy else {'no_copy': True}
+        call_command('import_csv', **options)
+        reviews = list(Review.objects.order_by('id').values_list(
+            'id', 'title_id', 'author_id', 'score', 'pub_date', 'text'
+        ))
+        assert reviews
+        assert Comment.objects.exists()
+        assert sum(
+            sum(stats.histogram.values())
+            for stats in TitleStats.objects.all()
+        ) == len(reviews)
+
+        call_command('import_csv', 'review', **options)
+        assert Review.objects.count() == len(reviews)
+
+        call_command('export_csv', path=str(tmp_path), **options)
+        Comment.objects.all().delete()
+        Review.objects.all().delete()
+        call_command(
+            'import_csv', 'review', 'comments', path=str(tmp_path),
+            drop_indexes=copy, **options
+        )
+        assert list(Review.objects.order_by('id').values_list(
+            'id', 'title_id', 'author_id', 'score', 'pub_date', 'text'
+        )) == reviews
+
+    def test_roundtrip_keeps_moderation_and_threads(self, copy, tmp_path):
+        from reviews.models import Comment, Review, Title
+
+        options = {} if copy else {'no_copy': True}
+        call_command('import_csv', **options)
+        Title.objects.filter(pk=1).update(description='Тюремная драма.')
+        Review.objects.filter(pk=1).update(is_hidden=True)
+        root = Comment.objects.order_by('id').first()
+        reply = Comment.objects.create(
+            author=root.author, review=root.review, text='Ответ.',
+            parent=root
+        )
+        Comment.objects.create(
+            author=root.author, review=root.review, text='Глубже.',
+            parent=reply, is_hidden=True
+        )
+
+        def snapshot():
+            return (
+                list(Title.objects.order_by('id').values_list(
+                    'id', 'name', 'year', 'category_id', 'description'
+                )),
+                list(Review.objects.order_by('id').values_list(
+                    'id', 'title_id', 'score', 'is_hidden'
+                )),
+                list(Comment.objects.order_by('id').values_list(
+                    'id', 'review_id', 'parent_id', 'depth', 'path',
+                    'is_hidden'
+                )),
+            )
+
+        before = snapshot()
+        call_command('export_csv', path=str(tmp_path), **options)
+        Comment.objects.all().delete()
+        Review.objects.all().delete()
+        Title.objects.all().delete()
+        call_command(
+            'import_csv', 'titles', 'genre_title', 'review', 'comments',
+            path=str(tmp_path), **options
+        )
+        assert snapshot() == before
+
+    def test_invalid_foreign_keys(self, copy, tmp_path):
+        from reviews.models import Review
+
+        options = {} if copy else {'no_copy': True}
+        (tmp_path / 'review.csv').write_text(
+            'id,title_id,text,author,score,pub_date\n'
+            '1,999,Текст,999,5,2020-01-01T00:00:00Z\n',
+            encoding='utf-8'
+        )
+        with pytest.raises(CommandError):
+            call_command('import_csv', 'review', path=str(tmp_path), **options)
+        call_command(
+            'import_csv', 'review', path=str(tmp_path), skip_invalid=True,
+            **options
+        )
+        assert not Review.objects.exists()
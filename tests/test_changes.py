@@ -0,0 +1,158 @@
+import threading
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+
+
+@pytest.fixture(autouse=True)
+def no_lag(settings):
+    settings.CHANGES_FEED_LAG = timedelta()
+
+
+def read_changes(client, **params):
+    response = client.get('/api/v1/changes/', params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def read_all(client, since=0, limit=2):
+    """Все записи после since страницами по limit."""
+    rows = []
+    while True:
+        data = read_changes(client, since=since, limit=limit)
+        assert len(data['results']) <= limit
+        rows.extend(data['results'])
+        since = data['next']
+        if not data['has_more']:
+            return rows, since
+
+
+def keys(rows):
+    return [(row['model'], row['object_id'], row['action']) for row in rows]
+
+
+@pytest.mark.django_db
+class TestChanges:
+    """api/v1/changes/: журнал изменений с курсором since."""
+
+    def test_cursor_order(self, client, comment):
+        review = comment.review
+        rows, since = read_all(client)
+        cursors = [row['cursor'] for row in rows]
+        assert cursors == sorted(cursors)
+        assert since == cursors[-1]
+        assert keys(rows) == [
+            ('categorie', review.title.category_id, 'created'),
+            ('genre', review.title.genre.get().id, 'created'),
+            ('title', review.title_id, 'created'),
+            # жанры добавляются после создания произведения
+            ('title', review.title_id, 'updated'),
+            ('review', review.id, 'created'),
+            ('comment', comment.id, 'created'),
+        ]
+        assert rows[-1]['data']['text'] == comment.text
+        # с последнего курсора - пусто, курсор не меняется
+        data = read_changes(client, since=since)
+        assert data == {'next': since, 'has_more': False, 'results': []}
+        # с середины - только более поздние записи
+        rows_after, _ = read_all(client, since=cursors[3], limit=10)
+        assert rows_after == rows[4:]
+
+    def test_tombstones(self, client, user_client, review):
+        since = read_all(client)[1]
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+        user_client.patch(url, {'text': 'Передумал.'}, format='json')
+        rows, _ = read_all(client, since=since)
+        assert keys(rows) == [('review', review.id, 'updated')]
+        assert rows[0]['data']['text'] == 'Передумал.'
+
+        user_client.delete(url)
+        rows, _ = read_all(client, since=since)
+        assert keys(rows) == [
+            ('review', review.id, 'updated'),
+            ('review', review.id, 'deleted'),
+        ]
+        # объекта больше нет: data пусто и у прежних записей
+        assert [row['data'] for row in rows] == [None, None]
+
+    def test_source_filters(self, client, settings, review, another_user):
+        from reviews.models import Review
+
+        hidden = Review.objects.create(
+            author=another_user, title=review.title, text='Скрыт.',
+            score=1, is_hidden=True
+        )
+        data = {
+            (row['model'], row['object_id']): row['data']
+            for row in read_all(client)[0]
+        }
+        assert data[('review', review.id)]['score'] == 10
+        assert data[('review', hidden.id)] is None
+        # свежие записи придерживаются на CHANGES_FEED_LAG
+        settings.CHANGES_FEED_LAG = timedelta(minutes=1)
+        assert read_changes(client)['results'] == []
+        assert client.get(
+            '/api/v1/changes/', {'since': -1}
+        ).status_code == 400
+
+    def test_deleted_title(self, client, admin_client, comment):
+        review = comment.review
+        admin_client.delete(f'/api/v1/titles/{review.title_id}/')
+        data = {
+            (row['model'], row['object_id']): row['data']
+            for row in read_changes(client)['results']
+        }
+        # отзыв и комментарий удалённого произведения не показываются,
+        # как и само произведение
+        assert data[('title', review.title_id)] is None
+        assert data[('review', review.id)] is None
+        assert data[('comment', comment.id)] is None
+
+
+@pytest.mark.django_db
+def test_genre_removal_logged_once(client, title, genre):
+    since = read_all(client)[1]
+    title.genre.remove(genre)
+    rows, _ = read_all(client, since=since)
+    assert keys(rows) == [('title', title.id, 'updated')]
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'postgresql', reason='pg_stat_activity в Postgres'
+)
+@pytest.mark.django_db(transaction=True)
+def test_open_transaction_holds_feed(client):
+    """Запись долгой транзакции с меньшим id не теряется: записи после
+    начала транзакции придерживаются до её конца.
+    """
+    from django.db import connections, transaction
+    from reviews.models import Genre
+
+    written, finish = threading.Event(), threading.Event()
+
+    def long_transaction():
+        try:
+            with transaction.atomic():
+                Genre.objects.create(name='Долгий', slug='long')
+                written.set()
+                finish.wait(5)
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=long_transaction)
+    thread.start()
+    try:
+        assert written.wait(5)
+        quick = Genre.objects.create(name='Быстрый', slug='quick')
+        rows, since = read_all(client)
+        assert ('genre', quick.id, 'created') not in keys(rows)
+    finally:
+        finish.set()
+        thread.join()
+    later, _ = read_all(client, since=since)
+    assert [row[:2] for row in keys(rows + later)] == [
+        ('genre', genre_id) for genre_id in Genre.objects.order_by(
+            'id'
+        ).values_list('id', flat=True)
+    ]
@@ -0,0 +1,100 @@
+import io
+import threading
+import time
+
+import pytest
+
+
+@pytest.mark.django_db
+class TestCoalesceViews:
+    """Анонимные GET страницы произведения и списка отзывов
+    отдаются из общего кеша.
+    """
+
+    def test_title_page_cached_for_anonymous(
+        self, client, user_client, review, django_assert_num_queries
+    ):
+        from api import coalesce
+
+        url = f'/api/v1/titles/{review.title_id}/'
+        expected = client.get(url).json()
+        with django_assert_num_queries(0):
+            assert client.get(url).json() == expected
+        assert client.get(f'/api/v1/titles/{review.title_id}/reviews/')
+        metrics = coalesce.get_metrics()
+        assert metrics['miss'] == 2
+        assert metrics['hit'] == 1
+
+        user_client.patch(
+            f'{url}reviews/{review.id}/', data={'text': 'Новый текст'},
+            format='json'
+        )
+        results = user_client.get(f'{url}reviews/').json()['results']
+        assert results[0]['text'] == 'Новый текст'
+
+
+class TestFetch:
+    """Одновременные промахи ждут одного расчёта."""
+
+    def test_waits_for_lock_holder(self, settings):
+        from api import coalesce
+        from django.core.cache import cache
+
+        settings.COALESCE_POLL_SECONDS = 0.01
+        assert coalesce.acquire('page:lock')
+
+        def finish():
+            time.sleep(0.05)
+            cache.set('page', ('готово', 0, time.time() + 60), 60)
+
+        thread = threading.Thread(target=finish)
+        thread.start()
+        assert coalesce.fetch('page', lambda: 'пересчитано') == 'готово'
+        thread.join()
+        assert coalesce.get_metrics()['coalesced'] == 1
+
+    def test_failed_holder_does_not_block(self, settings):
+        from api import coalesce
+        from django.core.cache import cache
+
+        settings.COALESCE_POLL_SECONDS = 0.01
+        cache.add('page:lock', 'чужой', 60)
+        threading.Timer(0.05, cache.delete, ['page:lock']).start()
+        started = time.monotonic()
+        assert coalesce.fetch('page', lambda: 'сам') == 'сам'
+        assert time.monotonic() - started < settings.COALESCE_LEASE_SECONDS
+
+    def test_early_refresh(self):
+        from api import coalesce
+        from django.core.cache import cache
+
+        cache.set('page', ('старое', 1, time.time() - 1), 60)
+        assert coalesce.fetch('page', lambda: 'новое') == 'новое'
+        assert coalesce.fetch('page', lambda: 'ещё') == 'новое'
+        assert coalesce.get_metrics()['early_refresh'] == 1
+
+
+class TestMetricsCommand:
+    """coalesce_metrics читает счётчики воркеров из общего кеша."""
+
+    def test_shared_cache(self, settings, tmp_path):
+        from api import coalesce
+        from django.core.management import call_command
+
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        }}
+        coalesce.count('hit')
+        coalesce.count('hit')
+        out = io.StringIO()
+        call_command('coalesce_metrics', reset=True, stdout=out)
+        assert 'hit: 2' in out.getvalue().splitlines()
+        assert coalesce.get_metrics()['hit'] == 0
+
+    def test_local_cache(self):
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+
+        with pytest.raises(CommandError):
+            call_command('coalesce_metrics')
@@ -0,0 +1,112 @@
+import pytest
+from django.db import connection
+
+
+def post(client, review, text, parent=None):
+    url = (
+        f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+    )
+    data = {'text': text}
+    if parent is not None:
+        data['parent'] = parent
+    return client.post(url, data, format='json')
+
+
+@pytest.fixture
+def thread(user_client, another_user_client, comment):
+    """comment
+         ├─ ответ
+         │    └─ ответ на ответ
+         └─ второй ответ
+       второй корень
+    """
+    review = comment.review
+    reply = post(another_user_client, review, 'Нет.', comment.id).json()
+    nested = post(user_client, review, 'Почему?', reply['id']).json()
+    root = post(another_user_client, review, 'Смотрел дважды.').json()
+    second = post(user_client, review, 'И я.', comment.id).json()
+    return review, [comment.id, reply['id'], nested['id'], second['id'],
+                    root['id']]
+
+
+@pytest.mark.django_db
+class TestCommentTree:
+    """?tree=1 отдаёт ветку обсуждения одним запросом в порядке обхода."""
+
+    def url(self, review):
+        return (
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        )
+
+    def test_tree(self, client, thread, django_assert_num_queries):
+        review, ids = thread
+        # отзыв, число комментариев, страница; в Postgres ещё
+        # установка и сброс statement_timeout
+        queries = 5 if connection.vendor == 'postgresql' else 3
+        with django_assert_num_queries(queries):
+            response = client.get(self.url(review), {'tree': 1})
+        results = response.json()['results']
+        assert [row['id'] for row in results] == ids
+        assert [row['depth'] for row in results] == [0, 1, 2, 1, 0]
+        assert [row['parent'] for row in results] == [
+            None, ids[0], ids[1], ids[0], None
+        ]
+
+    def test_levels_and_subtree(self, client, thread):
+        review, ids = thread
+        url = self.url(review)
+        for params, expected in (
+            ({'levels': 1}, [ids[0], ids[4]]),
+            ({'parent': ids[0]}, ids[1:4]),
+            ({'parent': ids[0], 'levels': 1}, [ids[1], ids[3]]),
+            ({'parent': ids[0], 'limit': 2, 'offset': 1}, ids[2:4]),
+        ):
+            response = client.get(url, {'tree': 1, **params})
+            assert [row['id'] for row in response.json()['results']] == (
+                expected
+            )
+        assert client.get(
+            url, {'tree': 1, 'parent': 0}
+        ).status_code == 400
+        assert client.get(
+            url, {'tree': 1, 'parent': 999}
+        ).status_code == 404
+
+    def test_invalid_parent(
+        self, user_client, settings, thread, another_user, title
+    ):
+        from reviews.models import Review
+
+        review, ids = thread
+        settings.COMMENT_MAX_DEPTH = 2
+        assert post(user_client, review, 'Глубоко.', ids[2]).status_code == (
+            400
+        )
+        other = Review.objects.create(
+            author=another_user, title=title, text='Неплохо.', score=7
+        )
+        assert post(user_client, other, 'Мимо.', ids[0]).status_code == 400
+        response = user_client.patch(
+            f'{self.url(review)}{ids[3]}/', {'parent': ids[1]}, format='json'
+        )
+        assert response.status_code == 400
+
+    def test_orphans_and_archive(self, client, another_user_client, thread):
+        from django.utils import timezone
+        from reviews.archive import archive
+
+        review, ids = thread
+        assert another_user_client.delete(
+            f'{self.url(review)}{ids[1]}/'
+        ).status_code == 204
+        response = client.get(self.url(review), {'tree': 1})
+        assert [row['id'] for row in response.json()['results']] == [
+            ids[0], ids[2], ids[3], ids[4]
+        ]
+        archive(timezone.now(), 100)
+        response = client.get(
+            self.url(review), {'tree': 1, 'archived': 1, 'parent': ids[0]}
+        )
+        results = response.json()['results']
+        assert [row['id'] for row in results] == [ids[2], ids[3]]
+        assert [row['parent'] for row in results] == [ids[1], ids[0]]
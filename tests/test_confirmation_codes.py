@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.fixture(params=['DatabaseCodeStore', 'CacheCodeStore'])
+def store(request):
+    from users import codes
+
+    return getattr(codes, request.param)()
+
+
+@pytest.mark.django_db
+class TestCodeStore:
+    """Коды подтверждения: одноразовые, с TTL и лимитом попыток."""
+
+    def test_single_use(self, store, user):
+        code = store.issue(user.id, user.username)
+        assert store.verify(user.username, code) == user.id
+        assert store.verify(user.username, code) is None
+        assert store.verify('nobody', code) is None
+
+    def test_reissue_replaces_code(self, store, user):
+        first = store.issue(user.id, user.username)
+        second = store.issue(user.id, user.username)
+        if first != second:
+            assert store.verify(user.username, first) is None
+        assert store.verify(user.username, second) == user.id
+
+    def test_expired(self, store, settings, user):
+        settings.CONFIRMATION_CODE_TTL = timedelta(seconds=-1)
+        code = store.issue(user.id, user.username)
+        assert store.verify(user.username, code) is None
+
+    def test_attempt_limit(self, store, settings, user):
+        settings.CONFIRMATION_CODE_MAX_ATTEMPTS = 2
+        code = store.issue(user.id, user.username)
+        assert store.verify(user.username, 'wrong1') is None
+        assert store.verify(user.username, 'wrong2') is None
+        # после исчерпания попыток не проходит и верный код
+        assert store.verify(user.username, code) is None
+
+    def test_deleted_user(self, store, user):
+        from reviews.purge import soft_delete_user
+
+        code = store.issue(user.id, user.username)
+        soft_delete_user(user)
+        assert store.verify(user.username, code) is None
+
+    def test_hashed_storage(self, user):
+        from users.codes import DatabaseCodeStore, hash_code
+        from users.models import ConfirmationCode
+
+        code = DatabaseCodeStore().issue(user.id, user.username)
+        stored = ConfirmationCode.objects.get(pk=user.id)
+        assert code not in stored.code_hash
+        assert stored.code_hash == hash_code(user.id, code)
+        assert stored.attempts == 0
+
+    def test_purge_command(
+        self, settings, user, another_user, admin, capsys
+    ):
+        from users.codes import DatabaseCodeStore
+        from users.models import ConfirmationCode
+
+        store = DatabaseCodeStore()
+        store.issue(user.id, user.username)
+        settings.CONFIRMATION_CODE_TTL = timedelta(seconds=-1)
+        store.issue(another_user.id, another_user.username)
+        store.issue(admin.id, admin.username)
+        call_command('purge_confirmation_codes', batch_size=1)
+        assert 'Удалено кодов: 2' in capsys.readouterr().out
+        assert list(ConfirmationCode.objects.values_list(
+            'pk', flat=True
+        )) == [user.id]
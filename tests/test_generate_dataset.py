@@ -0,0 +1,51 @@
+import pytest
+from django.core.management import call_command
+
+
+def generate(prefix):
+    from reviews.models import Review
+    call_command(
+        'generate_dataset', titles=30, users=10, reviews_per_title=3,
+        comments_per_review=1, replies_per_comment=1, reply_depth=2,
+        genres=4, categories=2, seed=7, prefix=prefix, batch_size=7
+    )
+    return list(Review.objects.filter(
+        author__username__startswith=f'{prefix}_'
+    ).order_by('id').values_list('score', 'text'))
+
+
+@pytest.mark.django_db
+def test_generate_dataset_is_deterministic():
+    from reviews.models import Comment, Review, Title, TitleStats
+
+    first = generate('one')
+    assert first
+    assert generate('two') == first
+    title = Title.objects.filter(name__startswith='one ').first()
+    assert title.genre.exists()
+    comment = Comment.objects.first()
+    assert comment.path == f'{comment.id:010d}/'
+    replies = Comment.objects.filter(parent__isnull=False).select_related(
+        'parent'
+    )
+    assert {reply.depth for reply in replies} == {1, 2}
+    for reply in replies:
+        assert reply.path == f'{reply.parent.path}{reply.id:010d}/'
+        assert reply.depth == reply.parent.depth + 1
+        assert reply.review_id == reply.parent.review_id
+        assert reply.pub_date >= reply.parent.pub_date
+    stats = TitleStats.objects.get(title=title)
+    assert sum(stats.histogram.values()) == Review.objects.filter(
+        title=title
+    ).count()
+
+
+@pytest.mark.django_db
+def test_generate_dataset_reply_depth_limit(settings):
+    from django.core.management.base import CommandError
+
+    with pytest.raises(CommandError):
+        call_command(
+            'generate_dataset', titles=1, users=1,
+            reply_depth=settings.COMMENT_MAX_DEPTH + 1
+        )
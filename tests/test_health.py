@@ -0,0 +1,37 @@
+import pytest
+
+
+def test_live(client):
+    response = client.get('/health/live')
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+class TestReady:
+
+    @pytest.fixture(autouse=True)
+    def reset_cached_result(self, monkeypatch):
+        from api_yamdb import health
+        monkeypatch.setattr(health, '_ready_result', (None, {}))
+
+    def test_ready(self, client):
+        response = client.get('/health/ready')
+        assert response.status_code == 200
+        assert response.json() == {
+            'status': 'ok',
+            'checks': {'database': 'ok', 'migrations': 'ok', 'cache': 'ok'},
+        }
+
+    def test_failed_check_is_cached(self, client, monkeypatch):
+        from api_yamdb import health
+
+        def broken():
+            raise RuntimeError('нет соединения')
+
+        monkeypatch.setitem(health.READY_CHECKS, 'database', broken)
+        response = client.get('/health/ready/')
+        assert response.status_code == 503
+        assert response.json()['checks']['database'] == 'нет соединения'
+
+        monkeypatch.setitem(health.READY_CHECKS, 'database', lambda: None)
+        assert client.get('/health/ready/').status_code == 503
@@ -0,0 +1,99 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+
+@pytest.fixture
+def reviews(user, another_user, title):
+    """Пять отзывов к разным произведениям, два - в одну секунду."""
+    from reviews.models import Review, Title
+
+    now = timezone.now()
+    other = Title.objects.create(name='Другое', year=2000, description='')
+    created = []
+    for number, (author, review_title) in enumerate((
+        (user, title), (another_user, title), (user, other),
+        (another_user, other), (user, Title.objects.create(
+            name='Третье', year=2001, description=''
+        )),
+    )):
+        review = Review.objects.create(
+            author=author, title=review_title, text=f'Отзыв {number}',
+            score=5
+        )
+        pub_date = now - timedelta(minutes=10 - min(number, 3))
+        Review.objects.filter(pk=review.pk).update(pub_date=pub_date)
+        created.append(review.id)
+    return created[::-1]
+
+
+def read_all(client, url, **params):
+    ids = []
+    params = dict(params)
+    while True:
+        data = client.get(url, params).json()
+        ids.extend(row['id'] for row in data['results'])
+        if data['next'] is None:
+            return ids
+        params['cursor'] = data['next']
+
+
+@pytest.mark.django_db
+class TestLatest:
+    """api/v1/reviews/latest/ и api/v1/comments/latest/: ленты по всем
+    произведениям с курсором по (pub_date, id).
+    """
+
+    def test_keyset_pages(self, client, user_client, reviews):
+        url = '/api/v1/reviews/latest/'
+        assert read_all(user_client, url, limit=2) == reviews
+        assert read_all(client, url, limit=1) == reviews
+        assert read_all(client, url, limit=3) == reviews
+        response = client.get(url, {'cursor': 'abc'})
+        assert response.status_code == 400
+
+    def test_filters(self, client, reviews, genre):
+        url = '/api/v1/reviews/latest/'
+        assert read_all(client, url, genre=genre.slug) == reviews[-2:]
+        assert read_all(client, url, category='movie') == reviews[-2:]
+        assert read_all(client, url, genre='comedy') == []
+
+    def test_head_from_cache(
+        self, client, user_client, reviews, title, another_user,
+        django_assert_num_queries
+    ):
+        from reviews.models import Review
+
+        url = '/api/v1/reviews/latest/'
+        first = client.get(url, {'limit': 2}).json()
+        with django_assert_num_queries(0):
+            response = client.get(url, {'limit': 3})
+        assert [row['id'] for row in response.json()['results']] == (
+            reviews[:3]
+        )
+        assert response.json()['next'] is not None
+        assert client.get(
+            url, {'cursor': first['next']}
+        ).json()['results'][0]['id'] == reviews[2]
+
+        Review.objects.filter(pk=reviews[0]).delete()
+        assert user_client.get(url).json()['results'][0]['id'] == reviews[1]
+
+    def test_comments(self, client, comment, another_user):
+        from reviews.models import Comment, Review
+
+        hidden = Review.objects.create(
+            author=another_user, title=comment.review.title, text='Скрыт.',
+            score=1, is_hidden=True
+        )
+        Comment.objects.create(
+            author=another_user, review=hidden, text='Не видно.'
+        )
+        reply = Comment.objects.create(
+            author=another_user, review=comment.review, text='Видно.'
+        )
+        response = client.get('/api/v1/comments/latest/', {'genre': 'drama'})
+        results = response.json()['results']
+        assert [row['id'] for row in results] == [reply.id, comment.id]
+        assert results[0]['review'] == comment.review_id
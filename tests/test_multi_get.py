@@ -0,0 +1,51 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+
+@pytest.mark.django_db
+class TestMultiGet:
+    """?ids= отдаёт объекты в порядке запроса за постоянное число
+    запросов и перечисляет отсутствующие id.
+    """
+
+    def test_titles(self, client, review, django_assert_num_queries):
+        from reviews.models import Title
+
+        call_command('rebuild_title_stats')
+        other = Title.objects.create(name='Другое', year=2000, description='')
+        ids = f'{other.id},999,{review.title_id},{other.id}'
+        # произведения, жанры, гистограммы оценок; в Postgres ещё
+        # установка и сброс statement_timeout
+        queries = 5 if connection.vendor == 'postgresql' else 3
+        with django_assert_num_queries(queries):
+            response = client.get('/api/v1/titles/', {'ids': ids})
+        assert response.status_code == 200
+        data = response.json()
+        assert [title['id'] for title in data['results']] == [
+            other.id, review.title_id
+        ]
+        assert data['results'][0]['rating'] is None
+        assert data['results'][1]['rating'] == review.score
+        assert data['missing'] == [999]
+
+    def test_reviews_and_comments(self, client, comment):
+        review = comment.review
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        data = client.get(url, {'ids': f'{review.id},0'}).json()
+        assert [item['id'] for item in data['results']] == [review.id]
+        assert data['missing'] == [0]
+        data = client.get(
+            f'{url}{review.id}/comments/', {'ids': str(comment.id)}
+        ).json()
+        assert [item['id'] for item in data['results']] == [comment.id]
+        assert data['missing'] == []
+
+    def test_invalid_ids(self, client, settings):
+        settings.MULTI_GET_MAX_IDS = 2
+        assert client.get(
+            '/api/v1/titles/', {'ids': '1,a'}
+        ).status_code == 400
+        assert client.get(
+            '/api/v1/titles/', {'ids': '1,2,3'}
+        ).status_code == 400
@@ -0,0 +1,110 @@
+import pytest
+from django.core.management import call_command
+
+
+def review_url(review):
+    return f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+
+
+def comment_url(comment):
+    review = comment.review
+    return (
+        f'/api/v1/titles/{review.title_id}/reviews/{review.id}'
+        f'/comments/{comment.id}/'
+    )
+
+
+@pytest.mark.django_db
+class TestObjectPermissionQueries:
+    """Права на объект проверяются по author_id, без загрузки автора."""
+
+    def test_review_patch_by_author(
+        self, user_client, review, django_assert_num_queries
+    ):
+        # объект, он же с блокировкой строки, обновление, запись в журнал
+        # изменений и SAVEPOINT/RELEASE транзакции, в которой меняется
+        # гистограмма оценок
+        with django_assert_num_queries(6):
+            response = user_client.patch(
+                review_url(review), data={'text': 'Новый текст'},
+                format='json'
+            )
+        assert response.status_code == 200
+        assert response.json()['author'] == review.author.username
+
+    def test_review_patch_by_moderator(
+        self, moderator_client, review, django_assert_num_queries
+    ):
+        call_command('rebuild_title_stats')
+        # объект, блокировка, обновление, запись в журнал, гистограмма,
+        # SAVEPOINT/RELEASE
+        with django_assert_num_queries(7):
+            response = moderator_client.patch(
+                review_url(review), data={'score': 1}, format='json'
+            )
+        assert response.status_code == 200
+
+    def test_review_patch_by_another_user(
+        self, another_user_client, review, django_assert_num_queries
+    ):
+        with django_assert_num_queries(1):
+            response = another_user_client.patch(
+                review_url(review), data={'score': 1}, format='json'
+            )
+        assert response.status_code == 403
+
+    def test_review_delete_by_author(
+        self, user_client, review, django_assert_num_queries
+    ):
+        call_command('rebuild_title_stats')
+        # отзыв, блокировка, комментарии для каскада, удаление, запись
+        # в журнал, гистограмма, SAVEPOINT/RELEASE
+        with django_assert_num_queries(8):
+            response = user_client.delete(review_url(review))
+        assert response.status_code == 204
+
+    def test_comment_patch_by_author(
+        self, user_client, comment, django_assert_num_queries
+    ):
+        url = comment_url(comment)
+        # объект, обновление, запись в журнал изменений
+        with django_assert_num_queries(3):
+            response = user_client.patch(
+                url, data={'text': 'Новый текст'}, format='json'
+            )
+        assert response.status_code == 200
+
+    def test_comment_delete_by_moderator(
+        self, moderator_client, comment, django_assert_num_queries
+    ):
+        url = comment_url(comment)
+        # комментарий, удаление, запись в журнал изменений
+        with django_assert_num_queries(3):
+            response = moderator_client.delete(url)
+        assert response.status_code == 204
+
+    def test_comment_delete_by_another_user(
+        self, another_user_client, comment, django_assert_num_queries
+    ):
+        url = comment_url(comment)
+        with django_assert_num_queries(1):
+            response = another_user_client.delete(url)
+        assert response.status_code == 403
+
+
+@pytest.mark.django_db
+class TestUserMeQueries:
+
+    def test_me_get(self, user_client, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == 200
+        assert response.json()['username'] == 'TestUser'
+
+    def test_me_patch(self, user_client, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            response = user_client.patch(
+                '/api/v1/users/me/', data={'bio': 'О себе'}, format='json'
+            )
+        assert response.status_code == 200
+        assert response.json()['bio'] == 'О себе'
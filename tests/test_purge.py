@@ -0,0 +1,56 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+class TestSoftDelete:
+    """DEL произведения и пользователя скрывает объект сразу,
+    purge_deleted удаляет его вместе с зависимыми строками.
+    """
+
+    def test_title(self, client, admin_client, comment):
+        from reviews.models import (ChangeLog, Comment, Review, Title,
+                                    TitleGenre, TitleStats)
+
+        title_id = comment.review.title_id
+        call_command('rebuild_title_stats')
+        url = f'/api/v1/titles/{title_id}/'
+        assert admin_client.delete(url).status_code == 204
+        assert Title.objects.filter(pk=title_id).exists()
+        assert client.get(url).status_code == 404
+        assert client.get(f'{url}reviews/').status_code == 404
+        assert client.get(f'{url}stats/').status_code == 404
+        assert client.get(
+            f'{url}reviews/{comment.review_id}/comments/'
+        ).status_code == 404
+        assert client.get('/api/v1/titles/').json()['count'] == 0
+        assert ChangeLog.objects.filter(
+            model='title', object_id=title_id, action=ChangeLog.DELETED
+        ).exists()
+
+        call_command('purge_deleted', batch_size=1)
+        assert not Title.objects.filter(pk=title_id).exists()
+        assert not Review.objects.exists()
+        assert not Comment.objects.exists()
+        assert not TitleGenre.objects.exists()
+        assert not TitleStats.objects.exists()
+
+    def test_user(self, client, admin_client, user, review):
+        from reviews.models import Review, TitleStats
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        call_command('rebuild_title_stats')
+        url = f'/api/v1/users/{user.username}/'
+        assert admin_client.delete(url).status_code == 204
+        assert admin_client.get(url).status_code == 404
+        assert client.get(
+            '/api/v1/users/me/',
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        ).status_code == 401
+        assert Review.objects.filter(pk=review.pk).exists()
+
+        call_command('purge_deleted')
+        assert not Review.objects.exists()
+        assert not type(user).objects.filter(pk=user.pk).exists()
+        stats = TitleStats.objects.get(title_id=review.title_id)
+        assert stats.count == 0
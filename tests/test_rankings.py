@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+
+
+def rebuild(settings):
+    settings.CHANGES_FEED_LAG = timedelta()
+    call_command('rebuild_rankings')
+
+
+@pytest.mark.django_db
+class TestRankings:
+    """api/v1/titles/top/ читает рейтинги, посчитанные rebuild_rankings."""
+
+    def test_top_after_rebuild(self, client, settings, review, genre):
+        rebuild(settings)
+        for params in ({}, {'genre': genre.slug}, {'category': 'movie'}):
+            response = client.get('/api/v1/titles/top/', params)
+            assert response.status_code == 200
+            results = response.json()['results']
+            assert len(results) == 1
+            assert results[0]['title']['id'] == review.title_id
+            assert results[0]['review_count'] == 1
+            assert results[0]['rating'] == 10
+        response = client.get('/api/v1/titles/top/', {'genre': 'comedy'})
+        assert response.json()['results'] == []
+
+    def test_incremental_rebuild(
+        self, client, settings, review, another_user
+    ):
+        from reviews.models import Review
+        from reviews.moderation import hide
+
+        rebuild(settings)
+        Review.objects.create(
+            author=another_user, title=review.title, text='Так себе.',
+            score=2
+        )
+        rebuild(settings)
+        result = client.get('/api/v1/titles/top/').json()['results'][0]
+        assert result['review_count'] == 2
+        assert result['rating'] == 6
+
+        hide(Review.objects.filter(pk=review.pk))
+        rebuild(settings)
+        result = client.get('/api/v1/titles/top/').json()['results'][0]
+        assert result['review_count'] == 1
+
+    def test_unknown_period(self, client):
+        response = client.get('/api/v1/titles/top/', {'period': 'year'})
+        assert response.status_code == 400
@@ -0,0 +1,107 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.core import mail
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    """Свой пул для фоновой отправки, чтобы дождаться писем."""
+    from api import mail as api_mail
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(api_mail, 'executor', pool)
+    yield pool
+    pool.shutdown(wait=True)
+
+
+def sent_code(message):
+    return re.search(r'"confirmation_code": "(\w+)"', message.body).group(1)
+
+
+@pytest.mark.django_db
+class TestSignup:
+    """api/v1/auth/signup/: регистрация одной вставкой и код на почту."""
+
+    data = {'username': 'NewUser', 'email': 'newuser@yamdb.fake'}
+
+    def test_mail_sent_in_background(self, client, executor):
+        response = client.post(SIGNUP_URL, self.data)
+        assert response.status_code == 200
+        assert response.json() == self.data
+        executor.shutdown(wait=True)
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == [self.data['email']]
+        response = client.post(TOKEN_URL, {
+            'username': self.data['username'],
+            'confirmation_code': sent_code(mail.outbox[0]),
+        })
+        assert response.status_code == 200
+        assert 'access' in response.json()
+
+    def test_repeat_signup(self, client, monkeypatch, django_user_model):
+        from api import mail as api_mail
+
+        monkeypatch.setattr(api_mail, 'executor', None)
+        assert client.post(SIGNUP_URL, self.data).status_code == 200
+        assert client.post(SIGNUP_URL, self.data).status_code == 200
+        assert django_user_model.objects.filter(
+            username=self.data['username']
+        ).count() == 1
+        first, second = (sent_code(message) for message in mail.outbox)
+        # новый код заменяет старый
+        if first != second:
+            assert client.post(TOKEN_URL, {
+                'username': self.data['username'],
+                'confirmation_code': first,
+            }).status_code == 400
+        assert client.post(TOKEN_URL, {
+            'username': self.data['username'],
+            'confirmation_code': second,
+        }).status_code == 200
+
+    def test_conflicts(self, client, user, monkeypatch, django_user_model):
+        from api import mail as api_mail
+
+        monkeypatch.setattr(api_mail, 'executor', None)
+        count = django_user_model.objects.count()
+        response = client.post(SIGNUP_URL, {
+            'username': user.username, 'email': 'other@yamdb.fake'
+        })
+        assert response.status_code == 400
+        assert list(response.json()) == ['username']
+        response = client.post(SIGNUP_URL, {
+            'username': 'OtherUser', 'email': user.email
+        })
+        assert response.status_code == 400
+        assert list(response.json()) == ['email']
+        response = client.post(SIGNUP_URL, {
+            'username': 'me', 'email': 'me@yamdb.fake'
+        })
+        assert response.status_code == 400
+        assert django_user_model.objects.count() == count
+        assert mail.outbox == []
+
+    def test_deleted_user(self, client, user, monkeypatch):
+        from api import mail as api_mail
+        from reviews.purge import soft_delete_user
+        from users.codes import get_code_store
+
+        monkeypatch.setattr(api_mail, 'executor', None)
+        code = get_code_store().issue(user.id, user.username)
+        soft_delete_user(user)
+        response = client.post(SIGNUP_URL, {
+            'username': user.username, 'email': user.email
+        })
+        assert response.status_code == 400
+        assert list(response.json()) == ['username']
+        assert mail.outbox == []
+        response = client.post(TOKEN_URL, {
+            'username': user.username, 'confirmation_code': code
+        })
+        assert response.status_code == 400
+        assert 'access' not in response.json()
@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+
+
+def rebuild(settings, *args):
+    settings.CHANGES_FEED_LAG = timedelta()
+    call_command('rebuild_similar_titles', *args)
+
+
+@pytest.fixture
+def titles(review, another_user, genre):
+    """Оба пользователя высоко оценили первое произведение, первый -
+    ещё второе (того же жанра), второй - третье (без жанра).
+    """
+    from reviews.models import Review, Title
+
+    drama = Title.objects.create(
+        name='Зелёная миля', year=1999, description='',
+        category=review.title.category
+    )
+    drama.genre.add(genre)
+    other = Title.objects.create(
+        name='Форрест Гамп', year=1994, description=''
+    )
+    Review.objects.create(
+        author=review.author, title=drama, text='Отлично.', score=9
+    )
+    Review.objects.create(
+        author=another_user, title=review.title, text='Хорошо.', score=8
+    )
+    Review.objects.create(
+        author=another_user, title=other, text='Отлично.', score=10
+    )
+    Review.objects.create(
+        author=review.author, title=other, text='Скучно.', score=3
+    )
+    return review.title, drama, other
+
+
+@pytest.mark.django_db
+class TestSimilarTitles:
+    """api/v1/titles/{id}/similar/ читает соседей, посчитанных
+    rebuild_similar_titles.
+    """
+
+    def test_similar(self, client, settings, titles):
+        title, drama, other = titles
+        rebuild(settings)
+        response = client.get(f'/api/v1/titles/{title.id}/similar/')
+        assert response.status_code == 200
+        data = response.json()
+        assert [row['title']['id'] for row in data] == [drama.id, other.id]
+        # общий жанр удваивает сходство
+        assert data[0]['score'] == pytest.approx(2 * 4 / 20 ** 0.5)
+        assert data[1]['score'] == pytest.approx(2 / 20 ** 0.5)
+        assert data[0]['title']['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'}
+        ]
+        response = client.get(f'/api/v1/titles/{drama.id}/similar/')
+        assert [row['title']['id'] for row in response.json()] == [title.id]
+
+    def test_incremental_rebuild(self, client, settings, titles):
+        from reviews.models import Review
+
+        title, drama, other = titles
+        rebuild(settings)
+        Review.objects.filter(title=drama).get().delete()
+        rebuild(settings)
+        response = client.get(f'/api/v1/titles/{title.id}/similar/')
+        assert [row['title']['id'] for row in response.json()] == [other.id]
+        response = client.get(f'/api/v1/titles/{drama.id}/similar/')
+        assert response.json() == []
+
+    def test_deleted_title(self, client, admin_client, settings, titles):
+        from reviews.models import SimilarTitle
+
+        title, drama, other = titles
+        rebuild(settings)
+        admin_client.delete(f'/api/v1/titles/{drama.id}/')
+        response = client.get(f'/api/v1/titles/{title.id}/similar/')
+        assert [row['title']['id'] for row in response.json()] == [other.id]
+        assert client.get(
+            f'/api/v1/titles/{drama.id}/similar/'
+        ).status_code == 404
+        call_command('purge_deleted')
+        assert not SimilarTitle.objects.filter(similar_id=drama.id).exists()
+        assert client.get('/api/v1/titles/0/similar/').status_code == 404
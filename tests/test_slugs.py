@@ -0,0 +1,72 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestSlugRegistry:
+    """Slug жанров и категорий переводятся в id без запросов к БД."""
+
+    def test_list_from_registry(
+        self, client, admin_client, genre, django_assert_num_queries
+    ):
+        assert client.get('/api/v1/genres/').json()['results'] == [
+            {'name': genre.name, 'slug': genre.slug}
+        ]
+        with django_assert_num_queries(0):
+            client.get('/api/v1/genres/')
+
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Комедия', 'slug': 'comedy'},
+            format='json'
+        )
+        slugs = [
+            item['slug']
+            for item in client.get('/api/v1/genres/').json()['results']
+        ]
+        assert slugs == ['drama', 'comedy']
+        admin_client.delete('/api/v1/genres/drama/')
+        results = client.get('/api/v1/genres/').json()['results']
+        assert [item['slug'] for item in results] == ['comedy']
+
+    def test_title_post_and_filter(self, client, admin_client, title):
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Зелёная миля', 'year': 1999, 'description': 'Фильм',
+            'category': 'movie', 'genre': ['drama'],
+        }, format='json')
+        assert response.status_code == 201
+        assert response.json()['category'] == 'movie'
+        assert response.json()['genre'] == ['drama']
+
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Без жанра', 'year': 1999, 'description': 'Фильм',
+            'category': 'movie', 'genre': ['unknown'],
+        }, format='json')
+        assert response.status_code == 400
+        assert 'genre' in response.json()
+
+        for params, count in (
+            ({'genre': 'drama'}, 2), ({'category': 'movie'}, 2),
+            ({'genre': 'unknown'}, 0), ({'category': 'unknown'}, 0),
+        ):
+            response = client.get('/api/v1/titles/', params)
+            assert response.json()['count'] == count
+
+    def test_version_checked_once(self, settings, monkeypatch, genre):
+        from django.core.cache import cache
+        from reviews import slugs
+        from reviews.models import Genre
+
+        gets = []
+        get = cache.get
+        monkeypatch.setattr(
+            cache, 'get', lambda key, *args: gets.append(key) or get(key)
+        )
+        for _ in range(5):
+            assert slugs.genres.get_id('drama') == genre.id
+        assert gets == [slugs.genres.version_key]
+
+        # другой процесс сменил версию: видна после интервала проверки
+        Genre.objects.bulk_create([Genre(name='Комедия', slug='comedy')])
+        cache.set(slugs.genres.version_key, 'другая', None)
+        assert slugs.genres.get_id('comedy') is None
+        settings.SLUG_REGISTRY_CHECK_SECONDS = 0
+        assert slugs.genres.get_id('comedy') is not None
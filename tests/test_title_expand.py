@@ -0,0 +1,100 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestTitleExpand:
+    """GET api/v1/titles/{id}/?expand=reviews,comments."""
+
+    @pytest.fixture(autouse=True)
+    def no_coalesce(self, settings):
+        settings.COALESCE_TTL_SECONDS = 0
+
+    def test_reviews_with_comments(self, client, comment):
+        response = client.get(
+            f'/api/v1/titles/{comment.review.title_id}/',
+            {'expand': 'reviews,comments'}
+        )
+        assert response.status_code == 200
+        review = response.json()['reviews'][0]
+        assert [row['id'] for row in review['comments']] == [comment.id]
+
+    @pytest.fixture
+    def discussion(self, review, comment, another_user, admin):
+        """Три отзыва, у первого - четыре комментария."""
+        from reviews.models import Comment, Review
+
+        low = Review.objects.create(
+            author=another_user, title=review.title, text='Скучно.', score=2
+        )
+        middle = Review.objects.create(
+            author=admin, title=review.title, text='Нормально.', score=6
+        )
+        comments = [comment] + [
+            Comment.objects.create(
+                author=another_user, review=review, text=f'Ответ {number}'
+            )
+            for number in range(3)
+        ]
+        return review, [middle, low, review], comments
+
+    def url(self, review):
+        return f'/api/v1/titles/{review.title_id}/'
+
+    def test_reviews_shape(self, client, discussion):
+        review, recent, _ = discussion
+        data = client.get(self.url(review), {'expand': 'reviews'}).json()
+        assert set(data) == {
+            'id', 'name', 'category', 'genre', 'description', 'year',
+            'rating', 'reviews'
+        }
+        assert [row['id'] for row in data['reviews']] == [
+            obj.id for obj in recent
+        ]
+        assert set(data['reviews'][0]) == {
+            'id', 'author', 'text', 'pub_date', 'score', 'title'
+        }
+        data = client.get(
+            self.url(review), {'expand': 'reviews', 'reviews_order': 'score'}
+        ).json()
+        assert [row['score'] for row in data['reviews']] == [10, 6, 2]
+
+    def test_comments_shape(self, client, settings, discussion):
+        review, _, comments = discussion
+        settings.TITLE_EXPAND_COMMENTS_LIMIT = 3
+        data = client.get(
+            self.url(review), {'expand': 'reviews,comments'}
+        ).json()
+        by_id = {row['id']: row for row in data['reviews']}
+        assert [row['id'] for row in by_id[review.id]['comments']] == [
+            comment.id for comment in comments[:3]
+        ]
+        assert set(by_id[review.id]['comments'][0]) == {
+            'id', 'text', 'author', 'pub_date', 'parent', 'depth'
+        }
+        assert all(
+            row['comments'] == [] for pk, row in by_id.items()
+            if pk != review.id
+        )
+
+    @pytest.mark.parametrize('expand, queries', [
+        # произведение, жанры, гистограмма, отзывы с авторами
+        ('reviews', 4),
+        # и комментарии с авторами одним запросом на все отзывы
+        ('reviews,comments', 5),
+    ])
+    def test_query_count(
+        self, client, discussion, django_assert_num_queries, expand, queries
+    ):
+        review, _, _ = discussion
+        with django_assert_num_queries(queries):
+            response = client.get(self.url(review), {'expand': expand})
+        assert response.status_code == 200
+
+    def test_unknown_values(self, client, review):
+        for params in (
+            {'expand': 'authors'},
+            {'expand': 'reviews', 'reviews_order': 'oldest'},
+        ):
+            assert client.get(
+                self.url(review), params
+            ).status_code == 400
@@ -0,0 +1,136 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+class TestTitleStats:
+    """Гистограмма оценок обновляется API отзывов и отдаётся
+    в api/v1/titles/{id}/stats/.
+    """
+
+    def test_review_api_updates_histogram(
+        self, client, user_client, another_user_client, title
+    ):
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        stats_url = f'/api/v1/titles/{title.id}/stats/'
+        assert client.get(stats_url).json() == {
+            'count': 0, 'mean': None, 'median': None,
+            'histogram': {str(score): 0 for score in range(1, 11)},
+        }
+
+        review_id = user_client.post(
+            reviews_url, data={'text': 'Отлично', 'score': 10},
+            format='json'
+        ).json()['id']
+        another_user_client.post(
+            reviews_url, data={'text': 'Так себе', 'score': 4},
+            format='json'
+        )
+        stats = client.get(stats_url).json()
+        assert stats['count'] == 2
+        assert stats['mean'] == 7
+        assert stats['median'] == 7
+        assert stats['histogram']['10'] == 1
+
+        user_client.patch(
+            f'{reviews_url}{review_id}/', data={'score': 8}, format='json'
+        )
+        stats = client.get(stats_url).json()
+        assert stats['histogram']['10'] == 0
+        assert stats['histogram']['8'] == 1
+        assert client.get(f'/api/v1/titles/{title.id}/').json()[
+            'rating'
+        ] == 6
+
+        user_client.delete(f'{reviews_url}{review_id}/')
+        stats = client.get(stats_url).json()
+        assert stats['count'] == 1
+        assert stats['median'] == 4
+
+    def test_moderation_and_rebuild(self, client, review):
+        from reviews.models import Review, TitleStats
+        from reviews.moderation import hide
+
+        stats_url = f'/api/v1/titles/{review.title_id}/stats/'
+        call_command('rebuild_title_stats')
+        assert client.get(stats_url).json()['count'] == 1
+
+        hide(Review.objects.filter(pk=review.pk))
+        assert client.get(stats_url).json()['count'] == 0
+
+        TitleStats.objects.all().delete()
+        call_command('rebuild_title_stats')
+        assert client.get(stats_url).json()['count'] == 0
+
+    def test_stale_delete_and_update(self, review):
+        """Отзыв, загруженный до параллельного изменения или удаления:
+        гистограмма сдвигается по строке в БД, а не по устаревшему
+        объекту.
+        """
+        from types import SimpleNamespace
+
+        from api.serializers import ReviewSerializer
+        from api.views import ReviewViewSet
+        from django.http import Http404
+        from reviews.models import Review, TitleStats
+        from reviews.moderation import delete_reviews
+
+        call_command('rebuild_title_stats')
+        view = ReviewViewSet()
+        stale = Review.objects.get(pk=review.pk)
+        # параллельная правка: 10 -> 5
+        Review.objects.filter(pk=review.pk).update(score=5)
+        TitleStats.add(review.title_id, {10: -1, 5: 1})
+        serializer = ReviewSerializer(
+            stale, data={'score': 8}, partial=True,
+            context={'request': SimpleNamespace(method='PATCH')}
+        )
+        serializer.is_valid(raise_exception=True)
+        view.perform_update(serializer)
+        stats = TitleStats.objects.get(title_id=review.title_id)
+        assert stats.histogram == {
+            score: int(score == 8) for score in TitleStats.SCORES
+        }
+
+        delete_reviews(Review.objects.filter(pk=review.pk))
+        with pytest.raises(Http404):
+            view.perform_destroy(stale)
+        stats.refresh_from_db()
+        assert stats.histogram == {score: 0 for score in TitleStats.SCORES}
+
+    def test_writes_outside_api(
+        self, client, settings, review, another_user
+    ):
+        """Админка, shell и каскадное удаление тоже сдвигают
+        гистограмму: её ведут сигналы отзыва.
+        """
+        from reviews.models import Review, Title, TitleStats
+
+        settings.COALESCE_TTL_SECONDS = 0
+        title_url = f'/api/v1/titles/{review.title_id}/'
+        other = Review.objects.create(
+            author=another_user, title=review.title, text='Так себе.',
+            score=4
+        )
+        assert client.get(title_url).json()['rating'] == 7
+
+        other = Review.objects.get(pk=other.pk)
+        other.score = 6
+        other.save()
+        assert client.get(title_url).json()['rating'] == 8
+        # объект без from_db: учтённое состояние читается из БД
+        Review(
+            pk=other.pk, author=another_user, title=review.title,
+            text='Скрыт.', score=6, is_hidden=True, pub_date=other.pub_date
+        ).save()
+        assert client.get(title_url).json()['rating'] == 10
+
+        review.author.delete()
+        assert client.get(title_url).json()['rating'] is None
+        assert TitleStats.objects.get(title_id=review.title_id).count == 0
+
+        Title.objects.get(pk=review.title_id).delete()
+        assert not TitleStats.objects.exists()
+
+    def test_unknown_title(self, client):
+        assert client.get('/api/v1/titles/999/stats/').status_code == 404
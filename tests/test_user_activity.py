@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+
+@pytest.fixture
+def history(user, another_user, title):
+    """Три отзыва пользователя к разным произведениям и чужой отзыв."""
+    from reviews.models import Review, Title
+
+    now = timezone.now()
+    ids = []
+    for number in range(3):
+        review_title = title if number == 0 else Title.objects.create(
+            name=f'Произведение {number}', year=2000, description=''
+        )
+        review = Review.objects.create(
+            author=user, title=review_title, text=f'Отзыв {number}', score=7
+        )
+        Review.objects.filter(pk=review.pk).update(
+            pub_date=now - timedelta(days=3 - number)
+        )
+        ids.append(review.id)
+    Review.objects.create(
+        author=another_user, title=title, text='Чужой.', score=3
+    )
+    return ids[::-1]
+
+
+@pytest.mark.django_db
+class TestUserActivity:
+    """api/v1/users/{username}/reviews|comments/ и api/v1/users/me/...:
+    вклад пользователя от новых к старым с названиями произведений.
+    """
+
+    def test_reviews(self, client, user, history, django_assert_num_queries):
+        url = f'/api/v1/users/{user.username}/reviews/'
+        # пользователь и страница отзывов с произведениями; в Postgres
+        # ещё установка и сброс statement_timeout
+        queries = 4 if connection.vendor == 'postgresql' else 2
+        with django_assert_num_queries(queries):
+            response = client.get(url, {'limit': 2})
+        assert response.status_code == 200
+        data = response.json()
+        assert [row['id'] for row in data['results']] == history[:2]
+        assert data['results'][1]['title_name'] == 'Произведение 1'
+        response = client.get(url, {'limit': 2, 'cursor': data['next']})
+        assert [row['id'] for row in response.json()['results']] == (
+            history[2:]
+        )
+        assert response.json()['results'][0]['title_name'] == (
+            'Побег из Шоушенка'
+        )
+        assert client.get(
+            '/api/v1/users/nobody/reviews/'
+        ).status_code == 404
+
+    def test_comments(self, client, user, comment, another_user):
+        from reviews.models import Comment
+
+        Comment.objects.create(
+            author=another_user, review=comment.review, text='Чужой.'
+        )
+        response = client.get(f'/api/v1/users/{user.username}/comments/')
+        assert response.json()['results'] == [{
+            'id': comment.id,
+            'text': comment.text,
+            'author': user.username,
+            'pub_date': response.json()['results'][0]['pub_date'],
+            'parent': None,
+            'depth': 0,
+            'review': comment.review_id,
+            'title': comment.review.title_id,
+            'title_name': 'Побег из Шоушенка',
+        }]
+
+    def test_me(self, client, user_client, another_user_client, history):
+        response = user_client.get('/api/v1/users/me/reviews/')
+        assert [row['id'] for row in response.json()['results']] == history
+        response = another_user_client.get('/api/v1/users/me/reviews/')
+        assert len(response.json()['results']) == 1
+        assert another_user_client.get(
+            '/api/v1/users/me/comments/'
+        ).json()['results'] == []
+        assert client.get('/api/v1/users/me/reviews/').status_code == 401
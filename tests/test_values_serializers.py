@@ -0,0 +1,24 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestValuesSerializers:
+    """values-сериализаторы отдают то же, что и ModelSerializer."""
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/',
+        '/api/v1/titles/{title}/reviews/',
+        '/api/v1/titles/{title}/reviews/{review}/comments/',
+    ])
+    def test_list_matches_model_serializer(
+        self, client, settings, comment, url
+    ):
+        url = url.format(title=comment.review.title_id, review=comment.review_id)
+        settings.COALESCE_TTL_SECONDS = 0
+        settings.VALUES_SERIALIZERS = False
+        expected = client.get(url)
+        settings.VALUES_SERIALIZERS = True
+        response = client.get(url)
+        assert response.status_code == expected.status_code == 200
+        assert response.json() == expected.json()
+        assert response.json()['results']